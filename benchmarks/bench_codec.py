@@ -0,0 +1,122 @@
+"""
+Benchmark the conversion between nested configurations and etcd keys, done
+by etcdgo.codec, against the flatten_dict based one it replaced. It doesn't
+need an etcd database, but it requires flatten-dict to be installed.
+
+Usage:
+
+    python benchmarks/bench_codec.py --sections 1000 --keys 50
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import time
+import statistics
+import click
+import flatten_dict
+import etcdgo.codec
+
+
+def build(sections, keys, depth):
+    """
+    Return a configuration with sections nested depth times, each one
+    holding keys values.
+    """
+    data = dict()
+    for section in range(sections):
+        node = data.setdefault("section%d" % (section % 10), dict())
+        for level in range(depth - 1):
+            node = node.setdefault("level%d_%d" % (level, section), dict())
+
+        for key in range(keys):
+            node["key%d" % key] = "value%d" % key
+
+    return data
+
+
+def flatten_old(data):
+    """
+    Flatten a configuration like Config.push used to do.
+    """
+    def slash_reducer(k1, k2):
+        if k1 is None:
+            return k2
+
+        return "{0}/{1}".format(k1, k2)
+
+    return list(flatten_dict.flatten(data, reducer=slash_reducer).items())
+
+
+def flatten_new(data):
+    """
+    Flatten a configuration with etcdgo.codec.
+    """
+    return list(etcdgo.codec.flatten(data))
+
+
+def unflatten_old(items):
+    """
+    Unflatten etcd keys like Config.pull used to do.
+    """
+    flat_dict = {key.decode('utf-8'): value for key, value in items}
+
+    def slash_reducer(flat_key):
+        return flat_key.split("/")
+
+    return flatten_dict.unflatten(flat_dict, splitter=slash_reducer)
+
+
+def unflatten_new(items):
+    """
+    Unflatten etcd keys with etcdgo.codec.
+    """
+    return etcdgo.codec.unflatten(items)
+
+
+def measure(func, data, repeat):
+    """
+    Return the median time of func(data) in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--sections', '-s', default=1000, type=click.INT)
+@click.option('--keys', '-k', default=50, type=click.INT)
+@click.option('--depth', '-d', default=3, type=click.INT)
+@click.option('--repeat', '-r', default=10, type=click.INT)
+def main(sections, keys, depth, repeat):
+    """
+    Measure flatten/unflatten time of the old and the new implementation.
+    """
+    data = build(sections, keys, depth)
+
+    # etcd returns keys as sorted bytes
+    items = sorted(
+        (path.encode('utf-8'), value)
+        for path, value in etcdgo.codec.flatten(data))
+
+    assert unflatten_old(items) == unflatten_new(items) == data
+
+    click.echo("%d keys, depth %d" % (len(items), depth))
+    click.echo("%12s %14s %14s %10s" % (
+        "operation", "old (ms)", "codec (ms)", "speedup"))
+
+    for name, old, new, arg in [
+            ("flatten", flatten_old, flatten_new, data),
+            ("unflatten", unflatten_old, unflatten_new, items)]:
+        old_ms = measure(old, arg, repeat)
+        new_ms = measure(new, arg, repeat)
+        click.echo("%12s %14.2f %14.2f %9.1fx" % (
+            name, old_ms, new_ms, old_ms / new_ms))
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the JSON/Yaml engines used to parse and dump configurations. Only
+the installed engines are measured. It doesn't need an etcd database.
+
+Usage:
+
+    python benchmarks/bench_engine.py --sections 1000 --keys 20
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import time
+import statistics
+import click
+import etcdgo.engine
+
+
+def build(sections, keys):
+    """
+    Return a configuration shaped like a typical service one: sections of
+    strings, numbers, booleans and small lists.
+    """
+    data = dict()
+    for section in range(sections):
+        values = dict()
+        for key in range(keys):
+            kind = key % 4
+            if kind == 0:
+                values["name%d" % key] = "service-%d.example.com" % key
+            elif kind == 1:
+                values["port%d" % key] = 1024 + key
+            elif kind == 2:
+                values["enabled%d" % key] = bool(key % 3)
+            else:
+                values["tags%d" % key] = ["tag%d" % i for i in range(3)]
+
+        data["section%d" % section] = values
+
+    return data
+
+
+def measure(func, arg, repeat):
+    """
+    Return the median time of func(arg) in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--sections', '-s', default=1000, type=click.INT)
+@click.option('--keys', '-k', default=20, type=click.INT)
+@click.option('--repeat', '-r', default=5, type=click.INT)
+def main(sections, keys, repeat):
+    """
+    Measure parse/dump time of the pure Python and accelerated engines.
+    """
+    data = build(sections, keys)
+    fast = etcdgo.engine.names(pure=False)
+    pure = etcdgo.engine.names(pure=True)
+
+    click.echo("%d sections, %d keys each" % (sections, keys))
+    click.echo("%6s %10s %10s %12s %12s %9s" % (
+        "format", "operation", "engine", "pure (ms)", "fast (ms)", "speedup"))
+
+    for fmt, load, dump in [
+            ("json", etcdgo.engine.json_loads, etcdgo.engine.json_dumps),
+            ("yaml", etcdgo.engine.yaml_load, etcdgo.engine.yaml_dump)]:
+        text = dump(data, True)
+
+        if dump(data, False) != text:
+            click.echo("%s: %s output differs from %s" % (
+                fmt, fast[fmt], pure[fmt]))
+
+        for operation, func, arg in [
+                ("parse", load, text),
+                ("dump", dump, data)]:
+            pure_ms = measure(lambda arg: func(arg, True), arg, repeat)
+            fast_ms = measure(lambda arg: func(arg, False), arg, repeat)
+            click.echo("%6s %10s %10s %12.2f %12.2f %8.1fx" % (
+                fmt, operation, fast[fmt], pure_ms, fast_ms,
+                pure_ms / fast_ms))
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
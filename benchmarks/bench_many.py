@@ -0,0 +1,73 @@
+"""
+Benchmark push_many/pull_many wall time with different concurrency levels.
+
+Usage:
+
+    python benchmarks/bench_many.py --hostname localhost --port 2379
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import time
+import shutil
+import tempfile
+import click
+import etcd3
+import etcdgo
+
+BASE_FOLDER = "/bench_many"
+
+
+@click.command()
+@click.option('--hostname', '-h', default="localhost", type=click.STRING)
+@click.option('--port', '-p', default=2379, type=click.INT)
+@click.option('--configs', '-c', default=300, type=click.INT)
+@click.option(
+    '--levels',
+    '-l',
+    default="1,4,16,64",
+    type=click.STRING,
+    help="Comma separated concurrency levels to measure")
+def main(hostname, port, configs, levels):
+    """
+    Measure push_many/pull_many wall time.
+    """
+    client = etcd3.Etcd3Client(hostname, port)
+    config = etcdgo.get_config(client, "ini", basefolder=BASE_FOLDER)
+
+    folder = tempfile.mkdtemp()
+    files = dict()
+    for i in range(configs):
+        filepath = os.path.join(folder, "config%d.ini" % i)
+        with open(filepath, "w") as fdata:
+            for section in range(5):
+                fdata.write("[section%d]\n" % section)
+                for key in range(10):
+                    fdata.write("key%d = value%d\n" % (key, key))
+
+        files["config%d" % i] = filepath
+
+    try:
+        click.echo("%12s %12s %12s" % ("concurrency", "push (s)", "pull (s)"))
+
+        for level in [int(value) for value in levels.split(",")]:
+            start = time.perf_counter()
+            result = config.push_many(files, concurrency=level)
+            push_time = time.perf_counter() - start
+            assert result.ok
+
+            start = time.perf_counter()
+            result = config.pull_many(list(files.keys()), concurrency=level)
+            pull_time = time.perf_counter() - start
+            assert result.ok
+
+            click.echo("%12d %12.3f %12.3f" % (level, push_time, pull_time))
+    finally:
+        shutil.rmtree(folder)
+        client.delete_prefix(BASE_FOLDER)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark pull latency while the number of unrelated keys stored inside the
+etcd database grows. Since pull only reads the configuration prefix, its
+latency should stay flat.
+
+Usage:
+
+    python benchmarks/bench_pull.py --hostname localhost --port 2379
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import time
+import tempfile
+import statistics
+import click
+import etcd3
+import etcdgo
+
+NOISE_FOLDER = "/bench_noise"
+BASE_FOLDER = "/bench_config"
+
+
+def fill_noise(client, start, stop):
+    """
+    Add unrelated keys inside the database.
+    """
+    for i in range(start, stop):
+        client.put("{0}/key{1:08d}".format(NOISE_FOLDER, i), "x" * 64)
+
+
+def measure(config, name, repeat):
+    """
+    Return a list of pull latencies in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        config.pull(name)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    return timings
+
+
+@click.command()
+@click.option('--hostname', '-h', default="localhost", type=click.STRING)
+@click.option('--port', '-p', default=2379, type=click.INT)
+@click.option('--repeat', '-r', default=50, type=click.INT)
+@click.option(
+    '--steps',
+    '-s',
+    default="0,1000,10000,50000",
+    type=click.STRING,
+    help="Comma separated number of unrelated keys to measure")
+def main(hostname, port, repeat, steps):
+    """
+    Measure pull latency with a growing number of unrelated keys.
+    """
+    client = etcd3.Etcd3Client(hostname, port)
+    config = etcdgo.get_config(client, "ini", basefolder=BASE_FOLDER)
+
+    fd, filepath = tempfile.mkstemp(suffix=".ini")
+    with os.fdopen(fd, "w") as fdata:
+        for section in range(10):
+            fdata.write("[section%d]\n" % section)
+            for key in range(10):
+                fdata.write("key%d = value%d\n" % (key, key))
+
+    try:
+        config.push("bench", filepath)
+
+        click.echo("%12s %12s %12s" % ("noise keys", "median (ms)", "max (ms)"))
+
+        noise = 0
+        for step in [int(value) for value in steps.split(",")]:
+            fill_noise(client, noise, step)
+            noise = max(noise, step)
+
+            timings = measure(config, "bench", repeat)
+            click.echo("%12d %12.3f %12.3f" % (
+                noise,
+                statistics.median(timings),
+                max(timings)))
+    finally:
+        os.remove(filepath)
+        client.delete_prefix(NOISE_FOLDER)
+        client.delete_prefix(BASE_FOLDER)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
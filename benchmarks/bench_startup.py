@@ -0,0 +1,120 @@
+"""
+Benchmark etcdgo-cli startup time, using python -X importtime to report the
+modules which are imported by each scenario. Scenarios which don't talk to
+etcd must not load etcd3/grpc or the format parsers, so the benchmark fails
+if they do, or if startup time exceeds --max-ms. It doesn't need an etcd
+database.
+
+Usage:
+
+    python benchmarks/bench_startup.py --repeat 10 --max-ms 150
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import sys
+import time
+import statistics
+import subprocess
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules which must not be imported by the scenarios
+HEAVY_MODULES = ["etcd3", "grpc", "yaml", "etcdgo.config"]
+
+SCENARIOS = [
+    ("import etcdgo", "import etcdgo"),
+    ("import etcdgo.command", "import etcdgo.command"),
+    ("etcdgo-cli --help", "\n".join([
+        "import sys",
+        "import etcdgo.command",
+        "sys.argv = ['etcdgo-cli', '--help']",
+        "etcdgo.command.cli()",
+    ])),
+    ("etcdgo-cli push (bad file)", "\n".join([
+        "import sys",
+        "import etcdgo.command",
+        "sys.argv = ['etcdgo-cli', 'push', 'label', 'missing.json']",
+        "etcdgo.command.cli()",
+    ])),
+]
+
+
+def run(code):
+    """
+    Run code in a new interpreter and return its wall time in milliseconds,
+    together with the cumulative import time of every module in
+    microseconds.
+    """
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=False)
+    elapsed = (time.perf_counter() - start) * 1000.0
+
+    modules = dict()
+    for line in proc.stderr.decode('utf-8').splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+
+    return elapsed, modules
+
+
+@click.command()
+@click.option('--repeat', '-r', default=10, type=click.INT)
+@click.option('--top', '-t', default=5, type=click.INT,
+              help="Number of slowest modules to show")
+@click.option('--max-ms', '-m', default=None, type=click.FLOAT,
+              help="Fail if a scenario median time is above this limit")
+def main(repeat, top, max_ms):
+    """
+    Measure etcdgo-cli startup time and the modules it imports.
+    """
+    failed = False
+
+    for name, code in SCENARIOS:
+        timings = []
+        modules = dict()
+        for _ in range(repeat):
+            elapsed, modules = run(code)
+            timings.append(elapsed)
+
+        median = statistics.median(timings)
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+
+        click.echo("%s: %.1f ms (min %.1f ms), %d modules" % (
+            name, median, min(timings), len(modules)))
+
+        slowest = sorted(
+            (module for module in modules if "." not in module),
+            key=lambda module: modules[module],
+            reverse=True)
+
+        for module in slowest[:top]:
+            click.echo("    %-30s %8.1f ms" % (
+                module, modules[module] / 1000.0))
+
+        if heavy:
+            click.echo("    FAIL: imports %s" % ", ".join(heavy))
+            failed = True
+
+        if max_ms is not None and median > max_ms:
+            click.echo("    FAIL: slower than %.1f ms" % max_ms)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark peak memory of a normal push against a streamed push of a large
+JSON file.
+
+Usage:
+
+    python benchmarks/bench_stream.py --hostname localhost --port 2379
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import json
+import time
+import tempfile
+import tracemalloc
+import click
+import etcd3
+import etcdgo
+
+BASE_FOLDER = "/bench_stream"
+
+
+def measure(config, filepath, stream):
+    """
+    Return push time in seconds and peak memory in MiB.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    config.push("bench", filepath, stream=stream)
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak / (1024.0 * 1024.0)
+
+
+@click.command()
+@click.option('--hostname', '-h', default="localhost", type=click.STRING)
+@click.option('--port', '-p', default=2379, type=click.INT)
+@click.option('--sections', '-s', default=1000, type=click.INT)
+@click.option('--keys', '-k', default=100, type=click.INT)
+def main(hostname, port, sections, keys):
+    """
+    Measure push memory usage with and without streaming.
+    """
+    client = etcd3.Etcd3Client(hostname, port)
+    config = etcdgo.get_config(client, "json", basefolder=BASE_FOLDER)
+
+    fd, filepath = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w") as fdata:
+        fdata.write("{")
+        for section in range(sections):
+            if section:
+                fdata.write(",")
+            data = {"key%d" % key: "value%d" % key for key in range(keys)}
+            fdata.write('"section%d": %s' % (section, json.dumps(data)))
+        fdata.write("}")
+
+    size = os.path.getsize(filepath) / (1024.0 * 1024.0)
+
+    try:
+        click.echo("file size: %.1f MiB" % size)
+        click.echo("%12s %12s %12s" % ("mode", "time (s)", "peak (MiB)"))
+
+        for stream in [False, True]:
+            elapsed, peak = measure(config, filepath, stream)
+            click.echo("%12s %12.3f %12.1f" % (
+                "stream" if stream else "normal", elapsed, peak))
+    finally:
+        os.remove(filepath)
+        client.delete_prefix(BASE_FOLDER)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
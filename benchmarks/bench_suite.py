@@ -0,0 +1,318 @@
+"""
+Benchmark push, pull and dump of JSON, Yaml and INI configurations with
+different shapes: width (keys per level), depth (nesting levels), leaves
+and value size. Configurations are stored inside an in-process
+etcdgo.memory.MemoryBackend, so it doesn't need an etcd database and
+results only depend on etcdgo itself.
+
+For every format, shape and operation it reports latency percentiles,
+throughput, RPCs and peak memory. Results can be written to a JSON file
+and compared with the ones of another version, failing when an operation
+got slower than --max-regression percent.
+
+Usage:
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --compare results.json
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import statistics
+import tracemalloc
+import configparser
+import click
+import yaml
+import etcdgo
+import etcdgo.engine
+import etcdgo.memory
+
+BASE_FOLDER = "/bench_suite"
+
+# version of the results file format
+RESULTS_VERSION = 1
+
+FORMATS = ["json", "yaml", "ini"]
+
+# name: (width, depth, leaves, value size)
+SHAPES = {
+    "small": (10, 2, 100, 16),
+    "wide": (1000, 2, 10000, 16),
+    "deep": (4, 8, 10000, 16),
+    "large-values": (10, 2, 100, 16 * 1024),
+    "many-leaves": (100, 3, 20000, 32),
+}
+
+OPERATIONS = ["push", "pull", "dump"]
+
+
+class CountingBackend(etcdgo.memory.MemoryBackend):
+    """
+    In-process backend counting the requests it receives.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rpcs = 0
+
+    def get_range_response(self, range_start, range_end, **kwargs):
+        # pylint: disable=arguments-differ
+        self.rpcs += 1
+        return super().get_range_response(range_start, range_end, **kwargs)
+
+    def transaction_response(self, compare, success=None, failure=None):
+        self.rpcs += 1
+        return super().transaction_response(compare, success, failure)
+
+
+def build(width, depth, leaves, value_size):
+    """
+    Return a configuration holding leaves string values of value_size
+    characters, nested depth levels with width keys each. The top level
+    grows when leaves don't fit inside width ** depth.
+    """
+    data = dict()
+    for leaf in range(leaves):
+        node = data
+        for level in range(depth - 1, 0, -1):
+            index = leaf // width ** level
+            if level < depth - 1:
+                index %= width
+            node = node.setdefault("level%d_%d" % (level, index), dict())
+
+        value = "v%d-" % leaf
+        value = (value * (value_size // len(value) + 1))[:value_size]
+        node["key%d" % (leaf % width)] = value
+
+    return data
+
+
+def write(data, fmt, filepath):
+    """
+    Write a configuration in the given format.
+    """
+    with open(filepath, "w") as fdata:
+        if fmt == "json":
+            json.dump(data, fdata, sort_keys=True, indent=4)
+        elif fmt == "yaml":
+            yaml.dump(data, fdata, Dumper=getattr(
+                yaml, "CSafeDumper", yaml.SafeDumper))
+        else:
+            parser = configparser.ConfigParser()
+            parser.read_dict(data)
+            parser.write(fdata)
+
+
+def percentile(timings, percent):
+    """
+    Return the nearest-rank percentile of timings.
+    """
+    ordered = sorted(timings)
+    rank = max(int(round(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def measure(func, backend, repeat, reset=None):
+    """
+    Run func repeat times and return its timings in milliseconds, the
+    backend RPCs of a single run and its peak memory in MiB. reset is run
+    after every run, outside of the measures.
+    """
+    timings = []
+    rpcs = 0
+    for _ in range(repeat):
+        backend.rpcs = 0
+
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+        rpcs = backend.rpcs
+        if reset:
+            reset()
+
+    # tracing slows down execution, so memory is measured apart
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if reset:
+        reset()
+
+    return timings, rpcs, peak / (1024.0 * 1024.0)
+
+
+def run_case(fmt, shape, repeat, tmpdir):
+    """
+    Benchmark all the operations of a format and shape.
+    """
+    width, depth, leaves, value_size = SHAPES[shape]
+    if fmt == "ini":
+        # INI files hold sections of keys only
+        depth = 2
+
+    data = build(width, depth, leaves, value_size)
+    filepath = os.path.join(tmpdir, "%s.%s" % (shape, fmt))
+    write(data, fmt, filepath)
+    file_bytes = os.path.getsize(filepath)
+
+    backend = CountingBackend()
+    config = etcdgo.get_config(backend, fmt, basefolder=BASE_FOLDER)
+
+    config.push(shape, filepath)
+    if config.pull(shape) != data:
+        raise click.ClickException(
+            "%s %s: pulled configuration differs" % (fmt, shape))
+
+    def push():
+        config.push(shape, filepath)
+
+    def pull():
+        config.pull(shape)
+
+    def dump():
+        config.dump(shape)
+
+    def compact():
+        # a long running etcd compacts its history too
+        backend.compact(backend.revision)
+
+    results = []
+    for operation, func in zip(OPERATIONS, [push, pull, dump]):
+        timings, rpcs, peak = measure(
+            func, backend, repeat, compact if operation == "push" else None)
+
+        mean = statistics.mean(timings)
+        results.append({
+            "format": fmt,
+            "shape": shape,
+            "operation": operation,
+            "width": width,
+            "depth": depth,
+            "leaves": leaves,
+            "value_size": value_size,
+            "file_bytes": file_bytes,
+            "p50_ms": percentile(timings, 50),
+            "p99_ms": percentile(timings, 99),
+            "mean_ms": mean,
+            "keys_per_s": leaves / mean * 1000.0,
+            "mib_per_s": file_bytes / (1024.0 * 1024.0) / mean * 1000.0,
+            "rpcs": rpcs,
+            "peak_mib": peak,
+        })
+
+    backend.close()
+
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """
+    Print p50 latency changes against baseline results and return the
+    number of operations which got slower than max_regression percent.
+    """
+    previous = {
+        (item["format"], item["shape"], item["operation"]): item
+        for item in baseline["results"]
+    }
+
+    click.echo("")
+    click.echo("%6s %14s %10s %14s %14s %10s" % (
+        "format", "shape", "operation", "base p50 (ms)", "p50 (ms)",
+        "change"))
+
+    regressions = 0
+    for item in results:
+        old = previous.get((item["format"], item["shape"], item["operation"]))
+        if not old:
+            continue
+
+        change = (item["p50_ms"] / old["p50_ms"] - 1.0) * 100.0
+        mark = ""
+        if max_regression is not None and change > max_regression:
+            regressions += 1
+            mark = " !"
+
+        click.echo("%6s %14s %10s %14.2f %14.2f %+9.1f%%%s" % (
+            item["format"], item["shape"], item["operation"],
+            old["p50_ms"], item["p50_ms"], change, mark))
+
+    return regressions
+
+
+@click.command()
+@click.option('--format', '-f', 'formats', multiple=True,
+              type=click.Choice(FORMATS), help="Formats to measure.")
+@click.option('--shape', '-s', 'shapes', multiple=True,
+              type=click.Choice(sorted(SHAPES)), help="Shapes to measure.")
+@click.option('--repeat', '-r', default=5, type=click.INT)
+@click.option('--output', '-o', default=None, type=click.Path(),
+              help="Write results to a JSON file.")
+@click.option('--compare', '-c', 'baseline', default=None,
+              type=click.Path(exists=True),
+              help="Compare results with a JSON file of a previous run.")
+@click.option('--max-regression', '-m', default=None, type=click.FLOAT,
+              help="Fail if p50 latency grows more than this percentage.")
+def main(formats, shapes, repeat, output, baseline, max_regression):
+    """
+    Measure push/pull/dump performance over configurations of different
+    formats and shapes.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    formats = formats or FORMATS
+    shapes = shapes or sorted(SHAPES)
+
+    click.echo("%6s %14s %10s %10s %10s %12s %10s %6s %10s" % (
+        "format", "shape", "operation", "p50 (ms)", "p99 (ms)", "keys/s",
+        "MiB/s", "rpcs", "peak (MiB)"))
+
+    results = []
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for fmt in formats:
+            for shape in shapes:
+                for item in run_case(fmt, shape, repeat, tmpdir):
+                    results.append(item)
+                    click.echo(
+                        "%6s %14s %10s %10.2f %10.2f %12.0f %10.2f %6d "
+                        "%10.1f" % (
+                            item["format"], item["shape"],
+                            item["operation"], item["p50_ms"],
+                            item["p99_ms"], item["keys_per_s"],
+                            item["mib_per_s"], item["rpcs"],
+                            item["peak_mib"]))
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if output:
+        with open(output, "w") as fdata:
+            json.dump({
+                "version": RESULTS_VERSION,
+                "timestamp": time.time(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "engines": etcdgo.engine.names(),
+                "repeat": repeat,
+                "results": results,
+            }, fdata, sort_keys=True, indent=4)
+
+    if baseline:
+        with open(baseline, "r") as fdata:
+            regressions = compare(results, json.load(fdata), max_regression)
+
+        if regressions:
+            click.echo("%d operations regressed" % regressions)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    # pylint: disable=no-value-for-parameter
+    main()
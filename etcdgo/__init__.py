@@ -1,14 +1,49 @@
 """
-package definition.
+package definition. Submodules are imported the first time they are used,
+so importing the package doesn't load etcd3, grpc or the format parsers.
 
 Author:
     Andrea Cervesato <andrea.cervesato@mailbox.org>
 """
-import etcd3
-import etcdgo.config
+import importlib
 
+# submodules which are imported on first access
+_SUBMODULES = [
+    "aio",
+    "backend",
+    "cache",
+    "cluster",
+    "codec",
+    "command",
+    "compress",
+    "config",
+    "engine",
+    "etcd",
+    "memory",
+    "metrics",
+    "snapshot",
+    "stream",
+    "sync",
+    "watch",
+]
 
-def get_config(client, config_type, basefolder="/config"):
+
+def __getattr__(name):
+    """
+    Import a submodule on first access.
+    """
+    if name in _SUBMODULES:
+        return importlib.import_module("etcdgo." + name)
+
+    raise AttributeError("module 'etcdgo' has no attribute '%s'" % name)
+
+
+def get_config(
+        client,
+        config_type,
+        basefolder="/config",
+        asyncio=False,
+        **kwargs):
     """
     Return an object that can be used to push/pull configurations inside
     an etcd database.
@@ -31,27 +66,62 @@ def get_config(client, config_type, basefolder="/config"):
         # pull data from etcd database
         data = config.pull("myconfig")
 
+        # pull data from the closest cluster member
+        data = config.pull("myconfig", consistency="serializable")
+
+        # pull data using asyncio
+        import etcdgo.aio
+
+        async with etcdgo.aio.AsyncClient() as aclient:
+            config = etcdgo.get_config(aclient, "yaml", asyncio=True)
+            data = await config.pull("myconfig")
+
     Args:
-        client (etcd3.Etcd3Client): etcd client object.
+        client (etcd3.Etcd3Client): etcd client object, which is used
+            through etcdgo.etcd.Etcd3Backend. It can be a
+            etcdgo.cluster.ClusterClient, in order to spread serializable
+            reads across cluster members, or any other object
+            implementing etcdgo.backend.Backend, like
+            etcdgo.memory.MemoryBackend. It must be a
+            etcdgo.aio.AsyncClient when asyncio is True.
         config_type    (str): configuration type. Supported: json, yaml.
         basefolder     (str): root of the configuration inside the etcd database.
+        asyncio       (bool): return an asyncio configuration object.
+        kwargs        (dict): additional arguments given to the configuration
+            object. See ``etcdgo.config.Config``.
 
     Returns:
         Config: object to push/pull configurations inside an etcd database.
     """
-    if not client or not isinstance(client, etcd3.Etcd3Client):
-        raise ValueError("client must be of type etcd3.Etcd3Client")
+    # pylint: disable=redefined-outer-name,import-outside-toplevel
+    import etcdgo.config
+    import etcdgo.backend
+
+    if asyncio:
+        # grpc asyncio support is loaded only when it's needed
+        import etcdgo.aio as aio
+        return aio.get_config(
+            client,
+            config_type,
+            basefolder=basefolder,
+            **kwargs)
+
+    # raise ValueError if client can't be used
+    etcdgo.backend.adapt(client)
 
     if not config_type or not isinstance(config_type, str):
         raise ValueError("config_type must be a string")
 
     obj = None
     if config_type.lower() == "json":
-        obj = etcdgo.config.JsonConfig(client, basefolder=basefolder)
+        obj = etcdgo.config.JsonConfig(
+            client, basefolder=basefolder, **kwargs)
     elif config_type.lower() == "yaml":
-        obj = etcdgo.config.YamlConfig(client, basefolder=basefolder)
+        obj = etcdgo.config.YamlConfig(
+            client, basefolder=basefolder, **kwargs)
     elif config_type.lower() == "ini":
-        obj = etcdgo.config.IniConfig(client, basefolder=basefolder)
+        obj = etcdgo.config.IniConfig(
+            client, basefolder=basefolder, **kwargs)
     else:
         raise NotImplementedError("'%s' format is not supported" % config_type)
 
@@ -0,0 +1,465 @@
+"""
+asyncio configuration classes definition.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import asyncio
+import functools
+import grpc
+import grpc.aio
+import etcd3
+import etcd3.etcdrpc as etcdrpc
+import etcdgo.config
+import etcdgo.etcd
+
+
+def _handle_errors(func):
+    """
+    Translate gRPC errors into etcd3 exceptions, like etcd3.Etcd3Client
+    does.
+    """
+    @functools.wraps(func)
+    async def handler(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except grpc.aio.AioRpcError as exc:
+            exception = etcdgo.etcd.EXCEPTIONS_BY_CODE.get(exc.code())
+            if exception is None:
+                raise
+            raise exception()
+
+    return handler
+
+
+async def _drive(steps, send):
+    """
+    asyncio version of etcdgo.config._drive, where send is a coroutine
+    function.
+    """
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(await send(request))
+    except StopIteration as exc:
+        return exc.value
+
+
+class AsyncClient:
+    """
+    asyncio etcd client. All requests share a single gRPC channel, so
+    concurrent requests are multiplexed over the same connection.
+
+    Examples:
+
+        import etcdgo
+        import etcdgo.aio
+
+        async def main():
+            async with etcdgo.aio.AsyncClient("localhost", 2379) as client:
+                config = etcdgo.get_config(client, "json", asyncio=True)
+                data = await config.pull("myconfig")
+    """
+
+    def __init__(self, host="localhost", port=2379, timeout=None):
+        """
+        Args:
+            host     (str): etcd database hostname.
+            port     (int): etcd database port.
+            timeout (float): requests timeout in seconds.
+        """
+        self.timeout = timeout
+        self.transactions = etcd3.Transactions()
+        self.channel = grpc.aio.insecure_channel(
+            "{0}:{1}".format(host, port))
+        self.kvstub = etcdrpc.KVStub(self.channel)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the gRPC channel.
+        """
+        await self.channel.close()
+
+    @_handle_errors
+    async def get_range_response(
+            self,
+            range_start,
+            range_end,
+            limit=None,
+            revision=None,
+            keys_only=False,
+            serializable=False):
+        """
+        Get a range of keys.
+
+        Args:
+            range_start (bytes): first key in range.
+            range_end   (bytes): end of the range, excluded.
+            limit         (int): maximum number of keys to return.
+            revision      (int): revision to read at.
+            keys_only    (bool): return keys without their values.
+            serializable (bool): read from the local member, without going
+                through the cluster leader.
+
+        Returns:
+            etcdrpc.RangeResponse: range response.
+        """
+        request = etcdgo.etcd.range_request(
+            range_start,
+            range_end,
+            limit=limit,
+            revision=revision,
+            keys_only=keys_only,
+            serializable=serializable)
+
+        return await self.kvstub.Range(request, timeout=self.timeout)
+
+    @_handle_errors
+    async def transaction_response(self, compare, success=None, failure=None):
+        """
+        Perform a transaction.
+
+        Args:
+            compare (list): comparisons to make.
+            success (list): operations performed if comparisons are true.
+            failure (list): operations performed if comparisons are false.
+
+        Returns:
+            etcdrpc.TxnResponse: transaction status, list of responses and
+                revision of the database after the transaction.
+        """
+        request = etcdgo.etcd.txn_request(
+            compare,
+            success=success,
+            failure=failure)
+
+        return await self.kvstub.Txn(request, timeout=self.timeout)
+
+    async def transaction(self, compare, success=None, failure=None):
+        """
+        Perform a transaction.
+
+        Returns:
+            tuple: transaction status and list of responses.
+        """
+        response = await self.transaction_response(
+            compare,
+            success=success,
+            failure=failure)
+
+        return response.succeeded, list(response.responses)
+
+
+class AsyncConfig(etcdgo.config.Config):
+    """
+    Base asyncio configuration to push/pull configurations inside an etcd
+    database. Formats are shared with the blocking configuration classes and
+    files are parsed inside the default executor, so the event loop is never
+    blocked.
+    """
+
+    @staticmethod
+    def _backend(client):
+        # AsyncClient is checked by get_config
+        return client
+
+    async def _range_async(
+            self,
+            prefix,
+            stats=None,
+            revision=None,
+            keys_only=False,
+            serializable=False,
+            end=None):
+        """
+        asyncio version of Config._range.
+        """
+        steps = self._range_steps(
+            prefix,
+            stats=stats,
+            revision=revision,
+            keys_only=keys_only,
+            serializable=serializable,
+            end=end)
+
+        return await _drive(steps, lambda request: (
+            self._client.get_range_response(*request[0], **request[1])))
+
+    async def _commit_async(self, ops, stats, guard=None, revision=None):
+        """
+        asyncio version of Config._commit.
+        """
+        steps = self._commit_steps(ops, stats, guard=guard, revision=revision)
+
+        return await _drive(steps, lambda request: (
+            self._client.transaction_response(**request)))
+
+    async def push(self, name, filepath, incremental=False):
+        """
+        asyncio version of Config.push.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        if not filepath or not isinstance(filepath, str):
+            raise ValueError("filepath must be a string")
+
+        self._logger.info("pushing '%s' with name '%s'", filepath, name)
+
+        if self._blob and incremental:
+            raise ValueError("blob push can't be incremental")
+
+        if self._publish:
+            raise NotImplementedError(
+                "publish is not supported by asyncio configs")
+
+        config_path = self._config_prefix(name)
+        stats = etcdgo.config.PushStats()
+        loop = asyncio.get_running_loop()
+        chunk_ids = set()
+
+        guard = None
+        revision = None
+        if self._blob:
+            ops = await loop.run_in_executor(
+                None,
+                self._blob_ops,
+                config_path,
+                filepath,
+                stats)
+        else:
+            items = await loop.run_in_executor(
+                None,
+                self._items,
+                config_path,
+                filepath,
+                stats,
+                chunk_ids)
+
+            stats.keys = len(items)
+
+            if incremental:
+                kvs, revision = await self._range_async(
+                    config_path,
+                    stats=stats)
+                ops = self._diff(items, kvs)
+                guard = config_path
+            else:
+                ops = self._flat_ops(config_path, (
+                    self._client.transactions.put(key, value)
+                    for key, value in items.items()
+                ), chunk_ids)
+
+        if not await self._commit_async(
+                ops,
+                stats,
+                guard=guard,
+                revision=revision):
+            raise etcdgo.config.ConcurrentUpdateError(
+                "'%s' has been modified during push" % name)
+
+        if stats.revision is None:
+            stats.revision = revision
+
+        self._logger.info("configuration pushed: %s", stats)
+
+        return stats
+
+    async def pull(self, name, revision=None, consistency=None):
+        """
+        asyncio version of Config.pull.
+        """
+        # pylint: disable=protected-access
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        if revision is not None and \
+                (not isinstance(revision, int) or revision <= 0):
+            raise ValueError("revision must be a positive integer")
+
+        if consistency is not None:
+            etcdgo.config._check_consistency(consistency)
+
+        self._logger.info("fetching '%s'", name)
+
+        serializable = (consistency or self._consistency) == \
+            etcdgo.config.SERIALIZABLE
+
+        config_path = self._config_prefix(name)
+        kvs, revision = await self._range_async(
+            config_path,
+            revision=revision,
+            serializable=serializable)
+        path, kvs = self._resolve(config_path, kvs)
+        config = self._decode(path, kvs)
+
+        self._logger.info("configuration fetched")
+
+        return etcdgo.config.ConfigData(config, revision)
+
+    async def dump(self, name, revision=None, consistency=None):
+        """
+        asyncio version of Config.dump.
+        """
+        data = await self.pull(
+            name,
+            revision=revision,
+            consistency=consistency)
+        data_str = self._convert_to_str(data)
+
+        return data_str
+
+    async def list(self):
+        """
+        asyncio version of Config.list.
+        """
+        kvs, _ = await self._range_async(
+            self._basefolder + "/",
+            keys_only=True)
+
+        return self._infos(kvs)
+
+    async def delete(self, name):
+        """
+        asyncio version of Config.delete.
+        """
+        ops = self._delete_ops(name)
+
+        self._logger.info("deleting '%s'", name)
+
+        _, responses = await self._client.transaction(
+            compare=[],
+            success=ops,
+            failure=[])
+
+        return sum(
+            response.response_delete_range.deleted
+            for response in responses)
+
+    async def _run_many_async(self, func, names, concurrency):
+        """
+        asyncio version of Config._run_many.
+        """
+        result = etcdgo.config.BulkResult()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _run(name):
+            async with semaphore:
+                try:
+                    result.results[name] = await func(name)
+                except Exception as exc:
+                    self._logger.error("'%s' failed: %s", name, exc)
+                    result.errors[name] = exc
+
+        await asyncio.gather(*[_run(name) for name in names])
+
+        return result
+
+    async def push_many(self, configs, concurrency=8, **kwargs):
+        """
+        asyncio version of Config.push_many.
+        """
+        # pylint: disable=protected-access,invalid-overridden-method
+        if not isinstance(configs, dict):
+            raise ValueError("configs must be a dictionary")
+
+        etcdgo.config._check_concurrency(concurrency)
+
+        return await self._run_many_async(
+            lambda name: self.push(name, configs[name], **kwargs),
+            list(configs.keys()),
+            concurrency)
+
+    async def pull_many(
+            self,
+            names,
+            concurrency=8,
+            revision=None,
+            consistency=None):
+        """
+        asyncio version of Config.pull_many.
+        """
+        # pylint: disable=protected-access,invalid-overridden-method
+        if not isinstance(names, (list, tuple, set)):
+            raise ValueError("names must be a list")
+
+        etcdgo.config._check_concurrency(concurrency)
+
+        return await self._run_many_async(
+            lambda name: self.pull(
+                name,
+                revision=revision,
+                consistency=consistency),
+            list(names),
+            concurrency)
+
+    def lazy(self, name, revision=None, consistency=None):
+        raise NotImplementedError("lazy is not supported by asyncio configs")
+
+    def watch(self, name, callback):
+        raise NotImplementedError("watch is not supported by asyncio configs")
+
+    def rollback(self, name, generation=None):
+        raise NotImplementedError(
+            "rollback is not supported by asyncio configs")
+
+
+class AsyncJsonConfig(AsyncConfig, etcdgo.config.JsonConfig):
+    """
+    Push/pull JSON configurations inside an etcd database using asyncio.
+    """
+
+
+class AsyncYamlConfig(AsyncConfig, etcdgo.config.YamlConfig):
+    """
+    Push/pull Yaml configurations inside an etcd database using asyncio.
+    """
+
+
+class AsyncIniConfig(AsyncConfig, etcdgo.config.IniConfig):
+    """
+    Push/pull INI configurations inside an etcd database using asyncio.
+    """
+
+
+def get_config(client, config_type, basefolder="/config", **kwargs):
+    """
+    Return an object that can be used to push/pull configurations inside
+    an etcd database using asyncio. See etcdgo.get_config.
+
+    Args:
+        client   (AsyncClient): etcd client object.
+        config_type      (str): configuration type. Supported: json, yaml,
+            ini.
+        basefolder       (str): root of the configuration inside the etcd
+            database.
+        kwargs          (dict): additional arguments given to the
+            configuration object.
+
+    Returns:
+        AsyncConfig: object to push/pull configurations inside an etcd
+            database.
+    """
+    if not client or not isinstance(client, AsyncClient):
+        raise ValueError("client must be of type etcdgo.aio.AsyncClient")
+
+    if not config_type or not isinstance(config_type, str):
+        raise ValueError("config_type must be a string")
+
+    obj = None
+    if config_type.lower() == "json":
+        obj = AsyncJsonConfig(client, basefolder=basefolder, **kwargs)
+    elif config_type.lower() == "yaml":
+        obj = AsyncYamlConfig(client, basefolder=basefolder, **kwargs)
+    elif config_type.lower() == "ini":
+        obj = AsyncIniConfig(client, basefolder=basefolder, **kwargs)
+    else:
+        raise NotImplementedError("'%s' format is not supported" % config_type)
+
+    return obj
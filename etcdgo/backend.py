@@ -0,0 +1,410 @@
+"""
+Key/value backend protocol definition.
+
+Configuration objects don't depend on etcd3: they talk to any object which
+implements the interface described by Backend, which follows the
+etcd3.Etcd3Client one. etcd3.Etcd3Client objects are wrapped by
+etcdgo.etcd.Etcd3Backend, which sends the requests the way the protocol
+describes them, while other backends, like etcdgo.memory.MemoryBackend,
+can use the messages defined here instead of the etcd3 ones.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+
+# methods which must be implemented by a backend
+_METHODS = [
+    "get_range_response",
+    "transaction_response",
+    "add_watch_prefix_callback",
+    "cancel_watch",
+]
+
+
+def to_bytes(data):
+    """
+    Return data encoded as UTF-8, if it's a string. Keys and values can be
+    given as strings, like with etcd3.
+
+    Args:
+        data (object): string or bytes.
+
+    Returns:
+        bytes: encoded data.
+    """
+    if isinstance(data, str):
+        return data.encode('utf-8')
+
+    return data
+
+
+def is_backend(obj):
+    """
+    Return True if obj implements the backend protocol.
+
+    Args:
+        obj (object): object to check.
+
+    Returns:
+        bool: True if obj can be used as backend.
+    """
+    return all(callable(getattr(obj, name, None)) for name in _METHODS)
+
+
+def adapt(client):
+    """
+    Return the backend of a client: the client itself if it implements the
+    backend protocol, or an etcdgo.etcd.Etcd3Backend if it's an
+    etcd3.Etcd3Client.
+
+    Args:
+        client (object): backend or etcd client.
+
+    Returns:
+        Backend: client backend.
+    """
+    if client and is_backend(client):
+        return client
+
+    if client:
+        # etcd3 is loaded only when it's needed
+        import etcd3  # pylint: disable=import-outside-toplevel
+        import etcdgo.etcd  # pylint: disable=import-outside-toplevel
+
+        if isinstance(client, etcd3.Etcd3Client):
+            return etcdgo.etcd.Etcd3Backend(client)
+
+    raise ValueError("client must implement etcdgo.backend.Backend")
+
+
+class KeyValue:
+    """
+    A stored key/value pair, together with its revisions.
+    """
+    # pylint: disable=too-few-public-methods,too-many-arguments
+    __slots__ = ["key", "value", "create_revision", "mod_revision", "version"]
+
+    def __init__(self, key, value, create_revision, mod_revision, version):
+        self.key = key
+        self.value = value
+        self.create_revision = create_revision
+        self.mod_revision = mod_revision
+        self.version = version
+
+    def __repr__(self):
+        return "KeyValue(%r, %r, mod_revision=%d)" % (
+            self.key, self.value, self.mod_revision)
+
+
+class ResponseHeader:
+    """
+    Header of a backend response.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision):
+        self.revision = revision
+
+
+class RangeResponse:
+    """
+    Response of a range request.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision, kvs, more=False, count=None):
+        self.header = ResponseHeader(revision)
+        self.kvs = kvs
+        self.more = more
+        self.count = len(kvs) if count is None else count
+
+
+class PutResponse:
+    """
+    Response of a put operation.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision):
+        self.header = ResponseHeader(revision)
+
+
+class DeleteRangeResponse:
+    """
+    Response of a delete operation.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision, deleted):
+        self.header = ResponseHeader(revision)
+        self.deleted = deleted
+
+
+class TxnResponse:
+    """
+    Response of a transaction.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision, succeeded, responses):
+        self.header = ResponseHeader(revision)
+        self.succeeded = succeeded
+        self.responses = responses
+
+
+class ResponseOp:
+    """
+    Response of a transaction operation.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, response_put=None, response_delete_range=None):
+        self.response_put = response_put
+        self.response_delete_range = response_delete_range
+
+
+class WatchResponse:
+    """
+    Events notified to a watch callback.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, revision, events):
+        self.header = ResponseHeader(revision)
+        self.events = events
+
+
+class PutEvent:
+    """
+    A key has been written.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, kv):
+        self.key = kv.key
+        self.value = kv.value
+        self.create_revision = kv.create_revision
+        self.mod_revision = kv.mod_revision
+        self.version = kv.version
+
+
+class DeleteEvent(PutEvent):
+    """
+    A key has been deleted.
+    """
+    # pylint: disable=too-few-public-methods
+
+
+class Put:
+    """
+    Transaction operation writing a key.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, key, value):
+        self.key = to_bytes(key)
+        self.value = to_bytes(value)
+
+
+class Delete:
+    """
+    Transaction operation deleting a key, or all the keys in range
+    [key, range_end).
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, key, range_end=None):
+        self.key = to_bytes(key)
+        self.range_end = to_bytes(range_end)
+
+
+class Compare:
+    """
+    Transaction comparison of a key, or of all the keys in range
+    [key, range_end). The target is compared with the operator it's used
+    with, like ``Mod(key) < revision``.
+    """
+    # name of the compared KeyValue attribute
+    TARGET = None
+
+    def __init__(self, key, range_end=None):
+        self.key = to_bytes(key)
+        self.range_end = to_bytes(range_end)
+        self.value = None
+        self.op = None
+
+    def _set(self, op, value):
+        """
+        Set the operator and the value of the comparison.
+        """
+        self.op = op
+        self.value = to_bytes(value)
+        return self
+
+    def __eq__(self, other):
+        return self._set("==", other)
+
+    def __ne__(self, other):
+        return self._set("!=", other)
+
+    def __lt__(self, other):
+        return self._set("<", other)
+
+    def __gt__(self, other):
+        return self._set(">", other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "%s(%r, range_end=%r) %s %r" % (
+            self.__class__.__name__, self.key, self.range_end, self.op,
+            self.value)
+
+
+class Value(Compare):
+    """
+    Compare the value of a key.
+    """
+    TARGET = "value"
+
+
+class Version(Compare):
+    """
+    Compare the number of writes of a key since its creation.
+    """
+    TARGET = "version"
+
+
+class Create(Compare):
+    """
+    Compare the revision a key has been created at.
+    """
+    TARGET = "create_revision"
+
+
+class Mod(Compare):
+    """
+    Compare the revision a key has been last modified at.
+    """
+    TARGET = "mod_revision"
+
+
+class Transactions:
+    """
+    Factory of transaction operations and comparisons, like
+    etcd3.Transactions.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.put = Put
+        self.delete = Delete
+        self.value = Value
+        self.version = Version
+        self.create = Create
+        self.mod = Mod
+
+
+class Backend:
+    """
+    Key/value backend protocol. Keys and values are bytes and every write
+    increments the backend revision. Methods follow etcd3.Etcd3Client.
+    """
+
+    def __init__(self):
+        self.transactions = Transactions()
+
+    def get_range_response(
+            self,
+            range_start,
+            range_end,
+            limit=None,
+            revision=None,
+            keys_only=False,
+            serializable=False):
+        """
+        Get the keys in range [range_start, range_end), sorted by key.
+
+        Args:
+            range_start (bytes): first key in range.
+            range_end   (bytes): end of the range, excluded. If None, only
+                range_start is read. If b'\\0', all the keys following
+                range_start are read.
+            limit          (int): maximum number of keys to return.
+            revision       (int): revision to read at. If None, the latest
+                revision is read.
+            keys_only     (bool): return keys without their values.
+            serializable  (bool): read from any replica.
+
+        Returns:
+            RangeResponse: range response.
+        """
+        # pylint: disable=too-many-arguments
+        raise NotImplementedError()
+
+    def transaction_response(self, compare, success=None, failure=None):
+        """
+        Atomically apply the success operations if all the comparisons
+        succeed, or the failure ones if they don't. All the writes of a
+        transaction share the same revision.
+
+        Args:
+            compare (list): comparisons built with transactions.
+            success (list): operations built with transactions.
+            failure (list): operations built with transactions.
+
+        Returns:
+            TxnResponse: True if comparisons succeeded, the list of
+                ResponseOp of the applied operations and the revision of
+                the database once the transaction has been applied.
+        """
+        raise NotImplementedError()
+
+    def transaction(self, compare, success=None, failure=None):
+        """
+        Apply a transaction, like transaction_response.
+
+        Returns:
+            tuple: True if comparisons succeeded and the list of ResponseOp
+                of the applied operations.
+        """
+        response = self.transaction_response(
+            compare,
+            success=success,
+            failure=failure)
+
+        return response.succeeded, list(response.responses)
+
+    def add_watch_prefix_callback(
+            self,
+            key_prefix,
+            callback,
+            start_revision=None):
+        """
+        Call callback with a WatchResponse every time keys starting with
+        key_prefix change, or with an exception if watch fails.
+
+        Args:
+            key_prefix    (bytes): keys prefix.
+            callback   (function): function called on changes.
+            start_revision  (int): first revision to notify. If None,
+                only the following changes are notified.
+
+        Returns:
+            int: watch id.
+        """
+        raise NotImplementedError()
+
+    def cancel_watch(self, watch_id):
+        """
+        Stop a watch.
+
+        Args:
+            watch_id (int): watch id returned by add_watch_prefix_callback.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Release the backend resources.
+        """
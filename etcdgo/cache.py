@@ -0,0 +1,225 @@
+"""
+Configuration cache definition.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import logging
+import threading
+import collections
+
+
+class _Entry:
+    """
+    A cached configuration.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, data, revision):
+        self.data = data
+        self.revision = revision
+        self.watch_id = None
+        self.valid = True
+
+
+class CachedConfig:
+    """
+    Keep pulled configurations in memory. Every cached configuration is
+    watched, so it's invalidated as soon as it changes inside the etcd
+    database and the following pull fetches it again. When the cache is full,
+    the least recently used configuration is evicted.
+
+    Pulled dictionaries are shared between callers and they must not be
+    modified.
+
+    Examples:
+
+        import etcd3
+        import etcdgo
+        import etcdgo.cache
+
+        client = etcd3.Etcd3Client()
+        config = etcdgo.get_config(client, "json")
+
+        cache = etcdgo.cache.CachedConfig(config, maxsize=64)
+        data = cache.pull("myconfig")
+    """
+
+    def __init__(self, config, maxsize=128):
+        """
+        Args:
+            config (Config): configuration object to cache.
+            maxsize   (int): maximum number of cached configurations.
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+
+        self._logger = logging.getLogger("cache")
+        self._config = config
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def _cancel(self, entry):
+        """
+        Cancel the watch of an entry, if any.
+        """
+        # pylint: disable=protected-access
+        with self._lock:
+            entry.valid = False
+            watch_id = entry.watch_id
+            entry.watch_id = None
+
+        if watch_id is not None:
+            self._config._cancel_watch(watch_id)
+
+    def _drop(self, name, entry):
+        """
+        Remove an entry from cache if it's still the cached one.
+        """
+        with self._lock:
+            if self._entries.get(name) is entry:
+                del self._entries[name]
+
+        self._cancel(entry)
+
+    def _watch(self, name, entry):
+        """
+        Start watching a cached configuration.
+        """
+        # pylint: disable=protected-access
+        def _callback(response):
+            if isinstance(response, Exception):
+                self._logger.warning(
+                    "watch on '%s' failed: %s", name, response)
+            elif not response.events:
+                return
+
+            self._logger.debug("invalidating '%s'", name)
+            self._drop(name, entry)
+
+        watch_id = self._config._watch(
+            name,
+            _callback,
+            start_revision=entry.revision + 1)
+
+        with self._lock:
+            if entry.valid:
+                entry.watch_id = watch_id
+                return
+
+        # entry has been invalidated before the watch id was known
+        self._config._cancel_watch(watch_id)
+
+    def pull(self, name):
+        """
+        Pull a configuration from cache, or from the etcd database if it's
+        not cached yet.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            ConfigData: configuration stored inside the database.
+        """
+        # pylint: disable=protected-access
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return entry.data
+
+            self.misses += 1
+
+        data = self._config._fetch(name)
+        entry = _Entry(data, data.revision)
+
+        evicted = []
+        with self._lock:
+            replaced = self._entries.pop(name, None)
+            if replaced:
+                evicted.append(replaced)
+
+            self._entries[name] = entry
+
+            while len(self._entries) > self._maxsize:
+                _, old = self._entries.popitem(last=False)
+                evicted.append(old)
+
+        for old in evicted:
+            self._cancel(old)
+
+        try:
+            self._watch(name, entry)
+        except Exception:
+            self._drop(name, entry)
+            raise
+
+        return data
+
+    def dump(self, name):
+        """
+        Pull a configuration from cache and convert it to string.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            str: configuration as string.
+        """
+        # pylint: disable=protected-access
+        return self._config._convert_to_str(self.pull(name))
+
+    def push(self, name, filepath, **kwargs):
+        """
+        Push a configuration and invalidate its cached copy.
+
+        Args:
+            name     (str): name to associate with file.
+            filepath (str): path of the file to be pushed.
+            kwargs  (dict): see Config.push.
+
+        Returns:
+            PushStats: statistics about the push.
+        """
+        self.invalidate(name)
+        return self._config.push(name, filepath, **kwargs)
+
+    def invalidate(self, name=None):
+        """
+        Remove a configuration from cache. If name is None, all
+        configurations are removed.
+
+        Args:
+            name (str): name associated with the configuration.
+        """
+        with self._lock:
+            if name is None:
+                entries = list(self._entries.values())
+                self._entries.clear()
+            else:
+                entry = self._entries.pop(name, None)
+                entries = [entry] if entry else []
+
+        for entry in entries:
+            self._cancel(entry)
+
+    def close(self):
+        """
+        Remove all cached configurations and stop watching them.
+        """
+        self.invalidate()
@@ -0,0 +1,131 @@
+"""
+etcd cluster client definition.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import logging
+import itertools
+import grpc
+import etcd3
+import etcd3.exceptions
+import etcdgo.etcd
+
+# errors which make a serializable read try the next endpoint
+_RETRY_EXCEPTIONS = (
+    etcd3.exceptions.ConnectionFailedError,
+    etcd3.exceptions.ConnectionTimeoutError,
+)
+
+
+def _is_future_revision(exc):
+    """
+    Return True if a read failed because the member didn't apply the
+    requested revision yet.
+    """
+    return isinstance(exc, grpc.RpcError) and \
+        exc.code() == grpc.StatusCode.OUT_OF_RANGE and \
+        "future revision" in (exc.details() or "")
+
+
+class ClusterClient:
+    """
+    etcd client connected to all the members of a cluster. Serializable
+    reads are spread across members in round robin, so read throughput
+    scales with the cluster size, and a member which is not reachable or
+    lags behind the requested revision is skipped. All the other requests
+    are sent to the first endpoint. Members are reached through
+    etcdgo.etcd.Etcd3Backend, so the client implements
+    etcdgo.backend.Backend.
+
+    Examples:
+
+        import etcdgo
+        import etcdgo.cluster
+
+        client = etcdgo.cluster.ClusterClient([
+            ("10.0.1.21", 2379),
+            ("10.0.1.22", 2379),
+            ("10.0.1.23", 2379),
+        ])
+
+        config = etcdgo.get_config(client, "json", consistency="serializable")
+        data = config.pull("myconfig")
+    """
+
+    def __init__(self, endpoints, **kwargs):
+        """
+        Args:
+            endpoints (list): (host, port) tuples of the cluster members.
+            kwargs    (dict): additional arguments given to every
+                etcd3.Etcd3Client.
+        """
+        if not endpoints or not isinstance(endpoints, (list, tuple)):
+            raise ValueError("endpoints must be a list of (host, port)")
+
+        self._logger = logging.getLogger("cluster")
+        self.clients = [
+            etcdgo.etcd.Etcd3Backend(etcd3.Etcd3Client(host, port, **kwargs))
+            for host, port in endpoints
+        ]
+        self._next = itertools.count()
+
+    def __getattr__(self, name):
+        return getattr(self.clients[0], name)
+
+    def get_range_response(
+            self,
+            range_start,
+            range_end,
+            serializable=False,
+            **kwargs):
+        """
+        Get a range of keys. Serializable reads are served by the next
+        member in round robin, while linearizable reads are sent to the
+        first endpoint.
+
+        Args:
+            range_start (bytes): first key in range.
+            range_end   (bytes): end of the range, excluded.
+            serializable (bool): read from the local member, without going
+                through the cluster leader.
+            kwargs       (dict): see etcdgo.backend.Backend.get_range_response.
+
+        Returns:
+            etcdrpc.RangeResponse: range response.
+        """
+        if not serializable:
+            return self.clients[0].get_range_response(
+                range_start,
+                range_end,
+                **kwargs)
+
+        start = next(self._next)
+        for index in range(len(self.clients)):
+            client = self.clients[(start + index) % len(self.clients)]
+
+            try:
+                return client.get_range_response(
+                    range_start,
+                    range_end,
+                    serializable=True,
+                    **kwargs)
+            except Exception as exc:
+                if not isinstance(exc, _RETRY_EXCEPTIONS) and \
+                        not _is_future_revision(exc):
+                    raise
+
+                self._logger.debug("serializable read failed: %s", exc)
+
+        # no member can serve the read, so the leader does
+        return self.clients[0].get_range_response(
+            range_start,
+            range_end,
+            **kwargs)
+
+    def close(self):
+        """
+        Close the connections to all the members.
+        """
+        for client in self.clients:
+            client.close()
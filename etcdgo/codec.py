@@ -0,0 +1,162 @@
+"""
+Conversion between nested dictionaries and slash separated paths.
+
+Every key of a nested dictionary becomes a path segment. Slashes and
+percent signs inside keys are escaped, so any key can be stored and read
+back. Both directions are iterative, so nesting depth is not limited by the
+recursion limit.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import re
+
+# separator of the path segments
+SEPARATOR = "/"
+
+_ESCAPE = {"%": "%25", "/": "%2F"}
+
+_UNESCAPE = {"%25": "%", "%2F": "/"}
+
+_ESCAPED = re.compile("%(25|2F)")
+
+
+def escape(key):
+    """
+    Convert a dictionary key into a path segment.
+
+    Args:
+        key (object): dictionary key.
+
+    Returns:
+        str: path segment.
+    """
+    key = str(key)
+    if "%" in key or "/" in key:
+        return "".join(_ESCAPE.get(char, char) for char in key)
+
+    return key
+
+
+def unescape(segment):
+    """
+    Convert a path segment into the dictionary key it has been made from.
+
+    Args:
+        segment (str): path segment.
+
+    Returns:
+        str: dictionary key.
+    """
+    if "%" not in segment:
+        return segment
+
+    return _ESCAPED.sub(lambda match: _UNESCAPE[match.group(0)], segment)
+
+
+def join(path, key):
+    """
+    Append a dictionary key to a path.
+
+    Args:
+        path (str): path, or None for the root.
+        key  (object): dictionary key.
+
+    Returns:
+        str: path of key.
+    """
+    if path is None:
+        return escape(key)
+
+    return path + SEPARATOR + escape(key)
+
+
+def split(path):
+    """
+    Return the dictionary keys leading to a path.
+
+    Args:
+        path (str): slash separated path.
+
+    Returns:
+        list: dictionary keys.
+    """
+    return [unescape(segment) for segment in path.split(SEPARATOR)]
+
+
+def flatten(data, path=None):
+    """
+    Return the leaves of a nested dictionary, in dictionary order. Empty
+    dictionaries have no leaves.
+
+    Args:
+        data (dict): nested dictionary.
+        path  (str): path of data, or None for the root.
+
+    Returns:
+        generator: (path, value) leaves.
+    """
+    prefix = "" if path is None else path + SEPARATOR
+    stack = [(prefix, iter(data.items()))]
+
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            key_path = prefix + escape(key)
+            if isinstance(value, dict):
+                stack.append((key_path + SEPARATOR, iter(value.items())))
+                break
+
+            yield key_path, value
+        else:
+            stack.pop()
+
+
+def unflatten(items):
+    """
+    Build a nested dictionary from its leaves. Paths are bytes, like the
+    etcd keys they are read from, and they are faster to unflatten when
+    sorted, since consecutive leaves usually share their parent. When a
+    path is both a value and a dictionary, the last one wins.
+
+    Args:
+        items (iterable): (path, value) leaves, where path is a slash
+            separated path of UTF-8 bytes.
+
+    Returns:
+        dict: nested dictionary.
+    """
+    root = dict()
+    keys = dict()
+    last_parent = None
+    last_node = root
+
+    for path, value in items:
+        parent, _, leaf = path.rpartition(b'/')
+
+        if parent != last_parent:
+            node = root
+            if parent:
+                for segment in parent.split(b'/'):
+                    key = keys.get(segment)
+                    if key is None:
+                        key = unescape(segment.decode('utf-8'))
+                        keys[segment] = key
+
+                    child = node.get(key)
+                    if not isinstance(child, dict):
+                        child = dict()
+                        node[key] = child
+                    node = child
+
+            last_parent = parent
+            last_node = node
+
+        key = keys.get(leaf)
+        if key is None:
+            key = unescape(leaf.decode('utf-8'))
+            keys[leaf] = key
+
+        last_node[key] = value
+
+    return root
@@ -6,19 +6,34 @@ Author:
 """
 import os
 import click
-import etcd3
 import etcdgo
 
 
 class Arguments:
     """
-    Default program arguments.
+    Default program arguments. The etcd client is created the first time
+    it's used, so commands which don't need it, like --help, don't load the
+    etcd3 library.
     """
     # pylint: disable=too-few-public-methods
 
     def __init__(self):
-        self.client = None
+        self.hostname = None
+        self.port = None
         self.base_folder = None
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        etcd client.
+        """
+        # pylint: disable=import-outside-toplevel
+        if self._client is None:
+            import etcd3
+            self._client = etcd3.Etcd3Client(self.hostname, self.port)
+
+        return self._client
 
 
 # pylint: disable=invalid-name
@@ -61,7 +76,8 @@ def cli(args, hostname, port, base_folder):
     """
     Etcdgo command line to push/pull configurations.
     """
-    args.client = etcd3.Etcd3Client(hostname, port)
+    args.hostname = hostname
+    args.port = port
     args.base_folder = base_folder
 
 
@@ -86,14 +102,8 @@ def push(args, label, config):
     if not filename:
         raise ValueError("filename can't be empty.")
 
-    config_type = None
-    if fileext == ".json":
-        config_type = "json"
-    elif fileext in [".yaml", ".yml"]:
-        config_type = "yaml"
-    elif fileext == ".ini":
-        config_type = "ini"
-    else:
+    config_type = etcdgo.sync.EXTENSIONS.get(fileext)
+    if not config_type:
         raise ValueError("'%s' extension type is not supported." % fileext)
 
     config_client = etcdgo.get_config(
@@ -130,3 +140,91 @@ def pull(args, label, output_type):
 
     data_str = config_client.dump(label)
     click.echo(data_str)
+
+
+@cli.command()
+@pass_arguments
+def ls(args):
+    """
+    List configurations with their number of keys and last modification
+    revision.
+    """
+    # pylint: disable=invalid-name
+    config_client = etcdgo.get_config(
+        args.client,
+        "json",
+        basefolder=args.base_folder)
+
+    for info in config_client.list():
+        click.echo("%s\t%d\t%d" % (info.name, info.keys, info.mod_revision))
+
+
+@cli.command()
+@click.argument("label")
+@pass_arguments
+def rm(args, label):
+    """
+    Delete a configuration.
+    """
+    # pylint: disable=invalid-name
+    if not label:
+        raise ValueError("label can't be empty.")
+
+    config_client = etcdgo.get_config(
+        args.client,
+        "json",
+        basefolder=args.base_folder)
+
+    deleted = config_client.delete(label)
+    if not deleted:
+        raise ValueError("configuration doesn't exist.")
+
+
+@cli.command()
+@click.option(
+    '--manifest',
+    '-m',
+    default=None,
+    type=click.STRING,
+    help="Manifest file (default: <directory>/.etcdgo-sync.json)")
+@click.option(
+    '--delete',
+    '-d',
+    is_flag=True,
+    help="Delete configurations whose files have been removed")
+@click.option(
+    '--concurrency',
+    '-c',
+    default=8,
+    type=click.INT,
+    help="Maximum number of concurrent pushes (default: 8)")
+@click.argument("directory")
+@pass_arguments
+def sync(args, directory, manifest, delete, concurrency):
+    """
+    Push the configuration files of a directory which changed since the
+    last sync. Files are labeled by their relative path.
+    """
+    if not directory:
+        raise ValueError("directory can't be empty.")
+
+    result = etcdgo.sync.sync(
+        args.client,
+        directory,
+        basefolder=args.base_folder,
+        manifest=manifest,
+        target="%s:%d" % (args.hostname, args.port),
+        delete=delete,
+        concurrency=concurrency)
+
+    for label, exc in sorted(result.errors.items()):
+        click.echo("%s: %s" % (label, exc))
+
+    click.echo("pushed %d, unchanged %d, deleted %d, failed %d" % (
+        len(result.pushed),
+        len(result.unchanged),
+        len(result.deleted),
+        len(result.errors)))
+
+    if not result.ok:
+        raise ValueError("%d configurations failed." % len(result.errors))
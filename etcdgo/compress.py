@@ -0,0 +1,223 @@
+"""
+Compression and chunking of configuration values. Compressed values start
+with a marker naming the algorithm, so they can be decompressed whatever is
+the configuration object reading them. Values which are too big for a
+single key are replaced by a marked pointer to their chunks. Values which
+are not compressed but start with the marker character are escaped.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# first character of all the markers
+MARKER = b'\0'
+
+# marker of values which are not compressed, but start with MARKER
+_RAW = MARKER + b'raw:'
+
+_ZLIB = MARKER + b'zlib:'
+
+_ZSTD = MARKER + b'zstd:'
+
+_CHUNKS = MARKER + b'chunks:'
+
+
+def available():
+    """
+    Return the names of the available compression algorithms.
+
+    Returns:
+        list: algorithms names.
+    """
+    algorithms = ["zlib"]
+    if zstandard:
+        algorithms.append("zstd")
+
+    return algorithms
+
+
+def check(algorithm):
+    """
+    Check if a compression algorithm can be used.
+
+    Args:
+        algorithm (str): algorithm name.
+    """
+    if algorithm == "zstd" and not zstandard:
+        raise ValueError("zstd compression requires the zstandard package")
+
+    if algorithm not in ["zlib", "zstd"]:
+        raise ValueError("'%s' compression is not supported" % algorithm)
+
+
+def compress(value, algorithm):
+    """
+    Compress a value. The compressed value is returned only if it's smaller
+    than the original one.
+
+    Args:
+        value     (bytes): value to compress.
+        algorithm   (str): algorithm name.
+
+    Returns:
+        bytes: stored value.
+    """
+    if algorithm == "zstd":
+        data = _ZSTD + zstandard.ZstdCompressor().compress(value)
+    else:
+        data = _ZLIB + zlib.compress(value)
+
+    if len(data) < len(value):
+        return data
+
+    return escape(value)
+
+
+def escape(value):
+    """
+    Escape a value which is stored without compression.
+
+    Args:
+        value (bytes): value to store.
+
+    Returns:
+        bytes: stored value.
+    """
+    if value.startswith(MARKER):
+        return _RAW + value
+
+    return value
+
+
+def split(value, chunk_size):
+    """
+    Split a value into chunks.
+
+    Args:
+        value      (bytes): value to split.
+        chunk_size   (int): maximum size of a chunk.
+
+    Returns:
+        list: chunks of the value.
+    """
+    return [
+        value[start:start + chunk_size]
+        for start in range(0, len(value), chunk_size)
+    ]
+
+
+def pointer(chunks_path, count, size):
+    """
+    Return the value pointing to the chunks of a value.
+
+    Args:
+        chunks_path (bytes): prefix of the chunk keys.
+        count         (int): number of chunks.
+        size          (int): size of the value.
+
+    Returns:
+        bytes: stored value.
+    """
+    return _CHUNKS + b"%d:%d:" % (count, size) + chunks_path
+
+
+def chunk_key(chunks_path, index):
+    """
+    Return the key of a chunk. Keys are sorted by index.
+
+    Args:
+        chunks_path (bytes): prefix of the chunk keys.
+        index         (int): chunk index.
+
+    Returns:
+        bytes: chunk key.
+    """
+    return chunks_path + b"%08d" % index
+
+
+def is_pointer(value):
+    """
+    Return True if value points to chunks.
+
+    Args:
+        value (bytes): stored value.
+
+    Returns:
+        bool: True if value points to chunks.
+    """
+    return value.startswith(_CHUNKS)
+
+
+def chunks_path(value):
+    """
+    Return the prefix of the chunk keys a pointer refers to.
+
+    Args:
+        value (bytes): stored pointer.
+
+    Returns:
+        bytes: prefix of the chunk keys.
+    """
+    return value[len(_CHUNKS):].split(b":", 2)[2]
+
+
+def join(value, chunks):
+    """
+    Reassemble the value a pointer refers to.
+
+    Args:
+        value  (bytes): stored pointer.
+        chunks  (dict): chunk values by key.
+
+    Returns:
+        bytes: stored value, still compressed if it was.
+    """
+    count, size, chunks_path = value[len(_CHUNKS):].split(b":", 2)
+
+    try:
+        data = b''.join(
+            chunks[chunk_key(chunks_path, index)]
+            for index in range(int(count)))
+    except KeyError:
+        data = b''
+
+    if len(data) != int(size):
+        raise ValueError("chunks under '%s' are incomplete" %
+                         chunks_path.decode('utf-8'))
+
+    return data
+
+
+def decompress(value):
+    """
+    Return the original value of a stored value.
+
+    Args:
+        value (bytes): stored value.
+
+    Returns:
+        bytes: original value.
+    """
+    if not value.startswith(MARKER):
+        return value
+
+    if value.startswith(_RAW):
+        return value[len(_RAW):]
+
+    if value.startswith(_ZLIB):
+        return zlib.decompress(value[len(_ZLIB):])
+
+    if value.startswith(_ZSTD):
+        if not zstandard:
+            raise ValueError("zstd compression requires the zstandard package")
+
+        return zstandard.ZstdDecompressor().decompress(value[len(_ZSTD):])
+
+    # value has been stored before compression support
+    return value
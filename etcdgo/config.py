@@ -4,11 +4,441 @@ Configuration classes definition.
 Author:
     Andrea Cervesato <andrea.cervesato@mailbox.org>
 """
+import os
+import time
 import logging
+import hashlib
+import functools
+import threading
 import configparser
+import collections.abc
+import concurrent.futures
 import json
-import yaml
-import flatten_dict
+import etcdgo.backend
+import etcdgo.codec
+import etcdgo.engine
+import etcdgo.stream
+import etcdgo.metrics
+import etcdgo.watch
+import etcdgo.compress
+
+# etcd default --max-txn-ops
+MAX_TXN_OPS = 128
+
+# etcd default --max-request-bytes is 1.5 MiB. Keep some room for the
+# request envelope.
+MAX_TXN_BYTES = 1024 * 1024
+
+# estimated size of the protobuf envelope of a single transaction operation
+OP_OVERHEAD_BYTES = 16
+
+# configuration paths starting with this character are reserved by etcdgo
+RESERVED_PREFIX = etcdgo.watch.RESERVED_PREFIX
+
+# key holding the header of a configuration stored as a single blob
+BLOB_KEY = RESERVED_PREFIX + "blob"
+
+# maximum size of a single blob chunk
+BLOB_CHUNK_SIZE = 512 * 1024
+
+# version of the blob header
+BLOB_VERSION = 1
+
+# minimum size of the values which are compressed
+COMPRESSION_THRESHOLD = 1024
+
+# folder holding the chunks of values which are too big for a single key
+CHUNKS_KEY = RESERVED_PREFIX + "chunks"
+
+# maximum size of a single value. Bigger values are split into chunks.
+MAX_VALUE_SIZE = 512 * 1024
+
+# key pointing to the current generation of a published configuration
+CURRENT_KEY = RESERVED_PREFIX + "current"
+
+# folder holding the generations of a published configuration
+GENERATIONS_KEY = RESERVED_PREFIX + "gen"
+
+# default number of published generations which are kept
+RETENTION = 3
+
+# reads going through the cluster leader, which always see the latest data
+LINEARIZABLE = "linearizable"
+
+# reads served by any cluster member, which can be slightly stale
+SERIALIZABLE = "serializable"
+
+
+def _to_bytes(value):
+    """
+    Convert a configuration value into bytes. Values which are not strings
+    (i.e. numbers or lists) are stored with their string representation.
+
+    Args:
+        value (object): value to convert.
+
+    Returns:
+        bytes: converted value.
+    """
+    if isinstance(value, bytes):
+        return value
+
+    if not isinstance(value, str):
+        value = str(value)
+
+    return value.encode('utf-8')
+
+
+def _op_size(op):
+    """
+    Return the estimated size of a transaction operation.
+
+    Args:
+        op (object): etcd transaction operation.
+
+    Returns:
+        int: size of the operation in bytes.
+    """
+    value = getattr(op, "value", None) or b''
+    range_end = getattr(op, "range_end", None) or b''
+    return len(op.key) + len(value) + len(range_end) + OP_OVERHEAD_BYTES
+
+
+def _prefix_end(prefix):
+    """
+    Return the first key which is greater than all the keys starting with
+    prefix. It's used as ``range_end`` for prefix range requests.
+
+    Args:
+        prefix (bytes): keys prefix.
+
+    Returns:
+        bytes: end of the prefix range.
+    """
+    end = bytearray(prefix)
+    end[-1] = end[-1] + 1
+    return bytes(end)
+
+
+def _drive(steps, send):
+    """
+    Run a generator yielding requests, like Config._range_steps, sending
+    it back the response of every request.
+
+    Args:
+        steps (generator): generator yielding requests.
+        send   (function): function sending a request and returning its
+            response.
+
+    Returns:
+        object: value returned by the generator.
+    """
+    try:
+        request = next(steps)
+        while True:
+            request = steps.send(send(request))
+    except StopIteration as exc:
+        return exc.value
+
+
+def _find(kvs, key):
+    """
+    Return the etcd KeyValue message of a key.
+
+    Args:
+        kvs  (list): etcd KeyValue messages.
+        key (bytes): key to look for.
+
+    Returns:
+        KeyValue: message of the key, or None if key is missing.
+    """
+    for kv in kvs:
+        if kv.key == key:
+            return kv
+
+    return None
+
+
+class ConcurrentUpdateError(Exception):
+    """
+    Raised when a configuration has been modified by someone else during an
+    incremental push.
+    """
+
+
+class PushStats:
+    """
+    Statistics about a configuration push. revision is the one of the
+    database right after the last transaction of the push, or the one the
+    configuration has been read at by an incremental push which didn't
+    write anything.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.keys = 0
+        self.puts = 0
+        self.deletes = 0
+        self.rpcs = 0
+        self.bytes_sent = 0
+        self.compressed = 0
+        self.compressed_in = 0
+        self.compressed_out = 0
+        self.generation = None
+        self.revision = None
+
+    @property
+    def bytes_saved(self):
+        """
+        Number of bytes saved by compression.
+        """
+        return self.compressed_in - self.compressed_out
+
+    @property
+    def compression_ratio(self):
+        """
+        Original size of the compressed values divided by their compressed
+        size. It's 1.0 if no value has been compressed.
+        """
+        if not self.compressed_out:
+            return 1.0
+
+        return float(self.compressed_in) / self.compressed_out
+
+    def __repr__(self):
+        return ("PushStats(keys=%d, puts=%d, deletes=%d, rpcs=%d, "
+                "bytes_sent=%d, compressed=%d, bytes_saved=%d)") % (
+                    self.keys,
+                    self.puts,
+                    self.deletes,
+                    self.rpcs,
+                    self.bytes_sent,
+                    self.compressed,
+                    self.bytes_saved)
+
+
+class ConfigData(dict):
+    """
+    A pulled configuration. It's a dictionary holding the configuration,
+    together with the revision it has been read at.
+    """
+
+    def __init__(self, data=None, revision=None):
+        super().__init__(data or {})
+        self.revision = revision
+
+    def __repr__(self):
+        return "ConfigData(%s, revision=%s)" % (
+            dict.__repr__(self), self.revision)
+
+
+class LazyConfig(collections.abc.Mapping):
+    """
+    A configuration whose top level sections are fetched on first access
+    and then kept. All sections are read at the revision of the first one,
+    which is available as the revision attribute once it's known.
+    """
+
+    def __init__(self, config, name, revision=None, consistency=None):
+        self._config = config
+        self._name = name
+        self._consistency = consistency
+        self._values = dict()
+        self._keys = None
+        self._lock = threading.Lock()
+        self.revision = revision
+
+    def _pin(self, revision):
+        """
+        Set the revision all the following reads are done at.
+        """
+        with self._lock:
+            if self.revision is None:
+                self.revision = revision
+
+    def __getitem__(self, key):
+        # pylint: disable=protected-access
+        if not isinstance(key, str) or not key or \
+                key.startswith(RESERVED_PREFIX):
+            raise KeyError(key)
+
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+
+            if self._keys is not None and key not in self._keys:
+                raise KeyError(key)
+
+        value, revision = self._config._fetch_path(
+            self._name,
+            etcdgo.codec.escape(key),
+            revision=self.revision,
+            consistency=self._consistency)
+
+        self._pin(revision)
+
+        if value is None:
+            raise KeyError(key)
+
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def _list(self):
+        """
+        Return the names of the top level sections and values.
+        """
+        # pylint: disable=protected-access
+        if self._keys is None:
+            keys, revision = self._config._top_keys(
+                self._name,
+                revision=self.revision,
+                consistency=self._consistency)
+
+            self._pin(revision)
+
+            with self._lock:
+                self._keys = keys
+
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._list())
+
+    def __len__(self):
+        return len(self._list())
+
+    def __repr__(self):
+        return "LazyConfig('%s', revision=%s)" % (self._name, self.revision)
+
+
+class ConfigInfo:
+    """
+    A configuration stored under basefolder. keys counts all the keys
+    stored under the configuration, including the reserved ones like blob
+    headers, chunks, the current generation pointer and retained
+    generations, so it's the number of keys removed by Config.delete.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, name):
+        self.name = name
+        self.keys = 0
+        self.mod_revision = 0
+
+    def __repr__(self):
+        return "ConfigInfo(name=%s, keys=%d, mod_revision=%d)" % (
+            self.name, self.keys, self.mod_revision)
+
+
+class BulkResult:
+    """
+    Result of a bulk operation. Every configuration name is associated
+    either with its result or with the exception which has been raised while
+    processing it.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.results = dict()
+        self.errors = dict()
+
+    @property
+    def ok(self):
+        """
+        True if no error occurred.
+        """
+        # pylint: disable=invalid-name
+        return not self.errors
+
+    def __repr__(self):
+        return "BulkResult(results=%d, errors=%d)" % (
+            len(self.results), len(self.errors))
+
+
+def _check_concurrency(concurrency):
+    """
+    Check the number of concurrent operations of a bulk operation.
+    """
+    if not isinstance(concurrency, int) or concurrency <= 0:
+        raise ValueError("concurrency must be a positive integer")
+
+
+class _Flight:
+    """
+    A fetch in progress, whose result is shared by all the callers asking
+    for it in the meanwhile.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _check_path(path):
+    """
+    Check a slash separated path of a configuration section.
+
+    Args:
+        path (str): section path.
+
+    Returns:
+        str: path without leading and trailing slashes.
+    """
+    if not isinstance(path, str):
+        raise ValueError("path must be a string")
+
+    path = path.strip("/")
+    if not path or "" in path.split("/"):
+        raise ValueError("'%s' is not a valid path" % path)
+
+    if path.startswith(RESERVED_PREFIX):
+        raise ValueError("paths starting with '%s' are reserved" %
+                         RESERVED_PREFIX)
+
+    return path
+
+
+def _check_consistency(consistency):
+    """
+    Check the consistency of a read.
+    """
+    if consistency not in [LINEARIZABLE, SERIALIZABLE]:
+        raise ValueError("consistency must be '%s' or '%s'" %
+                         (LINEARIZABLE, SERIALIZABLE))
+
+
+def _observed(kind):
+    """
+    Decorate a Config method, so it's measured by an operation of the given
+    kind when the configuration object has observers. Methods called by an
+    operation which is already measured, like pull inside dump, are part of
+    that operation.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, name, *args, **kwargs):
+            # pylint: disable=protected-access
+            if not self._observers or self._operation() is not None:
+                return func(self, name, *args, **kwargs)
+
+            operation = etcdgo.metrics.Operation(kind, name)
+            self._local.operation = operation
+            error = None
+            try:
+                return func(self, name, *args, **kwargs)
+            except Exception as exc:
+                error = exc
+                raise
+            finally:
+                self._local.operation = None
+                operation.finish(error)
+                self._notify(operation)
+
+        return wrapper
+
+    return decorator
 
 
 class Config:
@@ -16,142 +446,2054 @@ class Config:
     Base configuration to implement in order to push/pull configurations inside
     an etcd database.
     """
+    # name of the format, stored inside blob headers
+    FORMAT = None
+
+    def __init__(
+            self,
+            client,
+            basefolder="/config",
+            page_size=None,
+            batch_size=MAX_TXN_OPS,
+            batch_bytes=MAX_TXN_BYTES,
+            blob=False,
+            blob_chunk_size=BLOB_CHUNK_SIZE,
+            compression=None,
+            compression_threshold=COMPRESSION_THRESHOLD,
+            max_value_size=MAX_VALUE_SIZE,
+            publish=False,
+            retention=RETENTION,
+            consistency=LINEARIZABLE,
+            coalesce=False,
+            pure_python=None,
+            observers=None):
+        """
+        Args:
+            client (etcd3.Client): etcd Client instance, which is used
+                through etcdgo.etcd.Etcd3Backend, or any object
+                implementing etcdgo.backend.Backend.
+            basefolder     (str): root of the configuration inside the etcd
+                database.
+            page_size      (int): maximum number of keys fetched by a single
+                range request during pull. If None, the whole configuration
+                is fetched with one request.
+            batch_size     (int): maximum number of operations sent inside a
+                single transaction during push. It must not exceed the
+                server --max-txn-ops.
+            batch_bytes    (int): maximum size of a single transaction during
+                push. It must not exceed the server --max-request-bytes.
+            blob          (bool): push configurations as a single blob,
+                instead of one key per value. See push.
+            blob_chunk_size (int): maximum size of a single blob key. Bigger
+                blobs are split into many chunk keys.
+            compression    (str): algorithm used to compress values during
+                push. Supported: zlib, zstd (if zstandard is installed).
+                If None, values are not compressed.
+            compression_threshold (int): minimum size of the values which
+                are compressed.
+            max_value_size (int): maximum size of a single value. Bigger
+                values are split into many chunk keys.
+            publish       (bool): push configurations as new generations,
+                which are published all at once. See push.
+            retention      (int): number of published generations which are
+                kept for rollback.
+            consistency    (str): default consistency of pull. Supported:
+                linearizable, serializable.
+            coalesce      (bool): share a single fetch between concurrent
+                pulls of the same configuration. See pull.
+            pure_python   (bool): parse and dump configurations with the
+                pure Python engines, instead of the fastest available ones.
+                If None, etcdgo.engine.PURE_PYTHON is used. See
+                etcdgo.engine.
+            observers     (list): etcdgo.metrics.Observer objects receiving
+                the measures of every push, pull and dump. See
+                add_observer.
+        """
+        # pylint: disable=too-many-arguments
+        if page_size is not None and page_size <= 0:
+            raise ValueError("page_size must be a positive integer")
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        if batch_bytes <= 0:
+            raise ValueError("batch_bytes must be a positive integer")
+
+        if blob_chunk_size <= 0:
+            raise ValueError("blob_chunk_size must be a positive integer")
+
+        if compression is not None:
+            etcdgo.compress.check(compression)
+
+        if compression_threshold < 0:
+            raise ValueError("compression_threshold must not be negative")
+
+        if max_value_size <= 0:
+            raise ValueError("max_value_size must be a positive integer")
+
+        if retention <= 0:
+            raise ValueError("retention must be a positive integer")
+
+        _check_consistency(consistency)
+
+        self._logger = logging.getLogger("converter")
+        self._client = self._backend(client)
+        self._basefolder = basefolder
+        self._page_size = page_size
+        self._batch_size = batch_size
+        self._batch_bytes = batch_bytes
+        self._blob = blob
+        self._blob_chunk_size = blob_chunk_size
+        self._compression = compression
+        self._compression_threshold = compression_threshold
+        self._max_value_size = max_value_size
+        self._publish = publish
+        self._retention = retention
+        self._consistency = consistency
+        self._coalesce = coalesce
+        self._pure_python = pure_python
+        self._observers = tuple(observers or [])
+        self._local = threading.local()
+        self._flights = dict()
+        self._flights_lock = threading.Lock()
+        self.coalesced = 0
+
+    @staticmethod
+    def _backend(client):
+        """
+        Return the backend used to talk with client.
+
+        Args:
+            client (object): client given to the configuration object.
+
+        Returns:
+            etcdgo.backend.Backend: client backend.
+        """
+        return etcdgo.backend.adapt(client)
+
+    def add_observer(self, observer):
+        """
+        Measure every push, pull and dump, giving the measures to observer
+        once the operation is over. Configuration objects without
+        observers don't measure anything. Observers are not notified by
+        asyncio configurations.
+
+        Args:
+            observer (etcdgo.metrics.Observer): observer to add.
+        """
+        if not callable(getattr(observer, "on_operation", None)):
+            raise ValueError("observer must implement on_operation")
+
+        self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer):
+        """
+        Stop giving measures to an observer.
+
+        Args:
+            observer (etcdgo.metrics.Observer): observer to remove.
+        """
+        self._observers = tuple(
+            item for item in self._observers if item is not observer)
+
+    def _operation(self):
+        """
+        Return the operation measured by the current thread, or None.
+        """
+        if not self._observers:
+            return None
+
+        return getattr(self._local, "operation", None)
+
+    def _notify(self, operation):
+        """
+        Give the measures of an operation to the observers.
+
+        Args:
+            operation (etcdgo.metrics.Operation): operation measures.
+        """
+        for observer in self._observers:
+            try:
+                observer.on_operation(operation)
+            except Exception:  # pylint: disable=broad-except
+                self._logger.exception("observer failed")
+
+    def _get_range(self, start, end, **kwargs):
+        """
+        Send a range request, measuring it if an operation is in progress.
+
+        Args:
+            start (bytes): first key in range.
+            end   (bytes): end of the range, excluded.
+            kwargs (dict): see etcdgo.backend.Backend.get_range_response.
+
+        Returns:
+            object: range response.
+        """
+        operation = self._operation()
+        if operation is None:
+            return self._client.get_range_response(start, end, **kwargs)
+
+        begin = time.perf_counter()
+        response = self._client.get_range_response(start, end, **kwargs)
+        operation.add_rpc(
+            time.perf_counter() - begin,
+            keys=len(response.kvs),
+            bytes_received=sum(
+                len(kv.key) + len(kv.value) for kv in response.kvs))
+
+        return response
+
+    def _transaction(self, compare, success, failure):
+        """
+        Send a transaction, measuring it if an operation is in progress.
+
+        Args:
+            compare (list): transaction comparisons.
+            success (list): operations applied if comparisons succeed.
+            failure (list): operations applied if comparisons fail.
+
+        Returns:
+            object: transaction response, holding the comparisons result,
+                the responses of the operations and the revision of the
+                database after the transaction.
+        """
+        operation = self._operation()
+        if operation is None:
+            return self._client.transaction_response(
+                compare=compare,
+                success=success,
+                failure=failure)
+
+        begin = time.perf_counter()
+        response = self._client.transaction_response(
+            compare=compare,
+            success=success,
+            failure=failure)
+
+        ops = success if response.succeeded else failure
+        delete = self._client.transactions.delete
+        operation.add_rpc(
+            time.perf_counter() - begin,
+            keys=sum(1 for op in ops if not isinstance(op, delete)),
+            bytes_sent=sum(_op_size(op) - OP_OVERHEAD_BYTES for op in ops))
+
+        return response
+
+    def _config_prefix(self, name):
+        """
+        Return the prefix of all the keys belonging to a configuration.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            str: configuration keys prefix.
+        """
+        return "{0}/{1}/".format(self._basefolder, name)
+
+    def _range(
+            self,
+            prefix,
+            stats=None,
+            revision=None,
+            keys_only=False,
+            serializable=False,
+            end=None):
+        """
+        Fetch all the keys under prefix using range requests. If page_size
+        has been given, keys are fetched in pages which are all read at the
+        revision of the first page. See _range_steps for the arguments.
+
+        Returns:
+            tuple: list of etcd KeyValue messages and the revision they have
+                been read at.
+        """
+        steps = self._range_steps(
+            prefix,
+            stats=stats,
+            revision=revision,
+            keys_only=keys_only,
+            serializable=serializable,
+            end=end)
+
+        return _drive(steps, lambda request: self._get_range(
+            *request[0], **request[1]))
+
+    def _range_steps(
+            self,
+            prefix,
+            stats=None,
+            revision=None,
+            keys_only=False,
+            serializable=False,
+            end=None):
+        """
+        Generator holding the logic of _range, shared by blocking and
+        asyncio configurations. It yields the positional and keyword
+        arguments of every range request and it's sent back the response.
+
+        Args:
+            prefix          (str): keys prefix.
+            stats     (PushStats): statistics to update.
+            revision        (int): revision to read at. If None, the latest
+                revision is read.
+            keys_only      (bool): fetch keys without their values.
+            serializable   (bool): read from any cluster member, without
+                going through the leader.
+            end           (bytes): end of the range, excluded. If None, all
+                the keys starting with prefix are fetched.
+
+        Returns:
+            tuple: list of etcd KeyValue messages and the revision they have
+                been read at.
+        """
+        start = prefix.encode('utf-8')
+        if end is None:
+            end = _prefix_end(start)
+        kvs = []
+
+        kwargs = dict()
+        if keys_only:
+            kwargs["keys_only"] = True
+
+        if serializable:
+            kwargs["serializable"] = True
+
+        while True:
+            response = yield (start, end), dict(
+                limit=self._page_size,
+                revision=revision,
+                **kwargs)
+
+            kvs.extend(response.kvs)
+
+            if stats:
+                stats.rpcs += 1
+
+            if revision is None:
+                revision = response.header.revision
+
+            if not self._page_size or not response.more or not response.kvs:
+                break
+
+            # next page starts right after the last received key
+            start = response.kvs[-1].key + b'\0'
+
+        return kvs, revision
+
+    def _batches(self, ops):
+        """
+        Split transaction operations into batches which respect both
+        batch_size and batch_bytes limits. A single operation bigger than
+        batch_bytes is sent alone inside its own batch. Operations are
+        consumed lazily, so only one batch is kept in memory.
+
+        Args:
+            ops (iterable): etcd transaction operations.
+
+        Returns:
+            generator: lists of operations.
+        """
+        batch = []
+        batch_keys = set()
+        batch_bytes = 0
+
+        for op in ops:
+            size = _op_size(op)
+
+            # etcd doesn't accept the same key twice inside a transaction
+            if batch and (len(batch) >= self._batch_size or
+                          batch_bytes + size > self._batch_bytes or
+                          op.key in batch_keys):
+                yield batch
+                batch = []
+                batch_keys = set()
+                batch_bytes = 0
+
+            batch.append(op)
+            batch_keys.add(op.key)
+            batch_bytes += size
+
+        if batch:
+            yield batch
+
+    def _commit(self, ops, stats, guard=None, revision=None):
+        """
+        Send operations using one transaction per batch. If guard is given,
+        every transaction fails when keys under guard have been modified by
+        someone else: the first one after revision, the following ones
+        after the revision of the previous transaction.
+
+        Args:
+            ops     (iterable): etcd transaction operations.
+            stats  (PushStats): statistics to update.
+            guard        (str): keys prefix which must not be modified.
+            revision     (int): revision keys under guard have been read at.
+
+        Returns:
+            bool: False if a guarded transaction failed, True otherwise.
+        """
+        steps = self._commit_steps(ops, stats, guard=guard, revision=revision)
+
+        return _drive(steps, lambda request: self._transaction(**request))
+
+    def _commit_steps(self, ops, stats, guard=None, revision=None):
+        """
+        Generator holding the logic of _commit, shared by blocking and
+        asyncio configurations. It yields the keyword arguments of every
+        transaction and it's sent back the response.
+        """
+        for batch in self._batches(ops):
+            compare = []
+            if guard is not None:
+                compare = self._guard(guard, revision)
+
+            response = yield dict(compare=compare, success=batch, failure=[])
+
+            stats.rpcs += 1
+
+            if not response.succeeded:
+                return False
+
+            revision = response.header.revision
+            stats.revision = revision
+
+            self._committed(batch, stats)
+
+        return True
+
+    def _guard(self, config_path, revision):
+        """
+        Return the comparison which fails if any key under config_path has
+        been modified after revision.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            revision     (int): revision keys have been read at.
+
+        Returns:
+            list: etcd transaction comparisons.
+        """
+        start = config_path.encode('utf-8')
+
+        return [
+            self._client.transactions.mod(
+                start, range_end=_prefix_end(start)) < revision + 1
+        ]
+
+    def _committed(self, batch, stats):
+        """
+        Update statistics with a batch of committed operations.
+
+        Args:
+            batch      (list): etcd transaction operations.
+            stats (PushStats): statistics to update.
+        """
+        for op in batch:
+            if isinstance(op, self._client.transactions.delete):
+                self._logger.debug("deleting: %s", op.key)
+                stats.deletes += 1
+            else:
+                self._logger.debug("setting: %s -> %s", op.key, op.value)
+                stats.puts += 1
+
+            stats.bytes_sent += _op_size(op) - OP_OVERHEAD_BYTES
+
+    def _diff(self, items, kvs):
+        """
+        Compare key/value pairs with the ones stored inside the database and
+        return the operations needed to update them.
+
+        Args:
+            items       (dict): new key/value pairs of bytes.
+            kvs         (list): etcd KeyValue messages read under the
+                configuration keys prefix.
+
+        Returns:
+            list: etcd transaction operations.
+        """
+        current = {kv.key: kv.value for kv in kvs}
+
+        transactions = self._client.transactions
+        ops = []
+
+        for key, value in items.items():
+            if current.get(key) != value:
+                ops.append(transactions.put(key, value))
+
+        for key in current:
+            if key not in items:
+                ops.append(transactions.delete(key))
+
+        return ops
+
+    def _convert(self, filepath):
+        """
+        Convert a file into a dictionary.
+
+        Args:
+            filepath (str): path of the file to be pushed.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _parse(text, pure=None):
+        """
+        Convert a string into a dictionary.
+
+        Args:
+            text  (str): configuration as string.
+            pure (bool): use the pure Python engine.
+        """
+        raise NotImplementedError()
+
+    def _convert_to_str(self, data):
+        """
+        Convert a dict into a str according with the format.
+
+        Args:
+            data (dict): dictionary to be converted.
+        """
+        raise NotImplementedError()
+
+    def _leaves(self, filepath):
+        """
+        Return the (path, value) leaves of a file, where path is the slash
+        separated list of keys leading to value. Formats which can be parsed
+        incrementally override this method, while by default the whole file
+        is converted and flatten.
+
+        Args:
+            filepath (str): path of the file to be pushed.
+
+        Returns:
+            generator: (path, value) leaves.
+        """
+        # pylint: disable=protected-access
+        data = self._convert(filepath)
+        yield from etcdgo.codec.flatten(data)
+
+    def _leaf_items(self, config_path, path, value, stats, chunk_ids):
+        """
+        Return the key/value pairs storing a leaf. Values bigger than
+        max_value_size are split into chunks, which are stored under a path
+        named after their content, and the leaf key points to them. Chunks
+        come first, so the leaf is never written before its chunks.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            path         (str): slash separated path of the leaf.
+            value     (object): value of the leaf.
+            stats  (PushStats): statistics to update.
+            chunk_ids    (set): chunk keys prefixes in use.
+
+        Returns:
+            generator: key/value pairs of bytes.
+        """
+        key = _to_bytes(config_path + path)
+        data = self._encode(value, stats)
+
+        if len(data) <= self._max_value_size:
+            yield key, data
+            return
+
+        chunks_path = _to_bytes("{0}{1}/{2}/".format(
+            config_path,
+            CHUNKS_KEY,
+            hashlib.sha1(data).hexdigest()))
+
+        chunks = etcdgo.compress.split(data, self._max_value_size)
+        for index, chunk in enumerate(chunks):
+            yield etcdgo.compress.chunk_key(chunks_path, index), chunk
+
+        chunk_ids.add(chunks_path)
+
+        yield key, etcdgo.compress.pointer(chunks_path, len(chunks), len(data))
+
+    def _stream_ops(self, config_path, filepath, stats, chunk_ids):
+        """
+        Return the put operations of a file, while it's parsed.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            filepath     (str): path of the file to be pushed.
+            stats  (PushStats): statistics to update.
+            chunk_ids    (set): chunk keys prefixes in use.
+
+        Returns:
+            generator: etcd transaction operations.
+        """
+        put = self._client.transactions.put
+
+        for path, value in self._leaves(filepath):
+            for key, data in self._leaf_items(
+                    config_path, path, value, stats, chunk_ids):
+                stats.keys += 1
+                yield put(key, data)
+
+    def _encode(self, value, stats):
+        """
+        Convert a configuration value into the bytes stored inside the etcd
+        database, compressing it if it's big enough.
+
+        Args:
+            value     (object): value to convert.
+            stats  (PushStats): statistics to update.
+
+        Returns:
+            bytes: stored value.
+        """
+        value = _to_bytes(value)
+
+        if not self._compression or \
+                len(value) < self._compression_threshold:
+            return etcdgo.compress.escape(value)
+
+        data = etcdgo.compress.compress(value, self._compression)
+        if len(data) < len(value):
+            stats.compressed += 1
+            stats.compressed_in += len(value)
+            stats.compressed_out += len(data)
+
+        return data
+
+    def _items(self, config_path, filepath, stats, chunk_ids):
+        """
+        Convert a file into the key/value pairs to store under config_path.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            filepath     (str): path of the file to be pushed.
+            stats  (PushStats): statistics to update.
+            chunk_ids    (set): chunk keys prefixes in use.
+
+        Returns:
+            dict: key/value pairs of bytes.
+        """
+        operation = self._operation()
+
+        # convert  to dict
+        with etcdgo.metrics.phase(operation, "parse"):
+            data = self._convert(filepath)
+
+        items = dict()
+        with etcdgo.metrics.phase(operation, "flatten"):
+            for dirs, value in etcdgo.codec.flatten(data):
+                items.update(self._leaf_items(
+                    config_path, dirs, value, stats, chunk_ids))
+
+        return items
+
+    @staticmethod
+    def _blob_chunks_path(config_path, blob_id):
+        """
+        Return the prefix of the chunk keys of a blob.
+
+        Args:
+            config_path (str): configuration keys prefix.
+            blob_id     (str): blob identifier.
+
+        Returns:
+            str: chunk keys prefix.
+        """
+        return "{0}{1}/{2}/".format(config_path, BLOB_KEY, blob_id)
+
+    def _blob_ops(self, config_path, filepath, stats):
+        """
+        Return the operations storing a file as a single blob. Chunks are
+        written under a path named after their content, before the header
+        which points to them, so readers see either the old blob or the new
+        one, even if chunks don't fit inside a single transaction. Then all
+        the other keys of the configuration are deleted.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            filepath     (str): path of the file to be pushed.
+            stats  (PushStats): statistics to update.
+
+        Returns:
+            list: etcd transaction operations.
+        """
+        operation = self._operation()
+
+        with etcdgo.metrics.phase(operation, "parse"):
+            with open(filepath, 'r') as fdata:
+                text = fdata.read()
+
+            # validate the configuration before storing it
+            data = self._parse(text, self._pure_python)
+
+        if data is not None and not isinstance(data, dict):
+            raise ValueError("configuration must be a dictionary")
+
+        blob = text.encode('utf-8')
+        blob_id = hashlib.sha1(blob).hexdigest()
+        chunks_path = self._blob_chunks_path(config_path, blob_id)
+
+        transactions = self._client.transactions
+        ops = []
+
+        with etcdgo.metrics.phase(operation, "flatten"):
+            for start in range(0, len(blob), self._blob_chunk_size):
+                key = "%s%08d" % (chunks_path, len(ops))
+                chunk = blob[start:start + self._blob_chunk_size]
+                ops.append(transactions.put(
+                    _to_bytes(key),
+                    self._encode(chunk, stats)))
+
+        header = json.dumps({
+            "version": BLOB_VERSION,
+            "format": self.FORMAT,
+            "id": blob_id,
+            "chunks": len(ops),
+            "size": len(blob),
+        }, sort_keys=True)
+
+        header_key = _to_bytes(config_path + BLOB_KEY)
+        ops.append(transactions.put(header_key, _to_bytes(header)))
+
+        stats.keys = len(ops)
+
+        # delete everything but the header and the new chunks
+        chunks_start = _to_bytes(chunks_path)
+        ops.extend(self._delete_ranges(
+            _to_bytes(config_path),
+            [(header_key, header_key + b'\0'),
+             (chunks_start, _prefix_end(chunks_start))]))
+
+        return ops
+
+    def _delete_ranges(self, start, keep):
+        """
+        Return the operations deleting all the keys starting with start,
+        but the ones inside the keep ranges.
+
+        Args:
+            start  (bytes): keys prefix.
+            keep    (list): (start, end) ranges of keys to keep.
+
+        Returns:
+            list: etcd transaction operations.
+        """
+        delete = self._client.transactions.delete
+        end = _prefix_end(start)
+        ops = []
+
+        for keep_start, keep_end in sorted(keep):
+            if start < keep_start:
+                ops.append(delete(start, range_end=keep_start))
+
+            start = max(start, keep_end)
+
+        if start < end:
+            ops.append(delete(start, range_end=end))
+
+        return ops
+
+    def _flat_ops(self, config_path, ops, chunk_ids):
+        """
+        Append to the put operations of a flattened configuration the ones
+        deleting the reserved keys which are not used anymore, like a blob
+        previously stored under config_path or the chunks of old values.
+        Deletion comes last, so readers see the old blob until the
+        configuration has been completely written.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            ops     (iterable): etcd transaction operations.
+            chunk_ids    (set): chunk keys prefixes in use, filled while
+                ops are consumed.
+
+        Returns:
+            generator: etcd transaction operations.
+        """
+        yield from ops
+
+        yield from self._delete_ranges(
+            _to_bytes(config_path + RESERVED_PREFIX),
+            [(path, _prefix_end(path)) for path in chunk_ids])
+
+    @staticmethod
+    def _generation_path(config_path, generation):
+        """
+        Return the prefix of the keys of a published generation.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            generation   (int): generation number.
+
+        Returns:
+            str: generation keys prefix.
+        """
+        return "{0}{1}/{2:010d}/".format(
+            config_path, GENERATIONS_KEY, generation)
+
+    def _read_pointer(
+            self,
+            config_path,
+            stats=None,
+            revision=None,
+            serializable=False):
+        """
+        Read the pointer to the current generation of a configuration.
+
+        Args:
+            config_path      (str): configuration keys prefix.
+            stats      (PushStats): statistics to update.
+            revision         (int): revision to read at.
+            serializable    (bool): read from any cluster member.
+
+        Returns:
+            tuple: pointer stored value, or None if configuration has never
+                been published, and the revision it has been read at.
+        """
+        key = _to_bytes(config_path + CURRENT_KEY)
+        kvs, revision = self._range(
+            config_path + CURRENT_KEY,
+            stats=stats,
+            revision=revision,
+            serializable=serializable,
+            end=key + b'\0')
+
+        kv = _find(kvs, key)
+        if kv is None:
+            return None, revision
+
+        return kv.value, revision
+
+    def _flip(self, config_path, current, pointer, ops=None, stats=None):
+        """
+        Replace the pointer to the current generation, if it didn't change
+        since it has been read.
+
+        Args:
+            config_path    (str): configuration keys prefix.
+            current      (bytes): pointer stored value, or None if it
+                doesn't exist.
+            pointer       (dict): new pointer.
+            ops           (list): other operations to commit together
+                with the pointer.
+            stats    (PushStats): statistics whose revision is updated.
+
+        Returns:
+            list: committed operations, or None if pointer changed.
+        """
+        transactions = self._client.transactions
+        key = _to_bytes(config_path + CURRENT_KEY)
+
+        if current is None:
+            compare = [transactions.version(key) == 0]
+        else:
+            compare = [transactions.value(key) == current]
+
+        # a token makes every pointer unique, so it can be compared by value
+        pointer = dict(pointer, token=os.urandom(16).hex())
+        value = _to_bytes(json.dumps(pointer, sort_keys=True))
+
+        success = [transactions.put(key, value)] + (ops or [])
+        response = self._transaction(
+            compare=compare,
+            success=success,
+            failure=[])
+
+        if not response.succeeded:
+            return None
+
+        if stats is not None:
+            stats.revision = response.header.revision
+
+        return success
+
+    def _reserve(self, name, config_path, stats):
+        """
+        Reserve a new generation of a configuration, so concurrent
+        publishers never write the same one.
+
+        Args:
+            name           (str): name associated with the configuration.
+            config_path    (str): configuration keys prefix.
+            stats    (PushStats): statistics to update.
+
+        Returns:
+            bytes: pointer stored value holding the reservation.
+        """
+        current, _ = self._read_pointer(config_path, stats=stats)
+        if current is None:
+            pointer = dict(generation=None, latest=0, published=[])
+        else:
+            pointer = json.loads(current.decode('utf-8'))
+
+        pointer["latest"] += 1
+
+        committed = self._flip(config_path, current, pointer)
+        stats.rpcs += 1
+
+        if not committed:
+            raise ConcurrentUpdateError(
+                "'%s' is being published by someone else" % name)
+
+        self._committed(committed, stats)
+        stats.generation = pointer["latest"]
+
+        return committed[0].value
+
+    def _publish_generation(self, name, config_path, reserved, stats):
+        """
+        Point to the reserved generation of a configuration and delete the
+        generations which are not retained anymore, together with keys of
+        other layouts.
+
+        Args:
+            name           (str): name associated with the configuration.
+            config_path    (str): configuration keys prefix.
+            reserved     (bytes): pointer stored value holding the
+                reservation.
+            stats    (PushStats): statistics to update.
+        """
+        pointer = json.loads(reserved.decode('utf-8'))
+        pointer["generation"] = pointer["latest"]
+        pointer["published"] = \
+            (pointer["published"] + [pointer["latest"]])[-self._retention:]
+
+        current_key = _to_bytes(config_path + CURRENT_KEY)
+        gens_start = _to_bytes(config_path + GENERATIONS_KEY + "/")
+
+        ops = self._delete_ranges(
+            _to_bytes(config_path),
+            [(current_key, current_key + b'\0'),
+             (gens_start, _prefix_end(gens_start))])
+
+        oldest = _to_bytes(
+            self._generation_path(config_path, pointer["published"][0]))
+        ops.append(self._client.transactions.delete(
+            gens_start,
+            range_end=oldest))
+
+        committed = self._flip(config_path, reserved, pointer, ops, stats)
+        stats.rpcs += 1
+
+        if not committed:
+            raise ConcurrentUpdateError(
+                "'%s' has been modified during publish" % name)
+
+        self._committed(committed, stats)
+
+    @_observed("push")
+    def push(self, name, filepath, incremental=False, stream=False):
+        """
+        Push a format supported file into an etcd database. Keys are written
+        with transactions, each one holding up to batch_size operations.
+
+        When incremental is True, the stored configuration is read first and
+        only the keys which changed are written, while keys which are not
+        part of the file anymore are deleted. Changes are sent inside a
+        transaction which fails if the configuration has been modified in the
+        meanwhile. If changes don't fit inside a single transaction, each
+        one is guarded against changes made after the previous one, and
+        the ones which have already been committed are kept.
+
+        When stream is True, JSON and Yaml files are parsed incrementally
+        and keys are sent while they are produced, so memory usage is bounded
+        by batch size instead of file size. Lists are still loaded as a
+        whole and Yaml merge keys are not supported.
+
+        Values bigger than max_value_size are split into chunk keys, which
+        are written before the key pointing to them, so readers never see
+        a partial value. pull reassembles them from the same range read.
+
+        When the configuration object has been created with publish=True,
+        the file is written as a new generation of the configuration, which
+        is invisible to readers until a single transaction points to it.
+        Only the last retention generations are kept and the others are
+        deleted with range requests. See rollback.
+
+        When the configuration object has been created with a compression
+        algorithm, values bigger than compression_threshold are compressed
+        and marked, so pull decompresses them transparently. The returned
+        statistics report the compression ratio and the bytes saved.
+
+        When the configuration object has been created with blob=True, the
+        file is stored as it is under a single key, or under a few chunk
+        keys if it's bigger than blob_chunk_size, together with a header
+        naming its format. Blobs are faster to push and pull when
+        configurations are always read as a whole, and pulled values keep
+        their original types instead of being converted to strings. A
+        configuration can be pushed again switching between blob and
+        flattened layout, and configurations of both kinds can share the
+        same basefolder. Paths starting with '@' are reserved.
+
+        Args:
+            name         (str): name to associate with file.
+            filepath     (str): path of the file to be pushed.
+            incremental (bool): write only differences with the stored
+                configuration.
+            stream      (bool): parse the file while keys are sent. It can't
+                be used together with incremental.
+
+        Returns:
+            PushStats: statistics about the push.
+
+        Raises:
+            ConcurrentUpdateError: when configuration has been modified
+                during an incremental push.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        if not filepath or not isinstance(filepath, str):
+            raise ValueError("filepath must be a string")
+
+        self._logger.info("pushing '%s' with name '%s'", filepath, name)
+
+        if incremental and stream:
+            raise ValueError("incremental push can't be streamed")
+
+        if self._blob and (incremental or stream):
+            raise ValueError("blob push can't be incremental or streamed")
+
+        if self._publish and incremental:
+            raise ValueError("published push can't be incremental")
+
+        config_path = self._config_prefix(name)
+        stats = PushStats()
+
+        reserved = None
+        if self._publish:
+            reserved = self._reserve(name, config_path, stats)
+            base_path = config_path
+            config_path = self._generation_path(base_path, stats.generation)
+
+        guard = None
+        revision = None
+        chunk_ids = set()
+        if self._blob:
+            ops = self._blob_ops(config_path, filepath, stats)
+        elif stream:
+            ops = self._flat_ops(
+                config_path,
+                self._stream_ops(config_path, filepath, stats, chunk_ids),
+                chunk_ids)
+
+            operation = self._operation()
+            if operation is not None:
+                ops = etcdgo.metrics.timed(operation, "parse", ops)
+        else:
+            items = self._items(config_path, filepath, stats, chunk_ids)
+            stats.keys = len(items)
+
+            if incremental:
+                kvs, revision = self._range(config_path, stats=stats)
+                ops = self._diff(items, kvs)
+                guard = config_path
+            else:
+                ops = self._flat_ops(config_path, (
+                    self._client.transactions.put(key, value)
+                    for key, value in items.items()
+                ), chunk_ids)
+
+        if not self._commit(ops, stats, guard=guard, revision=revision):
+            raise ConcurrentUpdateError(
+                "'%s' has been modified during push" % name)
+
+        if stats.revision is None:
+            stats.revision = revision
+
+        if reserved is not None:
+            self._publish_generation(name, base_path, reserved, stats)
+
+        self._logger.info("configuration pushed: %s", stats)
+
+        return stats
+
+    @staticmethod
+    def _flat_items(config_path, kvs, chunks=None):
+        """
+        Convert key/value pairs read under config_path into the leaves of
+        the configuration, keeping the order of kvs.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            kvs         (list): etcd KeyValue messages.
+            chunks      (dict): chunk values by key. If None, chunks are
+                looked up inside kvs.
+
+        Returns:
+            list: (path, value) leaves, where path is a slash separated
+                path of bytes.
+        """
+        prefix_len = len(config_path.encode('utf-8'))
+        reserved = RESERVED_PREFIX.encode('utf-8')
+        items = []
+        for kv in kvs:
+            key = kv.key[prefix_len:]
+            if key.startswith(reserved):
+                continue
+
+            value = kv.value
+            if value.startswith(etcdgo.compress.MARKER):
+                if etcdgo.compress.is_pointer(value):
+                    if chunks is None:
+                        chunks = {kv.key: kv.value for kv in kvs}
+                    value = etcdgo.compress.join(value, chunks)
+
+                value = etcdgo.compress.decompress(value)
+
+            items.append((key, value.decode('utf-8')))
+
+        return items
+
+    def _unflatten(self, config_path, items):
+        """
+        Convert the leaves read under config_path into a nested dictionary.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            items       (list): (path, value) leaves, see _flat_items.
+
+        Returns:
+            dict: configuration.
+        """
+        if not items:
+            return dict()
+
+        self._logger.debug(
+            "unflatten %d keys under '%s'", len(items), config_path)
+
+        return etcdgo.codec.unflatten(items)
+
+    def _resolve(self, config_path, kvs):
+        """
+        Select the key/value pairs of the current generation, if
+        configuration has been published.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            kvs         (list): etcd KeyValue messages read under
+                config_path.
+
+        Returns:
+            tuple: keys prefix and etcd KeyValue messages of the
+                configuration.
+        """
+        kv = _find(kvs, _to_bytes(config_path + CURRENT_KEY))
+        if kv is None:
+            return config_path, kvs
+
+        generation = json.loads(kv.value.decode('utf-8'))["generation"]
+        if generation is None:
+            return config_path, kvs
+
+        path = self._generation_path(config_path, generation)
+        start = _to_bytes(path)
+
+        return path, [kv for kv in kvs if kv.key.startswith(start)]
+
+    @staticmethod
+    def _blob_header(config_path, kvs):
+        """
+        Return the header of a configuration stored as a single blob.
+
+        Args:
+            config_path  (str): configuration keys prefix.
+            kvs         (list): etcd KeyValue messages read under
+                config_path.
+
+        Returns:
+            dict: blob header, or None if configuration is flattened.
+        """
+        kv = _find(kvs, _to_bytes(config_path + BLOB_KEY))
+        if kv is None:
+            return None
+
+        return json.loads(kv.value.decode('utf-8'))
 
-    def __init__(self, client, basefolder="/config"):
+    def _decode(self, config_path, kvs):
         """
+        Convert key/value pairs read under config_path into a configuration,
+        whatever is the layout it has been stored with.
+
         Args:
-            client (etcd3.Client): etcd Client instance.
+            config_path  (str): configuration keys prefix.
+            kvs         (list): etcd KeyValue messages read under
+                config_path.
+
+        Returns:
+            dict: configuration.
         """
-        self._logger = logging.getLogger("converter")
-        self._client = client
-        self._basefolder = basefolder
+        # pylint: disable=protected-access
+        operation = self._operation()
 
-    def _convert(self, filepath):
+        header = self._blob_header(config_path, kvs)
+        if header is None:
+            with etcdgo.metrics.phase(operation, "unflatten"):
+                items = self._flat_items(config_path, kvs)
+                return self._unflatten(config_path, items)
+
+        if header.get("version") != BLOB_VERSION:
+            raise ValueError("unsupported blob version '%s'" %
+                             header.get("version"))
+
+        parser = FORMATS.get(header["format"])
+        if not parser:
+            raise NotImplementedError(
+                "'%s' format is not supported" % header["format"])
+
+        # chunks are sorted by index, like all the keys of a range
+        chunks_path = _to_bytes(
+            self._blob_chunks_path(config_path, header["id"]))
+
+        with etcdgo.metrics.phase(operation, "unflatten"):
+            blob = b''.join(
+                etcdgo.compress.decompress(kv.value)
+                for kv in kvs if kv.key.startswith(chunks_path))
+
+        if len(blob) != header["size"]:
+            raise ValueError("blob under '%s' is incomplete" % config_path)
+
+        with etcdgo.metrics.phase(operation, "parse"):
+            return parser._parse(blob.decode('utf-8'), self._pure_python) \
+                or dict()
+
+    def _current_path(self, config_path, revision=None, serializable=False):
         """
-        Convert a file into a dictionary.
+        Return the prefix of the keys of the current generation of a
+        configuration.
 
         Args:
-            filepath (str): path of the file to be pushed.
+            config_path  (str): configuration keys prefix.
+            revision     (int): revision to read at.
+            serializable (bool): read from any cluster member.
+
+        Returns:
+            tuple: generation keys prefix, or config_path if configuration
+                has not been published, and the revision it has been read
+                at.
         """
-        raise NotImplementedError()
+        current, revision = self._read_pointer(
+            config_path,
+            revision=revision,
+            serializable=serializable)
 
-    def _convert_to_str(self, data):
+        return self._pointer_path(config_path, current), revision
+
+    def _pointer_path(self, config_path, current):
         """
-        Convert a dict into a str according with the format.
+        Return the prefix of the keys of the generation a pointer refers to.
 
         Args:
-            data (dict): dictionary to be converted.
+            config_path  (str): configuration keys prefix.
+            current    (bytes): pointer stored value, or None if it doesn't
+                exist.
+
+        Returns:
+            str: generation keys prefix, or config_path if configuration
+                has not been published.
         """
-        raise NotImplementedError()
+        if current is None:
+            return config_path
+
+        pointer = json.loads(current.decode('utf-8'))
+        if pointer["generation"] is None:
+            return config_path
 
-    def push(self, name, filepath):
+        return self._generation_path(config_path, pointer["generation"])
+
+    def _read_path(self, base, path, revision=None, serializable=False):
         """
-        Push a format supported file into an etcd database.
+        Fetch the key/value pairs stored at path: the value of path itself,
+        or all the values below it.
 
         Args:
-            name     (str): name to associate with file.
-            filepath (str): path of the file to be pushed.
+            base         (str): configuration keys prefix.
+            path         (str): slash separated path.
+            revision     (int): revision to read at.
+            serializable (bool): read from any cluster member.
+
+        Returns:
+            tuple: list of etcd KeyValue messages and the revision they have
+                been read at.
+        """
+        key = _to_bytes(base + path)
+        kvs, revision = self._range(
+            base + path,
+            revision=revision,
+            serializable=serializable,
+            end=_prefix_end(key + b'/'))
+
+        # range also holds siblings whose name starts with the one of path
+        kvs = [
+            kv for kv in kvs
+            if kv.key == key or kv.key.startswith(key + b'/')
+        ]
+
+        return kvs, revision
+
+    def _read_chunks(self, kvs, revision=None, serializable=False):
+        """
+        Fetch the chunks of the values which are too big for a single key.
+
+        Args:
+            kvs          (list): etcd KeyValue messages.
+            revision      (int): revision to read at.
+            serializable (bool): read from any cluster member.
+
+        Returns:
+            dict: chunk values by key.
+        """
+        chunks = dict()
+        for kv in kvs:
+            if not etcdgo.compress.is_pointer(kv.value):
+                continue
+
+            chunks_path = etcdgo.compress.chunks_path(kv.value)
+            chunk_kvs, _ = self._range(
+                chunks_path.decode('utf-8'),
+                revision=revision,
+                serializable=serializable)
+
+            chunks.update((chunk.key, chunk.value) for chunk in chunk_kvs)
+
+        return chunks
+
+    def _fetch_path(self, name, path, revision=None, consistency=None):
+        """
+        Fetch the value stored at path inside a configuration, reading only
+        the keys below path. Configurations stored as a single blob are
+        fetched as a whole.
+
+        Args:
+            name        (str): name associated with the configuration.
+            path        (str): slash separated path.
+            revision    (int): revision to read at.
+            consistency (str): consistency of the read. If None, the
+                default one is used.
+
+        Returns:
+            tuple: section dictionary or value stored at path, or None if
+                path doesn't exist, and the revision it has been read at.
+        """
+        config_path = self._config_prefix(name)
+        serializable = (consistency or self._consistency) == SERIALIZABLE
+
+        base = config_path
+        if self._publish:
+            base, revision = self._current_path(
+                config_path,
+                revision=revision,
+                serializable=serializable)
+
+        kvs, revision = self._read_path(
+            base,
+            path,
+            revision=revision,
+            serializable=serializable)
+
+        if not kvs and not self._publish:
+            # configuration can be published by another object
+            base, _ = self._current_path(
+                config_path,
+                revision=revision,
+                serializable=serializable)
+
+            if base != config_path:
+                kvs, _ = self._read_path(
+                    base,
+                    path,
+                    revision=revision,
+                    serializable=serializable)
+
+        if not kvs:
+            headers, _ = self._range(
+                base + BLOB_KEY,
+                revision=revision,
+                keys_only=True,
+                serializable=serializable)
+
+            if _find(headers, _to_bytes(base + BLOB_KEY)) is None:
+                return None, revision
+
+            config = self._fetch(
+                name,
+                revision=revision,
+                consistency=consistency)
+
+            value = config
+            for part in etcdgo.codec.split(path):
+                if not isinstance(value, dict) or part not in value:
+                    return None, revision
+
+                value = value[part]
+
+            return value, revision
+
+        chunks = self._read_chunks(
+            kvs,
+            revision=revision,
+            serializable=serializable)
+
+        with etcdgo.metrics.phase(self._operation(), "unflatten"):
+            kv = _find(kvs, _to_bytes(base + path))
+            if kv is not None:
+                return self._flat_items(base, [kv], chunks)[0][1], revision
+
+            items = self._flat_items(base + path + "/", kvs, chunks)
+
+            return self._unflatten(base + path + "/", items), revision
+
+    def _fetch(self, name, revision=None, consistency=None, path=None):
+        """
+        Fetch a configuration from the etcd database.
+
+        Args:
+            name        (str): name associated with the configuration.
+            revision    (int): revision to read at.
+            consistency (str): consistency of the read. If None, the
+                default one is used.
+            path        (str): slash separated path of the section to
+                fetch. If None, the whole configuration is fetched.
+
+        Returns:
+            ConfigData: configuration and the revision it has been read at.
+        """
+        config_path = self._config_prefix(name)
+        serializable = (consistency or self._consistency) == SERIALIZABLE
+
+        if path is not None:
+            value, revision = self._fetch_path(
+                name,
+                path,
+                revision=revision,
+                consistency=consistency)
+
+            if value is None:
+                value = dict()
+            elif not isinstance(value, dict):
+                raise ValueError("'%s' is not a section" % path)
+
+            return ConfigData(value, revision)
+
+        if self._publish:
+            # read only the current generation, instead of all of them
+            path, revision = self._current_path(
+                config_path,
+                revision=revision,
+                serializable=serializable)
+
+            kvs, _ = self._range(
+                path,
+                revision=revision,
+                serializable=serializable)
+
+            return ConfigData(self._decode(path, kvs), revision)
+
+        # a single read, which also holds the pointer and the generations
+        # if configuration has been published by another object
+        kvs, revision = self._range(
+            config_path,
+            revision=revision,
+            serializable=serializable)
+        path, kvs = self._resolve(config_path, kvs)
+
+        return ConfigData(self._decode(path, kvs), revision)
+
+    def _fetch_coalesced(
+            self,
+            name,
+            revision=None,
+            consistency=None,
+            path=None):
+        """
+        Fetch a configuration, sharing the result with the concurrent
+        callers asking for the same name, revision, consistency and path.
+
+        Args:
+            name        (str): name associated with the configuration.
+            revision    (int): revision to read at.
+            consistency (str): consistency of the read.
+            path        (str): path of the section to fetch.
+
+        Returns:
+            ConfigData: configuration and the revision it has been read at.
+        """
+        key = (name, revision, consistency or self._consistency, path)
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+
+            return flight.result
+
+        try:
+            flight.result = self._fetch(
+                name,
+                revision=revision,
+                consistency=consistency,
+                path=path)
+        except Exception as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+
+            flight.done.set()
+
+        return flight.result
+
+    def rollback(self, name, generation=None):
+        """
+        Point a published configuration to one of its retained generations,
+        without pushing it again.
+
+        Examples:
+
+            config = etcdgo.get_config(client, "json", publish=True)
+            config.push("myconfig", "myconfig.json")
+            config.push("myconfig", "broken.json")
+
+            # back to the previous generation
+            config.rollback("myconfig")
+
+        Args:
+            name        (str): name associated with the configuration.
+            generation  (int): generation to point to. If None, the
+                generation published before the current one is used.
+
+        Returns:
+            int: current generation.
+
+        Raises:
+            ConcurrentUpdateError: when configuration has been published
+                during rollback.
         """
         if not name or not isinstance(name, str):
             raise ValueError("name must be a string")
 
-        if not filepath or not isinstance(filepath, str):
-            raise ValueError("filepath must be a string")
+        config_path = self._config_prefix(name)
+        current, _ = self._read_pointer(config_path)
+        if current is None:
+            raise ValueError("'%s' has never been published" % name)
 
-        self._logger.info("pushing '%s' with name '%s'", filepath, name)
+        pointer = json.loads(current.decode('utf-8'))
+        published = pointer["published"]
+        if pointer["generation"] is None:
+            raise ValueError("'%s' has never been published" % name)
 
-        config_path = "{0}/{1}".format(self._basefolder, name)
+        if generation is None:
+            index = published.index(pointer["generation"])
+            if not index:
+                raise ValueError(
+                    "'%s' has no previous generation" % name)
 
-        # convert  to dict
-        data = self._convert(filepath)
+            generation = published[index - 1]
+
+        if generation not in published:
+            raise ValueError("generation %s of '%s' is not retained" %
+                             (generation, name))
 
-        # flatten the dictionary
-        def slash_reducer(k1, k2):
-            if k1 is None:
-                return k2
+        self._logger.info("rolling back '%s' to generation %d",
+                          name, generation)
+
+        pointer["generation"] = generation
+        if not self._flip(config_path, current, pointer):
+            raise ConcurrentUpdateError(
+                "'%s' has been modified during rollback" % name)
+
+        return generation
+
+    def _watch(self, name, callback, start_revision=None):
+        """
+        Watch all the keys of a configuration. callback is called from the
+        etcd watcher thread with a watch response, or with an exception if
+        the watch failed.
 
-            return "{0}/{1}".format(k1, k2)
+        Args:
+            name                 (str): name associated with the
+                configuration.
+            callback        (function): function called on changes.
+            start_revision       (int): first revision to watch.
 
-        paths = flatten_dict.flatten(data, reducer=slash_reducer)
+        Returns:
+            int: watch id.
+        """
+        return self._client.add_watch_prefix_callback(
+            self._config_prefix(name),
+            callback,
+            start_revision=start_revision)
 
-        for dirs, value in paths.items():
-            path = "{0}/{1}".format(config_path, dirs)
-            self._logger.debug("setting: %s -> %s", path, value)
-            self._client.put(path, value)
+    def _cancel_watch(self, watch_id):
+        """
+        Stop watching a configuration.
 
-        self._logger.info("configuration pushed")
+        Args:
+            watch_id (int): watch id returned by _watch.
+        """
+        self._client.cancel_watch(watch_id)
 
-    def pull(self, name):
+    def watch(self, name, callback):
         """
-        Pull a format supported configuration from an etcd database.
+        Pull a configuration and keep it updated with the changes made
+        inside the etcd database. Every change is notified to callback as a
+        ConfigEvent, which holds the added, changed and removed paths and the
+        new revision. Changes made by a single transaction are notified
+        together. The pulled configuration is patched in place before
+        callback is called, so it's never fetched again.
+
+        callback is called from the etcd watcher thread. If the watch fails,
+        callback receives the exception. Configurations stored as a blob or
+        published as generations can't be watched.
+
+        Examples:
+
+            def on_change(event):
+                print(event.revision, event.changed, event.removed)
+
+            watch = config.watch("myconfig", on_change)
+            ...
+            print(watch.config)
+            watch.cancel()
 
         Args:
-            name (str): name to associate with file.
+            name          (str): name associated with the configuration.
+            callback (function): function called on changes.
 
         Returns:
-            dict: configuration stored inside the database.
+            ConfigWatch: object holding the configuration, which can be
+                used to stop watching it.
         """
         if not name or not isinstance(name, str):
             raise ValueError("name must be a string")
 
-        self._logger.info("fetching '%s'", name)
+        if not callable(callback):
+            raise ValueError("callback must be callable")
 
-        config_path = "{0}/{1}".format(self._basefolder, name)
-        keys = self._client.get_all()
+        config_path = self._config_prefix(name)
+        kvs, revision = self._range(config_path)
+        if self._blob_header(config_path, kvs) is not None or \
+                self._resolve(config_path, kvs)[0] != config_path:
+            raise NotImplementedError(
+                "watch is not supported by blob or published configurations")
 
-        flat_dict = dict()
-        for value, metadata in keys:
-            key = metadata.key.decode('utf-8')
-            if key.startswith(config_path):
-                key_done = key.replace(config_path, "", 1)
-                flat_dict[key_done] = value.decode('utf-8')
+        items = self._flat_items(config_path, kvs)
+        config = self._unflatten(config_path, items)
+        flat_dict = {key.decode('utf-8'): value for key, value in items}
 
-        if not flat_dict:
-            return dict()
+        reserved_path = _to_bytes(config_path + RESERVED_PREFIX)
+        reserved = {
+            kv.key: kv.value for kv in kvs
+            if kv.key.startswith(reserved_path)
+        }
+
+        watch = etcdgo.watch.ConfigWatch(
+            name,
+            config_path,
+            config,
+            flat_dict,
+            revision,
+            callback,
+            reserved=reserved)
+
+        watch.start(
+            lambda handler, start: self._watch(name, handler, start),
+            self._cancel_watch)
+
+        return watch
+
+    @_observed("pull")
+    def pull(self, name, revision=None, consistency=None, path=None):
+        """
+        Pull a format supported configuration from an etcd database. All
+        keys are read at the same revision, which is returned together with
+        the configuration, so pulling again at that revision always returns
+        the same configuration, until the revision is compacted.
+
+        Linearizable reads go through the cluster leader and they always
+        see the latest configuration. Serializable reads are served by the
+        cluster member the client is connected to, so they are faster but
+        they can return a slightly stale configuration. Use
+        etcdgo.cluster.ClusterClient to spread them across members.
+
+        When the configuration object has been created with coalesce=True,
+        concurrent pulls of the same configuration, revision and
+        consistency share a single read and the same returned dictionary,
+        which must not be modified. The number of pulls which didn't read
+        the configuration by themselves is counted by the coalesced
+        attribute. Coalescing is not supported by asyncio configurations.
+
+        When path is given, only the keys of that section are read and
+        decoded, and the section is returned instead of the whole
+        configuration. Configurations pushed as a single blob are always
+        read as a whole.
+
+        Examples:
+
+            data = config.pull("myconfig")
+            other = config.pull("otherconfig", revision=data.revision)
+            fast = config.pull("myconfig", consistency="serializable")
+            pool = config.pull("myconfig", path="db/pool")
+
+        Args:
+            name        (str): name to associate with file.
+            revision    (int): revision to read at. If None, the latest
+                revision is read.
+            consistency (str): linearizable or serializable. If None, the
+                consistency given to the configuration object is used.
+            path        (str): slash separated path of the section to pull.
+                Slashes inside keys must be escaped with
+                etcdgo.codec.escape. If None, the whole configuration is
+                pulled.
 
-        self._logger.info("config_path = %s", config_path)
-        self._logger.info("flat_dict = %s", flat_dict)
+        Returns:
+            ConfigData: configuration stored inside the database.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
 
-        def slash_reducer(flat_key):
-            # first element is empty
-            return flat_key.split("/")[1:]
+        if path is not None:
+            path = _check_path(path)
+
+        if revision is not None and \
+                (not isinstance(revision, int) or revision <= 0):
+            raise ValueError("revision must be a positive integer")
+
+        if consistency is not None:
+            _check_consistency(consistency)
+
+        self._logger.info("fetching '%s'", name)
 
-        config = flatten_dict.unflatten(flat_dict, splitter=slash_reducer)
+        fetch = self._fetch_coalesced if self._coalesce else self._fetch
+        config = fetch(
+            name,
+            revision=revision,
+            consistency=consistency,
+            path=path)
 
         self._logger.info("configuration fetched")
 
         return config
 
-    def dump(self, name):
+    def _top_keys(self, name, revision=None, consistency=None):
+        """
+        Return the names of the top level sections and values of a
+        configuration, reading only its keys.
+
+        Args:
+            name        (str): name associated with the configuration.
+            revision    (int): revision to read at.
+            consistency (str): consistency of the read.
+
+        Returns:
+            tuple: sorted list of names and the revision they have been
+                read at.
+        """
+        config_path = self._config_prefix(name)
+        serializable = (consistency or self._consistency) == SERIALIZABLE
+
+        base, revision = self._current_path(
+            config_path,
+            revision=revision,
+            serializable=serializable)
+
+        kvs, _ = self._range(
+            base,
+            revision=revision,
+            keys_only=True,
+            serializable=serializable)
+
+        if _find(kvs, _to_bytes(base + BLOB_KEY)) is not None:
+            config = self._fetch(
+                name,
+                revision=revision,
+                consistency=consistency)
+
+            return sorted(config), revision
+
+        prefix_len = len(_to_bytes(base))
+        keys = set()
+        for kv in kvs:
+            key = kv.key[prefix_len:].decode('utf-8')
+            if not key.startswith(RESERVED_PREFIX):
+                keys.add(etcdgo.codec.unescape(key.split("/", 1)[0]))
+
+        return sorted(keys), revision
+
+    def lazy(self, name, revision=None, consistency=None):
+        """
+        Return a read-only mapping of a configuration, which fetches every
+        top level section the first time it's accessed. Services reading
+        only a few sections of a big configuration don't fetch and decode
+        the other ones. Iterating over the mapping reads all the keys of
+        the configuration, without their values.
+
+        Examples:
+
+            data = config.lazy("myconfig")
+            pool = data["db"]["pool"]
+
+        Args:
+            name        (str): name associated with the configuration.
+            revision    (int): revision to read at. If None, the revision
+                of the first read is used by all the following ones.
+            consistency (str): see pull.
+
+        Returns:
+            LazyConfig: configuration mapping.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        if revision is not None and \
+                (not isinstance(revision, int) or revision <= 0):
+            raise ValueError("revision must be a positive integer")
+
+        if consistency is not None:
+            _check_consistency(consistency)
+
+        return LazyConfig(self, name, revision, consistency)
+
+    @_observed("dump")
+    def dump(self, name, revision=None, consistency=None):
         """
         Pull a format supported configuration from an etcd database and
         convert it to string.
 
         Args:
-            name (str): name to associate with file.
+            name        (str): name to associate with file.
+            revision    (int): revision to read at. If None, the latest
+                revision is read.
+            consistency (str): see pull.
 
         Returns:
             str: configuration as string.
         """
-        data = self.pull(name)
-        data_str = self._convert_to_str(data)
+        data = self.pull(name, revision=revision, consistency=consistency)
+
+        with etcdgo.metrics.phase(self._operation(), "serialize"):
+            data_str = self._convert_to_str(data)
 
         return data_str
 
+    def _infos(self, kvs):
+        """
+        Group the keys read under basefolder by configuration.
+
+        Args:
+            kvs (list): etcd KeyValue messages, sorted by key.
+
+        Returns:
+            list: ConfigInfo objects, sorted by name.
+        """
+        prefix_len = len(_to_bytes(self._basefolder + "/"))
+        infos = []
+
+        for kv in kvs:
+            name, sep, _ = kv.key[prefix_len:].partition(b"/")
+            if not sep:
+                # key doesn't belong to any configuration
+                continue
+
+            name = name.decode('utf-8')
+            if not infos or infos[-1].name != name:
+                infos.append(ConfigInfo(name))
+
+            info = infos[-1]
+            info.keys += 1
+            info.mod_revision = max(info.mod_revision, kv.mod_revision)
+
+        return infos
+
+    def list(self):
+        """
+        List the configurations stored under basefolder. Keys are read
+        without their values, so the cost depends on the number of keys
+        and not on the size of the configurations.
+
+        Examples:
+
+            for info in config.list():
+                print(info.name, info.keys, info.mod_revision)
+
+        Returns:
+            list: ConfigInfo objects holding name, number of keys,
+                reserved ones included, and last modification revision of
+                every configuration, sorted by name.
+        """
+        kvs, _ = self._range(self._basefolder + "/", keys_only=True)
+
+        return self._infos(kvs)
+
+    def _delete_ops(self, name):
+        """
+        Return the operation deleting all the keys of a configuration.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            list: etcd transaction operations.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        start = _to_bytes(self._config_prefix(name))
+
+        return [self._client.transactions.delete(
+            start,
+            range_end=_prefix_end(start))]
+
+    def delete(self, name):
+        """
+        Delete a configuration with a single range request.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            int: number of deleted keys.
+        """
+        ops = self._delete_ops(name)
+
+        self._logger.info("deleting '%s'", name)
+
+        response = self._transaction(
+            compare=[],
+            success=ops,
+            failure=[])
+
+        return sum(
+            item.response_delete_range.deleted
+            for item in response.responses)
+
+    def _run_many(self, func, names, concurrency):
+        """
+        Run func over names using a pool of concurrency threads, collecting
+        results and errors.
+
+        Args:
+            func    (function): function called with a configuration name.
+            names       (list): configuration names.
+            concurrency  (int): number of concurrent operations.
+
+        Returns:
+            BulkResult: results and errors by configuration name.
+        """
+        result = BulkResult()
+
+        with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+            futures = {executor.submit(func, name): name for name in names}
+
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                try:
+                    result.results[name] = future.result()
+                except Exception as exc:
+                    self._logger.error("'%s' failed: %s", name, exc)
+                    result.errors[name] = exc
+
+        return result
+
+    def push_many(self, configs, concurrency=8, **kwargs):
+        """
+        Push many files concurrently. Files are parsed and pushed by a pool
+        of threads sharing the same etcd client. A failure doesn't stop the
+        other pushes and it's reported inside the returned errors.
+
+        Examples:
+
+            result = config.push_many({
+                "service0": "service0.json",
+                "service1": "service1.json",
+            })
+
+            if not result.ok:
+                print(result.errors)
+
+        Args:
+            configs     (dict): files to push, by configuration name.
+            concurrency  (int): maximum number of concurrent pushes.
+            kwargs      (dict): see push.
+
+        Returns:
+            BulkResult: PushStats by configuration name.
+        """
+        if not isinstance(configs, dict):
+            raise ValueError("configs must be a dictionary")
+
+        _check_concurrency(concurrency)
+
+        return self._run_many(
+            lambda name: self.push(name, configs[name], **kwargs),
+            list(configs.keys()),
+            concurrency)
+
+    def pull_many(
+            self,
+            names,
+            concurrency=8,
+            revision=None,
+            consistency=None):
+        """
+        Pull many configurations concurrently, using a pool of threads
+        sharing the same etcd client. A failure doesn't stop the other pulls
+        and it's reported inside the returned errors. When revision is
+        given, all configurations are read at the same revision.
+
+        Args:
+            names       (list): configuration names.
+            concurrency  (int): maximum number of concurrent pulls.
+            revision     (int): revision to read at.
+            consistency  (str): see pull.
+
+        Returns:
+            BulkResult: configurations by name.
+        """
+        if not isinstance(names, (list, tuple, set)):
+            raise ValueError("names must be a list")
+
+        _check_concurrency(concurrency)
+
+        return self._run_many(
+            lambda name: self.pull(
+                name,
+                revision=revision,
+                consistency=consistency),
+            list(names),
+            concurrency)
+
 
 class JsonConfig(Config):
     """
     Push/pull JSON configurations inside an etcd database.
     """
+    FORMAT = "json"
+
+    def _leaves(self, filepath):
+        with open(filepath, 'r') as fdata:
+            yield from etcdgo.stream.json_leaves(fdata)
 
     def _convert(self, filepath):
         data = dict()
         with open(filepath, 'r') as fdata:
-            data = json.loads(fdata.read())
+            data = self._parse(fdata.read(), self._pure_python)
         return data
 
+    @staticmethod
+    def _parse(text, pure=None):
+        return etcdgo.engine.json_loads(text, pure)
+
     def _convert_to_str(self, data):
-        data_str = json.dumps(data, sort_keys=True, indent=4)
+        data_str = etcdgo.engine.json_dumps(data, self._pure_python)
         return data_str
 
 
@@ -159,15 +2501,25 @@ class YamlConfig(Config):
     """
     Push/pull Yaml configurations inside an etcd database.
     """
+    FORMAT = "yaml"
+
+    def _leaves(self, filepath):
+        with open(filepath, 'r') as fdata:
+            yield from etcdgo.stream.yaml_leaves(fdata)
 
     def _convert(self, filepath):
         data = dict()
         with open(filepath, 'r') as fdata:
-            data = yaml.safe_load(fdata.read())
+            data = self._parse(fdata.read(), self._pure_python)
         return data
 
+    @staticmethod
+    def _parse(text, pure=None):
+        return etcdgo.engine.yaml_load(text, pure)
+
     def _convert_to_str(self, data):
-        data_str = yaml.dump(data)
+        # pulled configurations are ConfigData, which safe dumpers reject
+        data_str = etcdgo.engine.yaml_dump(dict(data), self._pure_python)
         return data_str
 
 
@@ -175,6 +2527,7 @@ class IniConfig(Config):
     """
     Push/pull Yaml configurations inside an etcd database.
     """
+    FORMAT = "ini"
 
     def _convert(self, filepath):
         parser = configparser.ConfigParser()
@@ -183,6 +2536,15 @@ class IniConfig(Config):
                 for section in parser.sections()}
         return data
 
+    @staticmethod
+    def _parse(text, pure=None):
+        # pylint: disable=unused-argument
+        parser = configparser.ConfigParser()
+        parser.read_string(text)
+        data = {section: dict(parser.items(section))
+                for section in parser.sections()}
+        return data
+
     def _convert_to_str(self, data):
         data_list = []
         for section_name, section in data.items():
@@ -194,3 +2556,11 @@ class IniConfig(Config):
 
         data_str = "\n".join(data_list)
         return data_str
+
+
+# configuration classes by the format name stored inside blob headers
+FORMATS = {
+    JsonConfig.FORMAT: JsonConfig,
+    YamlConfig.FORMAT: YamlConfig,
+    IniConfig.FORMAT: IniConfig,
+}
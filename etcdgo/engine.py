@@ -0,0 +1,221 @@
+"""
+JSON/Yaml engines used to parse and dump configurations. The fastest
+available engine is used: orjson or ujson for JSON, libyaml for Yaml.
+Pure Python engines are used when no other one is installed, when
+pure=True is given, or when the ETCDGO_PURE_PYTHON environment variable is
+set.
+
+Parsed configurations are the same whatever is the engine. Dumped
+configurations are the same too, with a few exceptions of the JSON ones:
+
+* floats can be written with a different notation, like 1e16 instead of
+  1e+16, which is the same number
+* orjson writes NaN and Infinity as null
+* ujson writes forward slashes escaped
+
+Values which are not supported by an accelerated engine, like integers
+bigger than 64 bits, are handled by the pure Python one.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import re
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# environment variable forcing pure Python engines
+PURE_PYTHON_ENV = "ETCDGO_PURE_PYTHON"
+
+# default of the pure argument
+PURE_PYTHON = bool(os.environ.get(PURE_PYTHON_ENV))
+
+_NON_ASCII = re.compile("[^\x00-\x7e]")
+
+
+def _yaml():
+    """
+    Return the yaml module, which is imported only when it's needed.
+    """
+    # pylint: disable=import-outside-toplevel
+    import yaml
+    return yaml
+
+
+def _pure(pure):
+    """
+    Return True if pure Python engines must be used.
+    """
+    return PURE_PYTHON if pure is None else pure
+
+
+def names(pure=None):
+    """
+    Return the names of the engines in use.
+
+    Args:
+        pure (bool): use pure Python engines. If None, PURE_PYTHON is used.
+
+    Returns:
+        dict: engine name by format.
+    """
+    pure = _pure(pure)
+
+    json_name = "json"
+    if not pure and orjson:
+        json_name = "orjson"
+    elif not pure and ujson:
+        json_name = "ujson"
+
+    yaml_name = "pyyaml"
+    if not pure and hasattr(_yaml(), "CSafeLoader"):
+        yaml_name = "libyaml"
+
+    return {"json": json_name, "yaml": yaml_name}
+
+
+def _reindent(text):
+    """
+    Convert a JSON document indented with 2 spaces into one indented with
+    4 spaces. JSON strings never hold new lines or NUL characters, so each
+    line starts with its indentation and NUL can be used as placeholder.
+    """
+    depth = 1
+    while "\n" + "  " * depth in text:
+        depth += 1
+
+    # deepest lines first, so shallower patterns don't match them
+    for level in range(depth - 1, 0, -1):
+        text = text.replace("\n" + "  " * level, "\n" + "\0" * level)
+
+    return text.replace("\0", "    ")
+
+
+def _is_ascii(text):
+    """
+    Return True if text holds ASCII characters only.
+    """
+    try:
+        text.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+
+    return True
+
+
+def _ascii_escape(match):
+    """
+    Return the JSON escape sequence of a non ASCII character.
+    """
+    code = ord(match.group(0))
+    if code < 0x10000:
+        return "\\u%04x" % code
+
+    code -= 0x10000
+    return "\\u%04x\\u%04x" % (0xd800 + (code >> 10), 0xdc00 + (code & 0x3ff))
+
+
+def json_loads(text, pure=None):
+    """
+    Parse a JSON document.
+
+    Args:
+        text  (str): JSON document.
+        pure (bool): use pure Python engine. If None, PURE_PYTHON is used.
+
+    Returns:
+        object: parsed document.
+    """
+    if not _pure(pure):
+        try:
+            if orjson:
+                return orjson.loads(text)
+
+            if ujson:
+                return ujson.loads(text)
+        except ValueError:
+            # NaN, big integers, or a syntax error which is reported by the
+            # pure Python engine
+            pass
+
+    return json.loads(text)
+
+
+def json_dumps(data, pure=None):
+    """
+    Dump a JSON document with sorted keys and 4 spaces indentation.
+
+    Args:
+        data (object): document to dump.
+        pure   (bool): use pure Python engine. If None, PURE_PYTHON is used.
+
+    Returns:
+        str: JSON document.
+    """
+    if not _pure(pure):
+        try:
+            if orjson:
+                text = orjson.dumps(
+                    data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+                text = _reindent(text.decode('utf-8'))
+                if not _is_ascii(text) or "\x7f" in text:
+                    text = _NON_ASCII.sub(_ascii_escape, text)
+
+                return text
+
+            if ujson:
+                return ujson.dumps(data, sort_keys=True, indent=4)
+        except (TypeError, OverflowError):
+            pass
+
+    return json.dumps(data, sort_keys=True, indent=4)
+
+
+def yaml_load(text, pure=None):
+    """
+    Parse a Yaml document with the safe loader.
+
+    Args:
+        text  (str): Yaml document.
+        pure (bool): use pure Python engine. If None, PURE_PYTHON is used.
+
+    Returns:
+        object: parsed document.
+    """
+    yaml = _yaml()
+    if not _pure(pure) and hasattr(yaml, "CSafeLoader"):
+        return yaml.load(text, Loader=yaml.CSafeLoader)
+
+    return yaml.safe_load(text)
+
+
+def yaml_dump(data, pure=None):
+    """
+    Dump a Yaml document with the safe dumper.
+
+    Args:
+        data (object): document to dump. It can hold plain Python types
+            only, like the ones returned by yaml_load.
+        pure   (bool): use pure Python engine. If None, PURE_PYTHON is used.
+
+    Returns:
+        str: Yaml document.
+
+    Raises:
+        yaml.representer.RepresenterError: if data holds other types.
+    """
+    yaml = _yaml()
+    if not _pure(pure) and hasattr(yaml, "CSafeDumper"):
+        return yaml.dump(data, Dumper=yaml.CSafeDumper)
+
+    return yaml.dump(data, Dumper=yaml.SafeDumper)
@@ -0,0 +1,201 @@
+"""
+etcd3 backend definition. etcd3.Etcd3Client doesn't send the limit and the
+revision of range requests to the server, and it doesn't return the
+revision of transactions, so configuration objects don't use it directly:
+Etcd3Backend builds the requests by itself and sends them over the client
+connection.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import functools
+import grpc
+import etcd3
+import etcd3.utils
+import etcd3.etcdrpc as etcdrpc
+import etcd3.exceptions
+import etcdgo.backend
+
+# etcd3 exceptions raised on gRPC errors, like etcd3.Etcd3Client does
+EXCEPTIONS_BY_CODE = {
+    grpc.StatusCode.INTERNAL: etcd3.exceptions.InternalServerError,
+    grpc.StatusCode.UNAVAILABLE: etcd3.exceptions.ConnectionFailedError,
+    grpc.StatusCode.DEADLINE_EXCEEDED:
+        etcd3.exceptions.ConnectionTimeoutError,
+    grpc.StatusCode.FAILED_PRECONDITION:
+        etcd3.exceptions.PreconditionFailedError,
+}
+
+
+def _handle_errors(func):
+    """
+    Translate gRPC errors into etcd3 exceptions. Other errors, like reads
+    of a future revision, are raised as they are.
+    """
+    @functools.wraps(func)
+    def handler(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except grpc.RpcError as exc:
+            exception = EXCEPTIONS_BY_CODE.get(exc.code())
+            if exception is None:
+                raise
+            raise exception()
+
+    return handler
+
+
+def range_request(
+        range_start,
+        range_end,
+        limit=None,
+        revision=None,
+        keys_only=False,
+        serializable=False):
+    """
+    Build a range request. See etcdgo.backend.Backend.get_range_response.
+
+    Returns:
+        etcdrpc.RangeRequest: range request.
+    """
+    # pylint: disable=too-many-arguments
+    request = etcdrpc.RangeRequest(
+        key=etcd3.utils.to_bytes(range_start),
+        limit=limit or 0,
+        revision=revision or 0,
+        keys_only=keys_only,
+        serializable=serializable)
+
+    if range_end is not None:
+        request.range_end = etcd3.utils.to_bytes(range_end)
+
+    return request
+
+
+def ops_to_requests(ops):
+    """
+    Convert etcd3 transaction operations into gRPC request operations.
+
+    Args:
+        ops (list): etcd3.transactions.Put/Delete objects.
+
+    Returns:
+        list: etcdrpc.RequestOp messages.
+    """
+    requests = []
+    for op in ops or []:
+        if isinstance(op, etcd3.transactions.Put):
+            request = etcdrpc.RequestOp(request_put=etcdrpc.PutRequest(
+                key=etcd3.utils.to_bytes(op.key),
+                value=etcd3.utils.to_bytes(op.value)))
+        elif isinstance(op, etcd3.transactions.Delete):
+            request = etcdrpc.DeleteRangeRequest(
+                key=etcd3.utils.to_bytes(op.key))
+            if op.range_end is not None:
+                request.range_end = etcd3.utils.to_bytes(op.range_end)
+            request = etcdrpc.RequestOp(request_delete_range=request)
+        else:
+            raise ValueError("'%s' operation is not supported" %
+                             op.__class__.__name__)
+
+        requests.append(request)
+
+    return requests
+
+
+def txn_request(compare, success=None, failure=None):
+    """
+    Build a transaction request. See etcdgo.backend.Backend.transaction.
+
+    Returns:
+        etcdrpc.TxnRequest: transaction request.
+    """
+    return etcdrpc.TxnRequest(
+        compare=[item.build_message() for item in compare],
+        success=ops_to_requests(success),
+        failure=ops_to_requests(failure))
+
+
+class Etcd3Backend(etcdgo.backend.Backend):
+    """
+    Backend talking to an etcd database through the connection of an
+    etcd3.Etcd3Client. It's the backend used by configuration objects
+    created with an etcd3.Etcd3Client. Attributes which are not part of the
+    backend protocol are the ones of the client.
+
+    Examples:
+
+        import etcd3
+        import etcdgo.etcd
+
+        backend = etcdgo.etcd.Etcd3Backend(etcd3.Etcd3Client())
+        response = backend.get_range_response(b"/config/", b"/config0",
+                                              revision=10)
+    """
+
+    def __init__(self, client):
+        """
+        Args:
+            client (etcd3.Etcd3Client): etcd client. Transaction operations
+                are built with its transactions attribute.
+        """
+        # pylint: disable=super-init-not-called
+        self.client = client
+
+    def __getattr__(self, name):
+        if name == "client":
+            raise AttributeError(name)
+
+        return getattr(self.client, name)
+
+    def _call(self, method, request):
+        """
+        Send a request with the client timeout and credentials.
+        """
+        return method(
+            request,
+            self.client.timeout,
+            credentials=self.client.call_credentials,
+            metadata=self.client.metadata)
+
+    @_handle_errors
+    def get_range_response(
+            self,
+            range_start,
+            range_end,
+            limit=None,
+            revision=None,
+            keys_only=False,
+            serializable=False):
+        # pylint: disable=too-many-arguments
+        request = range_request(
+            range_start,
+            range_end,
+            limit=limit,
+            revision=revision,
+            keys_only=keys_only,
+            serializable=serializable)
+
+        return self._call(self.client.kvstub.Range, request)
+
+    @_handle_errors
+    def transaction_response(self, compare, success=None, failure=None):
+        request = txn_request(compare, success=success, failure=failure)
+
+        return self._call(self.client.kvstub.Txn, request)
+
+    def add_watch_prefix_callback(
+            self,
+            key_prefix,
+            callback,
+            start_revision=None):
+        return self.client.add_watch_prefix_callback(
+            key_prefix,
+            callback,
+            start_revision=start_revision)
+
+    def cancel_watch(self, watch_id):
+        self.client.cancel_watch(watch_id)
+
+    def close(self):
+        self.client.close()
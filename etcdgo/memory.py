@@ -0,0 +1,447 @@
+"""
+In-process key/value backend, which keeps a multi-version history of the
+keys like etcd does. It can replace the etcd client in tests and benchmarks,
+or be used by applications which don't need a shared database.
+
+Usage:
+
+    backend = etcdgo.memory.MemoryBackend()
+    config = etcdgo.get_config(backend, "json")
+
+Watch callbacks are run by the thread which committed the changes, after
+the changes are visible to readers.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import bisect
+import logging
+import operator
+import threading
+import collections
+import etcdgo.backend
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+
+def _prefix_end(prefix):
+    """
+    Return the first key which is greater than all the keys starting with
+    prefix.
+    """
+    end = bytearray(prefix)
+    end[-1] = end[-1] + 1
+    return bytes(end)
+
+
+class _Watch:
+    """
+    A registered watch.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, start, end, callback, first_revision):
+        self.start = start
+        self.end = end
+        self.callback = callback
+        # revisions before this one are replayed on registration
+        self.first_revision = first_revision
+
+    def matches(self, key):
+        """
+        Return True if key is watched.
+        """
+        return self.start <= key < self.end
+
+
+class MemoryBackend(etcdgo.backend.Backend):
+    """
+    Key/value backend storing data in memory. Keys are kept inside a sorted
+    index, so range requests cost a binary search, and each key keeps its
+    history, so old revisions can be read until they are compacted.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self._logger = logging.getLogger("etcdgo.memory")
+        self._lock = threading.Lock()
+        self._revision = 1
+        self._compact_revision = 0
+
+        # sorted keys which have an history
+        self._index = []
+        # key -> (revisions list, KeyValue list), None for deletions
+        self._history = dict()
+        # key -> KeyValue of the existing keys
+        self._latest = dict()
+
+        self._watch_id = 0
+        self._watches = dict()
+        # (revision, events) waiting to be notified, in commit order
+        self._pending = collections.deque()
+        self._notify_lock = threading.RLock()
+
+    @property
+    def revision(self):
+        """
+        Current revision of the backend.
+        """
+        return self._revision
+
+    def _keys(self, start, end):
+        """
+        Return the keys with an history in range [start, end).
+        """
+        if end is None:
+            return [start] if start in self._history else []
+
+        first = bisect.bisect_left(self._index, start)
+        if end == b'\0':
+            return self._index[first:]
+
+        last = bisect.bisect_left(self._index, end)
+        return self._index[first:last]
+
+    def _get(self, key, revision):
+        """
+        Return the KeyValue of key at revision, or None if it doesn't exist.
+        """
+        if revision is None:
+            return self._latest.get(key)
+
+        revisions, kvs = self._history[key]
+        pos = bisect.bisect_right(revisions, revision)
+        if not pos:
+            return None
+
+        return kvs[pos - 1]
+
+    def _check_revision(self, revision):
+        """
+        Raise ValueError if revision can't be read.
+        """
+        if revision > self._revision:
+            raise ValueError(
+                "required revision %d is a future revision" % revision)
+
+        if revision < self._compact_revision:
+            raise ValueError(
+                "required revision %d has been compacted" % revision)
+
+    def _range(self, start, end, revision=None):
+        """
+        Return the KeyValue of the keys existing at revision in range
+        [start, end).
+        """
+        kvs = []
+        for key in self._keys(start, end):
+            kv = self._get(key, revision)
+            if kv:
+                kvs.append(kv)
+
+        return kvs
+
+    def get_range_response(
+            self,
+            range_start,
+            range_end,
+            limit=None,
+            revision=None,
+            keys_only=False,
+            serializable=False):
+        # pylint: disable=too-many-arguments,unused-argument
+        range_start = etcdgo.backend.to_bytes(range_start)
+        range_end = etcdgo.backend.to_bytes(range_end)
+
+        with self._lock:
+            if revision is not None and revision > 0:
+                self._check_revision(revision)
+            else:
+                revision = None
+
+            kvs = self._range(range_start, range_end, revision)
+            current = self._revision
+
+        count = len(kvs)
+        more = False
+        if limit and count > limit:
+            kvs = kvs[:limit]
+            more = True
+
+        if keys_only:
+            kvs = [
+                etcdgo.backend.KeyValue(
+                    kv.key,
+                    b'',
+                    kv.create_revision,
+                    kv.mod_revision,
+                    kv.version)
+                for kv in kvs
+            ]
+
+        return etcdgo.backend.RangeResponse(current, kvs, more, count)
+
+    def _compare(self, compare):
+        """
+        Return True if comparison succeeds. Missing keys compare like keys
+        with zero revisions and version, but value comparisons fail.
+        """
+        kvs = self._range(compare.key, compare.range_end)
+        if not kvs:
+            if compare.TARGET == "value":
+                return False
+
+            kvs = [etcdgo.backend.KeyValue(compare.key, b'', 0, 0, 0)]
+
+        func = _OPERATORS[compare.op]
+        return all(
+            func(getattr(kv, compare.TARGET), compare.value) for kv in kvs)
+
+    @staticmethod
+    def _check_ops(ops):
+        """
+        Raise ValueError if a key is written twice, or both written and
+        deleted, inside the same transaction.
+        """
+        puts = set()
+        deletes = []
+
+        for op in ops:
+            if isinstance(op, etcdgo.backend.Put):
+                if op.key in puts:
+                    raise ValueError("duplicate key given in transaction")
+                puts.add(op.key)
+            elif isinstance(op, etcdgo.backend.Delete):
+                deletes.append(op)
+            else:
+                raise NotImplementedError(
+                    "unsupported operation %s" % type(op).__name__)
+
+        for op in deletes:
+            if not op.range_end:
+                overlap = op.key in puts
+            else:
+                overlap = any(
+                    op.key <= key and
+                    (op.range_end == b'\0' or key < op.range_end)
+                    for key in puts)
+
+            if overlap:
+                raise ValueError("duplicate key given in transaction")
+
+    def _write(self, key, kv, revision):
+        """
+        Append a KeyValue, or a deletion if kv is None, to key history.
+        """
+        history = self._history.get(key)
+        if history is None:
+            history = ([], [])
+            self._history[key] = history
+            bisect.insort(self._index, key)
+
+        history[0].append(revision)
+        history[1].append(kv)
+
+        if kv is None:
+            self._latest.pop(key, None)
+        else:
+            self._latest[key] = kv
+
+    def _put(self, key, value, revision):
+        """
+        Write a key and return its PutEvent.
+        """
+        current = self._latest.get(key)
+        if current:
+            kv = etcdgo.backend.KeyValue(
+                key,
+                value,
+                current.create_revision,
+                revision,
+                current.version + 1)
+        else:
+            kv = etcdgo.backend.KeyValue(key, value, revision, revision, 1)
+
+        self._write(key, kv, revision)
+
+        return etcdgo.backend.PutEvent(kv)
+
+    def _delete(self, start, end, revision):
+        """
+        Delete keys in range [start, end) and return their DeleteEvent.
+        """
+        events = []
+        for kv in self._range(start, end):
+            self._write(kv.key, None, revision)
+            events.append(etcdgo.backend.DeleteEvent(
+                etcdgo.backend.KeyValue(kv.key, b'', 0, revision, 0)))
+
+        return events
+
+    def transaction_response(self, compare, success=None, failure=None):
+        with self._lock:
+            succeeded = all(self._compare(item) for item in compare)
+            ops = (success if succeeded else failure) or []
+            self._check_ops(ops)
+
+            revision = self._revision + 1
+            events = []
+            results = []
+
+            for op in ops:
+                if isinstance(op, etcdgo.backend.Put):
+                    events.append(self._put(op.key, op.value, revision))
+                    results.append(None)
+                else:
+                    deleted = self._delete(op.key, op.range_end, revision)
+                    events.extend(deleted)
+                    results.append(len(deleted))
+
+            if events:
+                self._revision = revision
+                self._pending.append((revision, events))
+
+            revision = self._revision
+
+        responses = []
+        for deleted in results:
+            if deleted is None:
+                responses.append(etcdgo.backend.ResponseOp(
+                    response_put=etcdgo.backend.PutResponse(revision)))
+            else:
+                responses.append(etcdgo.backend.ResponseOp(
+                    response_delete_range=etcdgo.backend.DeleteRangeResponse(
+                        revision, deleted)))
+
+        self._notify()
+
+        return etcdgo.backend.TxnResponse(revision, succeeded, responses)
+
+    def _call(self, callback, response):
+        """
+        Run a watch callback, logging its errors.
+        """
+        try:
+            callback(response)
+        except Exception:  # pylint: disable=broad-except
+            self._logger.exception("watch callback failed")
+
+    def _notify(self):
+        """
+        Notify pending events to watches, in commit order.
+        """
+        with self._notify_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return
+
+                    revision, events = self._pending.popleft()
+                    watches = list(self._watches.values())
+
+                for watch in watches:
+                    if revision < watch.first_revision:
+                        continue
+
+                    matched = [
+                        event for event in events if watch.matches(event.key)
+                    ]
+                    if matched:
+                        self._call(
+                            watch.callback,
+                            etcdgo.backend.WatchResponse(revision, matched))
+
+    def _events(self, start, end, start_revision):
+        """
+        Return the responses of the changes in range [start, end) since
+        start_revision, one for each revision.
+        """
+        changes = dict()
+
+        for key in self._keys(start, end):
+            revisions, kvs = self._history[key]
+            pos = bisect.bisect_left(revisions, start_revision)
+
+            for revision, kv in zip(revisions[pos:], kvs[pos:]):
+                if kv is None:
+                    event = etcdgo.backend.DeleteEvent(
+                        etcdgo.backend.KeyValue(key, b'', 0, revision, 0))
+                else:
+                    event = etcdgo.backend.PutEvent(kv)
+
+                changes.setdefault(revision, []).append(event)
+
+        return [
+            etcdgo.backend.WatchResponse(revision, changes[revision])
+            for revision in sorted(changes)
+        ]
+
+    def add_watch_prefix_callback(
+            self,
+            key_prefix,
+            callback,
+            start_revision=None):
+        key_prefix = etcdgo.backend.to_bytes(key_prefix)
+        end = _prefix_end(key_prefix)
+
+        with self._notify_lock:
+            with self._lock:
+                replay = []
+                if start_revision is not None:
+                    self._check_revision(min(start_revision, self._revision))
+                    replay = self._events(key_prefix, end, start_revision)
+
+                self._watch_id += 1
+                watch_id = self._watch_id
+                self._watches[watch_id] = _Watch(
+                    key_prefix, end, callback, self._revision + 1)
+
+            for response in replay:
+                self._call(callback, response)
+
+        return watch_id
+
+    def cancel_watch(self, watch_id):
+        with self._lock:
+            self._watches.pop(watch_id, None)
+
+    def compact(self, revision):
+        """
+        Drop the history older than revision. Revisions before it can't be
+        read or watched anymore.
+
+        Args:
+            revision (int): first revision to keep.
+        """
+        with self._lock:
+            self._check_revision(revision)
+
+            for key in self._index:
+                revisions, kvs = self._history[key]
+
+                # keep the value key had at revision
+                pos = bisect.bisect_right(revisions, revision) - 1
+                if pos < 0:
+                    continue
+
+                if kvs[pos] is None and revisions[pos] < revision:
+                    pos += 1
+
+                del revisions[:pos]
+                del kvs[:pos]
+
+                if not revisions:
+                    del self._history[key]
+
+            self._index = [key for key in self._index if key in self._history]
+            self._compact_revision = revision
+
+    def close(self):
+        with self._lock:
+            self._watches.clear()
@@ -0,0 +1,393 @@
+"""
+Instrumentation of configuration operations. Every push, pull and dump of a
+configuration object with observers is measured by an Operation, which is
+given to the observers once the operation is over:
+
+    import etcdgo.metrics
+
+    metrics = etcdgo.metrics.Metrics()
+    config = etcdgo.get_config(client, "json", observers=[metrics])
+    config.pull("myconfig")
+
+    print(metrics.prometheus())
+
+Operations report the time spent inside each phase: parse (files and blobs
+parsing), flatten (conversion of configurations into keys), rpc (database
+requests), unflatten (conversion of keys into configurations) and serialize
+(dump of configurations). Streamed pushes parse and flatten files while
+keys are sent, so both are reported as parse.
+
+Configuration objects without observers don't measure anything.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import time
+import socket
+import logging
+import threading
+
+PHASES = ["parse", "flatten", "rpc", "unflatten", "serialize"]
+
+
+class Operation:
+    """
+    Measures of a single push, pull or dump.
+    """
+
+    def __init__(self, kind, name):
+        """
+        Args:
+            kind (str): operation kind, like push or pull.
+            name (str): name of the configuration.
+        """
+        self.kind = kind
+        self.name = name
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.keys = 0
+        self.rpcs = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.duration = 0.0
+        self.error = None
+        self._start = time.perf_counter()
+
+    def add_phase(self, name, seconds):
+        """
+        Add time spent inside a phase.
+
+        Args:
+            name       (str): phase name.
+            seconds  (float): elapsed time.
+        """
+        self.phases[name] += seconds
+
+    def add_rpc(self, seconds, keys=0, bytes_sent=0, bytes_received=0):
+        """
+        Add a database request.
+
+        Args:
+            seconds       (float): request time.
+            keys            (int): keys written or read.
+            bytes_sent      (int): size of the written keys and values.
+            bytes_received  (int): size of the read keys and values.
+        """
+        self.phases["rpc"] += seconds
+        self.rpcs += 1
+        self.keys += keys
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+
+    def finish(self, error=None):
+        """
+        Mark the operation as over.
+
+        Args:
+            error (Exception): error which stopped the operation.
+        """
+        self.duration = time.perf_counter() - self._start
+        self.error = error
+
+    def __repr__(self):
+        return ("Operation(kind=%s, name=%s, duration=%.6f, keys=%d, "
+                "rpcs=%d, bytes_sent=%d, bytes_received=%d)") % (
+                    self.kind,
+                    self.name,
+                    self.duration,
+                    self.keys,
+                    self.rpcs,
+                    self.bytes_sent,
+                    self.bytes_received)
+
+
+class _Phase:
+    """
+    Context measuring a phase of an operation.
+    """
+    __slots__ = ["_operation", "_name", "_start"]
+
+    def __init__(self, operation, name):
+        self._operation = operation
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._operation.add_phase(
+            self._name,
+            time.perf_counter() - self._start)
+        return False
+
+
+class _NullPhase:
+    """
+    Context used when there's no operation to measure.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+def phase(operation, name):
+    """
+    Return a context measuring a phase of operation. If operation is None,
+    nothing is measured.
+
+    Args:
+        operation (Operation): operation to update.
+        name            (str): phase name.
+
+    Returns:
+        object: context manager.
+    """
+    if operation is None:
+        return _NULL_PHASE
+
+    return _Phase(operation, name)
+
+
+def timed(operation, name, items):
+    """
+    Return the items of an iterable, adding the time spent producing them
+    to a phase of operation.
+
+    Args:
+        operation (Operation): operation to update.
+        name            (str): phase name.
+        items      (iterable): items to produce.
+
+    Returns:
+        generator: items.
+    """
+    items = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            operation.add_phase(name, time.perf_counter() - start)
+            return
+        operation.add_phase(name, time.perf_counter() - start)
+
+        yield item
+
+
+class Observer:
+    """
+    Receive the measures of the operations of a configuration object.
+    Observers are called by the thread which run the operation, so they
+    must be fast and thread safe.
+    """
+
+    def on_operation(self, operation):
+        """
+        Called when an operation is over.
+
+        Args:
+            operation (Operation): operation measures.
+        """
+
+
+class Totals:
+    """
+    Measures of all the operations of a kind.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.keys = 0
+        self.rpcs = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def __repr__(self):
+        return ("Totals(count=%d, errors=%d, duration=%.6f, keys=%d, "
+                "rpcs=%d)") % (
+                    self.count,
+                    self.errors,
+                    self.duration,
+                    self.keys,
+                    self.rpcs)
+
+
+# name, help and Totals attribute of the exported counters
+_COUNTERS = [
+    ("operation_errors_total", "Operations which failed.", "errors"),
+    ("keys_total", "Keys written or read.", "keys"),
+    ("rpcs_total", "Database requests.", "rpcs"),
+    ("bytes_sent_total", "Bytes of written keys and values.", "bytes_sent"),
+    ("bytes_received_total", "Bytes of read keys and values.",
+     "bytes_received"),
+]
+
+
+class Metrics(Observer):
+    """
+    Observer aggregating the measures of the operations by kind, which can
+    be exported in the Prometheus text format.
+    """
+
+    def __init__(self, namespace="etcdgo"):
+        """
+        Args:
+            namespace (str): prefix of the exported metrics.
+        """
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._totals = dict()
+
+    def on_operation(self, operation):
+        with self._lock:
+            totals = self._totals.get(operation.kind)
+            if totals is None:
+                totals = Totals()
+                self._totals[operation.kind] = totals
+
+            totals.count += 1
+            totals.errors += operation.error is not None
+            totals.duration += operation.duration
+            totals.keys += operation.keys
+            totals.rpcs += operation.rpcs
+            totals.bytes_sent += operation.bytes_sent
+            totals.bytes_received += operation.bytes_received
+
+            for name, seconds in operation.phases.items():
+                totals.phases[name] += seconds
+
+    def totals(self, kind):
+        """
+        Return the measures of the operations of a kind.
+
+        Args:
+            kind (str): operation kind, like push or pull.
+
+        Returns:
+            Totals: aggregated measures. They are all zero if no operation
+                of that kind has been run.
+        """
+        with self._lock:
+            totals = self._totals.get(kind)
+            copy = Totals()
+            if totals:
+                copy.__dict__.update(totals.__dict__)
+                copy.phases = dict(totals.phases)
+
+            return copy
+
+    def prometheus(self):
+        """
+        Return the aggregated measures in the Prometheus text format.
+
+        Returns:
+            str: metrics exposition.
+        """
+        with self._lock:
+            kinds = sorted(self._totals.items())
+
+            lines = []
+
+            def header(name, kind, text):
+                lines.append("# HELP %s_%s %s" % (self._namespace, name, text))
+                lines.append("# TYPE %s_%s %s" % (self._namespace, name, kind))
+
+            header(
+                "operation_duration_seconds",
+                "summary",
+                "Duration of the operations.")
+            for kind, totals in kinds:
+                lines.append(
+                    '%s_operation_duration_seconds_count{operation="%s"} %d'
+                    % (self._namespace, kind, totals.count))
+                lines.append(
+                    '%s_operation_duration_seconds_sum{operation="%s"} %r'
+                    % (self._namespace, kind, totals.duration))
+
+            header(
+                "phase_seconds_total",
+                "counter",
+                "Time spent inside each phase of the operations.")
+            for kind, totals in kinds:
+                for name in PHASES:
+                    lines.append(
+                        '%s_phase_seconds_total{operation="%s",phase="%s"} %r'
+                        % (self._namespace, kind, name, totals.phases[name]))
+
+            for name, text, attr in _COUNTERS:
+                header(name, "counter", text)
+                for kind, totals in kinds:
+                    lines.append('%s_%s{operation="%s"} %d' % (
+                        self._namespace, name, kind, getattr(totals, attr)))
+
+        return "\n".join(lines) + "\n"
+
+
+class StatsdObserver(Observer):
+    """
+    Observer sending the measures of every operation to a StatsD server,
+    inside a single UDP datagram. Timings are sent in milliseconds and
+    sizes as counters. Sending errors are ignored.
+    """
+
+    def __init__(self, host="localhost", port=8125, prefix="etcdgo"):
+        """
+        Args:
+            host   (str): StatsD server host.
+            port   (int): StatsD server port.
+            prefix (str): prefix of the metric names.
+        """
+        self._logger = logging.getLogger("metrics")
+        self._address = (host, port)
+        self._prefix = prefix
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def packet(self, operation):
+        """
+        Return the StatsD datagram of an operation.
+
+        Args:
+            operation (Operation): operation measures.
+
+        Returns:
+            bytes: StatsD lines.
+        """
+        prefix = "%s.%s" % (self._prefix, operation.kind)
+        lines = ["%s.duration:%.3f|ms" % (prefix, operation.duration * 1000)]
+
+        for name in PHASES:
+            seconds = operation.phases[name]
+            if seconds:
+                lines.append("%s.%s:%.3f|ms" % (prefix, name, seconds * 1000))
+
+        for name in ["keys", "rpcs", "bytes_sent", "bytes_received"]:
+            lines.append("%s.%s:%d|c" % (
+                prefix, name, getattr(operation, name)))
+
+        if operation.error is not None:
+            lines.append("%s.errors:1|c" % prefix)
+
+        return "\n".join(lines).encode('utf-8')
+
+    def on_operation(self, operation):
+        try:
+            self._sock.sendto(self.packet(operation), self._address)
+        except OSError as err:
+            self._logger.debug("can't send metrics: %s", err)
+
+    def close(self):
+        """
+        Close the StatsD socket.
+        """
+        self._sock.close()
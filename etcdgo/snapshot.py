@@ -0,0 +1,321 @@
+"""
+On-disk snapshots of pulled configurations.
+
+A snapshot file starts with a fixed size header holding the revision the
+configuration has been read at and the time it has been validated against
+the etcd database, followed by the configuration as JSON. The header is
+read first, so the configuration of a snapshot which is too old is never
+read, and files are replaced atomically.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import json
+import time
+import struct
+import logging
+import tempfile
+import threading
+import urllib.parse
+import etcdgo.config
+
+MAGIC = b"ETCDGO\x00\x01"
+
+# revision, validation time, payload size
+_HEADER = struct.Struct("<qdQ")
+
+
+class Snapshot:
+    """
+    A configuration read from a snapshot file.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, data, revision, timestamp):
+        self.data = data
+        self.revision = revision
+        self.timestamp = timestamp
+
+
+def path(directory, basefolder, name):
+    """
+    Return the path of the snapshot of a configuration.
+
+    Args:
+        directory  (str): snapshots directory.
+        basefolder (str): root of the configuration inside the etcd
+            database.
+        name       (str): name associated with the configuration.
+
+    Returns:
+        str: snapshot file path.
+    """
+    filename = urllib.parse.quote("{0}/{1}".format(basefolder, name), safe="")
+    return os.path.join(directory, filename + ".snap")
+
+
+def save(filepath, data, revision, timestamp):
+    """
+    Write the snapshot of a configuration. The file is replaced only when
+    it has been completely written.
+
+    Args:
+        filepath  (str): snapshot file path.
+        data     (dict): configuration.
+        revision  (int): revision configuration has been read at.
+        timestamp (float): time configuration has been validated.
+
+    Raises:
+        TypeError: if configuration holds values which are not supported
+            by JSON.
+    """
+    payload = json.dumps(data, separators=(",", ":"))
+    payload = payload.encode('utf-8')
+
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmppath = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fdata:
+            fdata.write(MAGIC)
+            fdata.write(_HEADER.pack(revision, timestamp, len(payload)))
+            fdata.write(payload)
+
+        os.replace(tmppath, filepath)
+    except Exception:
+        os.remove(tmppath)
+        raise
+
+
+def load(filepath, max_age=None, now=None):
+    """
+    Read the snapshot of a configuration.
+
+    Args:
+        filepath  (str): snapshot file path.
+        max_age (float): maximum age of the snapshot in seconds. If None,
+            snapshot is never too old.
+        now     (float): current time. If None, the system time is used.
+
+    Returns:
+        Snapshot: configuration, or None if snapshot doesn't exist, it's
+            not valid or it's too old.
+    """
+    if now is None:
+        now = time.time()
+
+    try:
+        with open(filepath, "rb") as fdata:
+            header = fdata.read(len(MAGIC) + _HEADER.size)
+            if len(header) != len(MAGIC) + _HEADER.size or \
+                    header[:len(MAGIC)] != MAGIC:
+                return None
+
+            revision, timestamp, size = _HEADER.unpack_from(
+                header, len(MAGIC))
+
+            if max_age is not None and now - timestamp > max_age:
+                return None
+
+            # one more byte tells if file is longer than expected
+            payload = fdata.read(size + 1)
+            if len(payload) != size:
+                return None
+
+            data = json.loads(payload)
+    except (OSError, ValueError):
+        return None
+
+    return Snapshot(data, revision, timestamp)
+
+
+class SnapshotConfig:
+    """
+    Persist pulled configurations inside a local directory, so they are
+    available when the process starts again and when the etcd database
+    can't be reached.
+
+    The first pull of a configuration is served by its snapshot, if any,
+    and the configuration is fetched again in a background thread to
+    refresh the snapshot. Following pulls read the etcd database and, if
+    it fails, they return the snapshot. Snapshots older than max_age
+    seconds are never returned.
+
+    Examples:
+
+        import etcd3
+        import etcdgo
+        import etcdgo.snapshot
+
+        client = etcd3.Etcd3Client()
+        config = etcdgo.get_config(client, "json")
+
+        snapshot = etcdgo.snapshot.SnapshotConfig(
+            config,
+            "/var/cache/myapp",
+            max_age=3600)
+
+        data = snapshot.pull("myconfig")
+    """
+
+    def __init__(self, config, directory, max_age=None, revalidate=True):
+        """
+        Args:
+            config       (Config): configuration object to snapshot.
+            directory       (str): snapshots directory.
+            max_age       (float): maximum age of a snapshot in seconds,
+                since the last time it has been read from the database.
+                If None, snapshots are used whatever is their age.
+            revalidate     (bool): if True, the first pull of every
+                configuration is served by its snapshot and it's
+                revalidated in background.
+        """
+        if not directory or not isinstance(directory, str):
+            raise ValueError("directory must be a string")
+
+        if max_age is not None and max_age < 0:
+            raise ValueError("max_age must not be negative")
+
+        self._logger = logging.getLogger("snapshot")
+        self._config = config
+        self._directory = directory
+        self._max_age = max_age
+        self._revalidate = revalidate
+        self._lock = threading.Lock()
+        self._pulled = set()
+        self._threads = []
+        self.hits = 0
+        self.fallbacks = 0
+
+    def _path(self, name):
+        """
+        Return the snapshot file path of a configuration.
+        """
+        # pylint: disable=protected-access
+        return path(self._directory, self._config._basefolder, name)
+
+    def _load(self, name):
+        """
+        Return the snapshot of a configuration if it's not too old.
+        """
+        snapshot = load(self._path(name), self._max_age, time.time())
+        if not snapshot:
+            return None
+
+        return etcdgo.config.ConfigData(snapshot.data, snapshot.revision)
+
+    def _save(self, name, data):
+        """
+        Write the snapshot of a configuration. A snapshot which can't be
+        written doesn't make the pull fail.
+        """
+        try:
+            save(self._path(name), data, data.revision, time.time())
+        except OSError as exc:
+            self._logger.warning("can't write '%s' snapshot: %s", name, exc)
+
+    def _refresh(self, name):
+        """
+        Fetch a configuration and write its snapshot.
+        """
+        try:
+            data = self._config.pull(name)
+        except Exception as exc:
+            self._logger.warning("can't revalidate '%s': %s", name, exc)
+            return
+
+        self._save(name, data)
+
+    def pull(self, name):
+        """
+        Pull a configuration from the etcd database, or from its snapshot.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            ConfigData: configuration stored inside the database.
+        """
+        if not name or not isinstance(name, str):
+            raise ValueError("name must be a string")
+
+        with self._lock:
+            first = name not in self._pulled
+            self._pulled.add(name)
+
+        if first and self._revalidate:
+            data = self._load(name)
+            if data is not None:
+                thread = threading.Thread(
+                    target=self._refresh,
+                    args=(name,),
+                    daemon=True)
+                thread.start()
+
+                with self._lock:
+                    self._threads.append(thread)
+                    self.hits += 1
+
+                return data
+
+        try:
+            data = self._config.pull(name)
+        except Exception as exc:
+            snapshot = self._load(name)
+            if snapshot is None:
+                raise
+
+            self._logger.warning(
+                "serving '%s' from snapshot: %s", name, exc)
+
+            with self._lock:
+                self.fallbacks += 1
+
+            return snapshot
+
+        self._save(name, data)
+
+        return data
+
+    def dump(self, name):
+        """
+        Pull a configuration and convert it to string.
+
+        Args:
+            name (str): name associated with the configuration.
+
+        Returns:
+            str: configuration as string.
+        """
+        # pylint: disable=protected-access
+        return self._config._convert_to_str(self.pull(name))
+
+    def push(self, name, filepath, **kwargs):
+        """
+        Push a configuration. Its snapshot is refreshed by the next pull.
+
+        Args:
+            name     (str): name to associate with file.
+            filepath (str): path of the file to be pushed.
+            kwargs  (dict): see Config.push.
+
+        Returns:
+            PushStats: statistics about the push.
+        """
+        return self._config.push(name, filepath, **kwargs)
+
+    def wait(self, timeout=None):
+        """
+        Wait for background revalidations to complete.
+
+        Args:
+            timeout (float): maximum time to wait for each revalidation.
+        """
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+
+        for thread in threads:
+            thread.join(timeout)
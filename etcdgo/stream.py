@@ -0,0 +1,358 @@
+"""
+Incremental JSON/Yaml parsers, which produce the leaves of a configuration
+without loading the whole file in memory.
+
+Leaves are (path, value) pairs, where path is the slash separated list of
+keys leading to value. Lists are never split into leaves, so they are
+loaded in memory as a whole, and empty mappings produce no leaves.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import json
+import json.decoder
+import json.scanner
+import etcdgo.codec
+
+# number of characters read from file at once
+CHUNK_SIZE = 64 * 1024
+
+_JSON_CONSTANTS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+    "-Infinity": float("-inf"),
+}
+
+_YAML_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+
+class _JsonReader:
+    """
+    Read JSON tokens from a file, keeping in memory only the chunk which is
+    currently parsed.
+    """
+
+    def __init__(self, fdata, chunk_size=CHUNK_SIZE):
+        self._fdata = fdata
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """
+        Read more data from file. Return False if file is over.
+        """
+        if self._eof:
+            return False
+
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+        # read at least as much as we have, so long tokens are scanned
+        # a logarithmic number of times
+        data = self._fdata.read(max(self._chunk_size, len(self._buf)))
+        if not data:
+            self._eof = True
+            return False
+
+        self._buf += data
+        return True
+
+    def _ensure(self, size):
+        """
+        Read data from file until at least size characters are available.
+        """
+        while len(self._buf) - self._pos < size and self._fill():
+            pass
+
+    def _error(self, msg):
+        """
+        Return a parsing error.
+        """
+        return ValueError("%s at position %d of the current chunk" %
+                          (msg, self._pos))
+
+    def peek(self):
+        """
+        Skip whitespaces and return the next character without consuming it.
+        Return an empty string at the end of file.
+        """
+        while True:
+            while self._pos < len(self._buf) and \
+                    self._buf[self._pos] in " \t\n\r":
+                self._pos += 1
+
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+
+            if not self._fill():
+                return ""
+
+    def next(self):
+        """
+        Skip whitespaces and consume the next character.
+        """
+        char = self.peek()
+        if not char:
+            raise self._error("Unexpected end of file")
+
+        self._pos += 1
+        return char
+
+    def expect(self, expected):
+        """
+        Consume the next character and check it's the expected one.
+        """
+        char = self.next()
+        if char != expected:
+            raise self._error("Expecting '%s', found '%s'" % (expected, char))
+
+    def string(self):
+        """
+        Consume a string.
+        """
+        self.expect('"')
+
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self._buf, self._pos)
+                break
+            except json.JSONDecodeError:
+                # string can continue inside the next chunk
+                if not self._fill():
+                    raise
+
+        self._pos = end
+        return value
+
+    def _number(self):
+        """
+        Consume a number.
+        """
+        while True:
+            match = json.scanner.NUMBER_RE.match(self._buf, self._pos)
+
+            # number can continue inside the next chunk, eventually after
+            # a partial fraction or exponent
+            if match and len(self._buf) - match.end() > 2:
+                break
+
+            # buffer is moved by _fill, even when file is over, so number
+            # is matched again
+            if not self._fill():
+                match = json.scanner.NUMBER_RE.match(self._buf, self._pos)
+                break
+
+        if not match:
+            raise self._error("Expecting value")
+
+        integer, frac, exp = match.groups()
+        self._pos = match.end()
+
+        if frac or exp:
+            return float(integer + (frac or "") + (exp or ""))
+
+        return int(integer)
+
+    def _constant(self):
+        """
+        Consume a constant like true, false or null.
+        """
+        for name, value in _JSON_CONSTANTS.items():
+            self._ensure(len(name))
+
+            if self._buf.startswith(name, self._pos):
+                self._pos += len(name)
+                return value
+
+        raise self._error("Expecting value")
+
+    def value(self):
+        """
+        Consume a value and return it, loading it completely in memory.
+        """
+        char = self.peek()
+
+        if char == '"':
+            return self.string()
+
+        if char == "{":
+            self._pos += 1
+            data = dict()
+            if self.peek() == "}":
+                self._pos += 1
+                return data
+
+            while True:
+                key = self.string()
+                self.expect(":")
+                data[key] = self.value()
+
+                char = self.next()
+                if char == "}":
+                    return data
+                if char != ",":
+                    raise self._error("Expecting ',' delimiter")
+
+        if char == "[":
+            self._pos += 1
+            data = []
+            if self.peek() == "]":
+                self._pos += 1
+                return data
+
+            while True:
+                data.append(self.value())
+
+                char = self.next()
+                if char == "]":
+                    return data
+                if char != ",":
+                    raise self._error("Expecting ',' delimiter")
+
+        if char == "-" or char.isdigit():
+            self._ensure(len("-Infinity"))
+            if self._buf.startswith("-Infinity", self._pos):
+                return self._constant()
+
+            return self._number()
+
+        return self._constant()
+
+
+def _json_object_leaves(reader, path):
+    """
+    Consume a JSON object and return its leaves.
+    """
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.next()
+        return
+
+    while True:
+        key_path = etcdgo.codec.join(path, reader.string())
+        reader.expect(":")
+
+        if reader.peek() == "{":
+            yield from _json_object_leaves(reader, key_path)
+        else:
+            yield key_path, reader.value()
+
+        char = reader.next()
+        if char == "}":
+            return
+
+        if char != ",":
+            raise ValueError("Expecting ',' delimiter, found '%s'" % char)
+
+
+def json_leaves(fdata):
+    """
+    Parse a JSON file incrementally and return the leaves of the
+    configuration it holds.
+
+    Args:
+        fdata (file): opened JSON file.
+
+    Returns:
+        generator: (path, value) leaves.
+    """
+    reader = _JsonReader(fdata)
+
+    if reader.peek() != "{":
+        raise ValueError("configuration must be a JSON object")
+
+    yield from _json_object_leaves(reader, None)
+
+    if reader.peek():
+        raise ValueError("Extra data after JSON object")
+
+
+def _yaml_construct(loader, node):
+    """
+    Construct the python object of a composed Yaml node.
+    """
+    data = loader.construct_object(node, deep=True)
+
+    # don't keep constructed objects for the whole document
+    loader.constructed_objects = {}
+    loader.recursive_objects = {}
+
+    return data
+
+
+def _yaml_mapping_leaves(loader, path):
+    """
+    Consume a Yaml mapping and return its leaves. Nested mappings are
+    streamed, unless they are anchored, since they could be referenced by an
+    alias later on.
+    """
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    loader.get_event()
+
+    while not loader.check_event(yaml.MappingEndEvent):
+        key_node = loader.compose_node(None, None)
+        if key_node.tag == _YAML_MERGE_TAG:
+            raise ValueError("merge keys are not supported by streaming")
+
+        key_path = etcdgo.codec.join(path, _yaml_construct(loader, key_node))
+
+        event = loader.peek_event()
+        if isinstance(event, yaml.MappingStartEvent) and not event.anchor:
+            yield from _yaml_mapping_leaves(loader, key_path)
+            continue
+
+        value = _yaml_construct(loader, loader.compose_node(None, None))
+        if isinstance(value, dict):
+            yield from etcdgo.codec.flatten(value, key_path)
+        else:
+            yield key_path, value
+
+    loader.get_event()
+
+
+def yaml_leaves(fdata):
+    """
+    Parse a Yaml file incrementally and return the leaves of the
+    configuration it holds.
+
+    Args:
+        fdata (file): opened Yaml file.
+
+    Returns:
+        generator: (path, value) leaves.
+    """
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    loader = yaml.SafeLoader(fdata)
+
+    try:
+        # stream start
+        loader.get_event()
+
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+
+        # document start
+        loader.get_event()
+
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise ValueError("configuration must be a Yaml mapping")
+
+        yield from _yaml_mapping_leaves(loader, None)
+
+        # document end
+        loader.get_event()
+
+        if not loader.check_event(yaml.StreamEndEvent):
+            raise ValueError("expected a single document in the stream")
+    finally:
+        loader.dispose()
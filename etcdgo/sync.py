@@ -0,0 +1,287 @@
+"""
+Incremental mirroring of a directory of configuration files.
+
+Every file with a supported extension is pushed as the configuration
+labeled by its path relative to the directory, without extension, and
+with slashes escaped by etcdgo.codec.escape, so ``services/db.yaml`` is
+labeled ``services%2Fdb``. Hidden files and directories are skipped.
+
+A manifest, stored inside the directory by default, keeps the content hash
+of every pushed file and the revision of the database right after its push,
+as returned by the push itself. Files whose hash didn't change and whose
+configuration has not been modified by someone else since then are skipped,
+while the others are pushed concurrently, writing only the keys which
+changed.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import os
+import json
+import hashlib
+import tempfile
+import etcdgo
+import etcdgo.codec
+
+# configuration type by file extension
+EXTENSIONS = {
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".ini": "ini",
+}
+
+# default manifest file name, inside the synchronized directory
+MANIFEST = ".etcdgo-sync.json"
+
+# version of the manifest format
+MANIFEST_VERSION = 1
+
+
+class SyncResult:
+    """
+    Result of a directory synchronization.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.pushed = []
+        self.unchanged = []
+        self.deleted = []
+        self.errors = dict()
+
+    @property
+    def ok(self):
+        """
+        True if no error occurred.
+        """
+        # pylint: disable=invalid-name
+        return not self.errors
+
+    def __repr__(self):
+        return "SyncResult(pushed=%d, unchanged=%d, deleted=%d, errors=%d)" % (
+            len(self.pushed),
+            len(self.unchanged),
+            len(self.deleted),
+            len(self.errors))
+
+
+def scan(directory):
+    """
+    Return the configuration files inside a directory and its
+    subdirectories.
+
+    Args:
+        directory (str): directory to scan.
+
+    Returns:
+        dict: (relative path, configuration type) by label.
+    """
+    if not os.path.isdir(directory):
+        raise ValueError("'%s' is not a directory" % directory)
+
+    files = dict()
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+
+        for name in sorted(names):
+            base, ext = os.path.splitext(name)
+            config_type = EXTENSIONS.get(ext)
+            if not base or name.startswith(".") or not config_type:
+                continue
+
+            relpath = os.path.relpath(os.path.join(root, name), directory)
+            relpath = relpath.replace(os.sep, "/")
+            label = etcdgo.codec.escape(os.path.splitext(relpath)[0])
+
+            if label in files:
+                raise ValueError("'%s' and '%s' have the same label" %
+                                 (files[label][0], relpath))
+
+            files[label] = (relpath, config_type)
+
+    return files
+
+
+def file_hash(filepath):
+    """
+    Return the SHA-256 digest of a file.
+
+    Args:
+        filepath (str): file path.
+
+    Returns:
+        str: hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as fdata:
+        for block in iter(lambda: fdata.read(64 * 1024), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def load_manifest(filepath, target):
+    """
+    Read the entries of a manifest. Manifests written for another target,
+    or which can't be read, have no entries.
+
+    Args:
+        filepath (str): manifest path.
+        target   (str): identifier of the database and base folder.
+
+    Returns:
+        dict: path, hash and revision of the pushed files, by label.
+    """
+    try:
+        with open(filepath, 'r') as fdata:
+            manifest = json.load(fdata)
+    except (OSError, ValueError):
+        return dict()
+
+    if not isinstance(manifest, dict) or \
+            manifest.get("version") != MANIFEST_VERSION or \
+            manifest.get("target") != target:
+        return dict()
+
+    return manifest.get("files") or dict()
+
+
+def save_manifest(filepath, target, entries):
+    """
+    Write a manifest. The file is replaced only when it has been
+    completely written.
+
+    Args:
+        filepath (str): manifest path.
+        target   (str): identifier of the database and base folder.
+        entries (dict): path, hash and revision of the pushed files, by
+            label.
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmppath = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fdata:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "target": target,
+                "files": entries,
+            }, fdata, sort_keys=True, indent=4)
+
+        os.replace(tmppath, filepath)
+    except Exception:
+        os.remove(tmppath)
+        raise
+
+
+def sync(
+        client,
+        directory,
+        basefolder="/config",
+        manifest=None,
+        target=None,
+        delete=False,
+        concurrency=8):
+    """
+    Push the configuration files of a directory which changed since the
+    last synchronization. All pushes share the same client.
+
+    Args:
+        client     (object): etcd client, or any etcdgo.backend.Backend.
+        directory     (str): directory holding the configuration files.
+        basefolder    (str): root of the configurations inside the
+            database.
+        manifest      (str): manifest path. If None, MANIFEST inside
+            directory is used.
+        target        (str): identifier of the database, which is stored
+            inside the manifest together with basefolder. A manifest
+            written for another target is ignored.
+        delete       (bool): delete the configurations whose files have
+            been removed since the last synchronization. Configurations
+            which have never been synchronized are never deleted.
+        concurrency   (int): maximum number of concurrent pushes.
+
+    Returns:
+        SyncResult: labels pushed, unchanged and deleted, and errors.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    files = scan(directory)
+
+    if manifest is None:
+        manifest = os.path.join(directory, MANIFEST)
+
+    target = "%s%s" % (target or "", basefolder)
+    entries = load_manifest(manifest, target)
+
+    configs = dict()
+
+    def get_config(config_type):
+        if config_type not in configs:
+            configs[config_type] = etcdgo.get_config(
+                client,
+                config_type,
+                basefolder=basefolder)
+        return configs[config_type]
+
+    # a single keys only read tells which configurations changed remotely
+    remote = {
+        info.name: info.mod_revision for info in get_config("json").list()
+    }
+
+    result = SyncResult()
+    changed = dict()
+    hashes = dict()
+
+    for label, (relpath, config_type) in sorted(files.items()):
+        hashes[label] = file_hash(os.path.join(directory, relpath))
+
+        # keys written after the push have a greater modification revision
+        entry = entries.get(label)
+        if entry and entry.get("path") == relpath and \
+                entry.get("sha256") == hashes[label] and \
+                entry.get("revision") is not None and \
+                remote.get(label) is not None and \
+                remote[label] <= entry["revision"]:
+            result.unchanged.append(label)
+            continue
+
+        changed.setdefault(config_type, dict())[label] = \
+            os.path.join(directory, relpath)
+
+    pushed = []
+    for config_type, group in sorted(changed.items()):
+        bulk = get_config(config_type).push_many(
+            group,
+            concurrency=concurrency,
+            incremental=True)
+
+        for label, stats in bulk.results.items():
+            pushed.append(label)
+            entries[label] = {
+                "path": files[label][0],
+                "sha256": hashes[label],
+                "revision": stats.revision,
+            }
+
+        result.errors.update(bulk.errors)
+
+        for label in bulk.errors:
+            # pushed again on next synchronization
+            entries.pop(label, None)
+
+    if delete:
+        for label in sorted(set(entries) - set(files)):
+            try:
+                get_config("json").delete(label)
+            except Exception as exc:  # pylint: disable=broad-except
+                result.errors[label] = exc
+                continue
+
+            result.deleted.append(label)
+            del entries[label]
+
+    result.pushed = sorted(pushed)
+
+    save_manifest(manifest, target, entries)
+
+    return result
@@ -0,0 +1,242 @@
+"""
+Configuration changes subscription definition.
+
+Author:
+    Andrea Cervesato <andrea.cervesato@mailbox.org>
+"""
+import logging
+import threading
+import etcdgo.codec
+import etcdgo.backend
+import etcdgo.compress
+
+# configuration paths starting with this character are reserved by etcdgo
+RESERVED_PREFIX = "@"
+
+
+def _is_delete(event):
+    """
+    Return True if a watch event is a deletion. Events can come from etcd3
+    or from any other backend.
+
+    Args:
+        event (object): watch event.
+
+    Returns:
+        bool: True if event is a deletion.
+    """
+    if isinstance(event, etcdgo.backend.DeleteEvent):
+        return True
+
+    # pylint: disable=import-outside-toplevel
+    import etcd3.events
+    return isinstance(event, etcd3.events.DeleteEvent)
+
+
+def _set_path(data, path, value):
+    """
+    Set a value inside a nested dictionary, creating the missing levels.
+
+    Args:
+        data   (dict): nested dictionary.
+        path    (str): slash separated path of the value.
+        value (object): value to set.
+    """
+    keys = etcdgo.codec.split(path)
+    for key in keys[:-1]:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            child = dict()
+            data[key] = child
+        data = child
+
+    data[keys[-1]] = value
+
+
+def _remove_path(data, path):
+    """
+    Remove a value from a nested dictionary, together with the levels which
+    become empty.
+
+    Args:
+        data (dict): nested dictionary.
+        path  (str): slash separated path of the value.
+    """
+    keys = etcdgo.codec.split(path)
+    parents = []
+    for key in keys[:-1]:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            return
+        parents.append((data, key))
+        data = child
+
+    data.pop(keys[-1], None)
+
+    for parent, key in reversed(parents):
+        if parent[key]:
+            break
+        del parent[key]
+
+
+class ConfigEvent:
+    """
+    A change of a watched configuration. All the changes made by a single
+    etcd transaction are reported inside one event.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, name, revision):
+        self.name = name
+        self.revision = revision
+        self.added = dict()
+        self.changed = dict()
+        self.removed = []
+
+    def empty(self):
+        """
+        Return True if event doesn't hold any change.
+        """
+        return not (self.added or self.changed or self.removed)
+
+    def __repr__(self):
+        return ("ConfigEvent(name=%s, revision=%d, added=%d, changed=%d, "
+                "removed=%d)") % (
+                    self.name,
+                    self.revision,
+                    len(self.added),
+                    len(self.changed),
+                    len(self.removed))
+
+
+class ConfigWatch:
+    """
+    Keep an in-memory copy of a configuration updated with the changes made
+    inside the etcd database, notifying them to a callback.
+
+    The callback is called from the etcd watcher thread with a ConfigEvent,
+    after the config dictionary has been patched, or with an exception if
+    the watch failed.
+    """
+
+    def __init__(
+            self,
+            name,
+            prefix,
+            config,
+            flat_dict,
+            revision,
+            callback,
+            reserved=None):
+        """
+        Args:
+            name          (str): name associated with the configuration.
+            prefix        (str): configuration keys prefix.
+            config       (dict): current configuration.
+            flat_dict    (dict): current configuration, flatten with slash
+                separated paths.
+            revision      (int): revision configuration has been read at.
+            callback (function): function called on changes.
+            reserved     (dict): current values of the reserved keys, like
+                the chunks of big values.
+        """
+        # pylint: disable=too-many-arguments
+        self._logger = logging.getLogger("watch")
+        self._lock = threading.Lock()
+        self._prefix_len = len(prefix.encode('utf-8'))
+        self._flat_dict = flat_dict
+        self._reserved = reserved or dict()
+        self._callback = callback
+        self._cancel = None
+        self.name = name
+        self.config = config
+        self.revision = revision
+
+    def start(self, watch, cancel):
+        """
+        Start watching the configuration.
+
+        Args:
+            watch  (function): function registering a callback for the
+                configuration changes which returns the watch id.
+            cancel (function): function cancelling a watch id.
+        """
+        watch_id = watch(self._on_response, self.revision + 1)
+        self._cancel = lambda: cancel(watch_id)
+
+    def cancel(self):
+        """
+        Stop watching the configuration.
+        """
+        if self._cancel:
+            self._cancel()
+            self._cancel = None
+
+    def _apply(self, events):
+        """
+        Apply etcd events to the configuration and return the changes,
+        grouped by revision.
+        """
+        changes = []
+        current = None
+
+        with self._lock:
+            for event in events:
+                if event.mod_revision <= self.revision:
+                    # already part of the configuration
+                    continue
+
+                if not current or current.revision != event.mod_revision:
+                    current = ConfigEvent(self.name, event.mod_revision)
+                    changes.append(current)
+
+                path = event.key[self._prefix_len:].decode('utf-8')
+                if path.startswith(RESERVED_PREFIX):
+                    # reserved keys are not part of the configuration, but
+                    # chunks are needed to read the keys pointing to them
+                    if _is_delete(event):
+                        self._reserved.pop(event.key, None)
+                    else:
+                        self._reserved[event.key] = event.value
+                    continue
+
+                if _is_delete(event):
+                    if path in self._flat_dict:
+                        del self._flat_dict[path]
+                        _remove_path(self.config, path)
+                        current.removed.append(path)
+                    continue
+
+                value = event.value
+                if etcdgo.compress.is_pointer(value):
+                    value = etcdgo.compress.join(value, self._reserved)
+
+                value = etcdgo.compress.decompress(value).decode('utf-8')
+                if path in self._flat_dict:
+                    if self._flat_dict[path] == value:
+                        continue
+                    current.changed[path] = value
+                else:
+                    current.added[path] = value
+
+                self._flat_dict[path] = value
+                _set_path(self.config, path, value)
+
+            if current:
+                self.revision = current.revision
+
+        return [change for change in changes if not change.empty()]
+
+    def _on_response(self, response):
+        """
+        Handle an etcd watch response.
+        """
+        if isinstance(response, Exception):
+            self._logger.warning(
+                "watch on '%s' failed: %s", self.name, response)
+            self._callback(response)
+            return
+
+        for change in self._apply(response.events):
+            self._logger.debug("'%s' changed: %s", self.name, change)
+            self._callback(change)
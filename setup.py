@@ -40,9 +40,12 @@ setup(
     install_requires=[
         'etcd3 <= 0.12.0',
         'pyyaml <= 5.3.1',
-        'flatten-dict <= 0.2.0',
         'click <= 7.0',
     ],
+    extras_require={
+        'zstd': ['zstandard'],
+        'fast': ['orjson'],
+    },
     entry_points={
         'console_scripts': [
             'etcdgo-cli=etcdgo.command:cli',
@@ -0,0 +1,25 @@
+"""
+Helpers shared by unittests.
+"""
+import etcd3.etcdrpc as etcdrpc
+import etcd3.etcdrpc.kv_pb2 as kv_pb2
+
+
+def range_response(kvs, revision=1, more=False):
+    """
+    Build a mocked etcd range response.
+    """
+    return etcdrpc.RangeResponse(
+        header=etcdrpc.ResponseHeader(revision=revision),
+        kvs=[kv_pb2.KeyValue(key=key, value=value) for key, value in kvs],
+        more=more,
+        count=len(kvs))
+
+
+def txn_response(succeeded=True, revision=1):
+    """
+    Build a mocked etcd transaction response.
+    """
+    return etcdrpc.TxnResponse(
+        header=etcdrpc.ResponseHeader(revision=revision),
+        succeeded=succeeded)
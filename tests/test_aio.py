@@ -0,0 +1,211 @@
+"""
+Unittests for aio module.
+"""
+import os
+import json
+import asyncio
+import pytest
+import etcd3
+import etcd3.etcdrpc as etcdrpc
+import etcd3.etcdrpc.kv_pb2 as kv_pb2
+import etcdgo
+import etcdgo.aio
+
+MOCKED = os.environ.get("PYTEST_MOCKED", None)
+
+
+def run(coro):
+    """
+    Run a coroutine inside a new event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def client(mocker):
+    """
+    Mocked etcd responses, used only when PYTEST_MOCKED is set.
+    """
+    state = dict(running=0, max_running=0, txns=[])
+
+    if MOCKED:
+        async def _range(self, start, end, limit=None, revision=None):
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+            await asyncio.sleep(0.05)
+            state["running"] -= 1
+
+            return etcdrpc.RangeResponse(
+                header=etcdrpc.ResponseHeader(revision=5),
+                kvs=[kv_pb2.KeyValue(
+                    key=b"/aio_test/myconfig/gigi/surname",
+                    value=b"burigi")])
+
+        async def _txn(self, compare, success=None, failure=None):
+            state["txns"].append(success)
+            return etcdrpc.TxnResponse(
+                header=etcdrpc.ResponseHeader(revision=6),
+                succeeded=True)
+
+        def _init(self, *args, **kwargs):
+            self.transactions = etcd3.Transactions()
+
+        async def _close(self):
+            pass
+
+        mocker.patch('etcdgo.aio.AsyncClient.__init__', _init)
+        mocker.patch('etcdgo.aio.AsyncClient.close', _close)
+        mocker.patch('etcdgo.aio.AsyncClient.get_range_response', _range)
+        mocker.patch('etcdgo.aio.AsyncClient.transaction_response', _txn)
+
+    return state
+
+
+def test_get_config_error():
+    """
+    Test errors when getting an asyncio configuration.
+    """
+    with pytest.raises(ValueError):
+        etcdgo.get_config(None, "json", asyncio=True)
+
+    with pytest.raises(ValueError):
+        etcdgo.get_config(etcd3.Etcd3Client(), "json", asyncio=True)
+
+
+def test_get_config(client):
+    """
+    Test get_config with asyncio.
+    """
+    async def _test():
+        async with etcdgo.aio.AsyncClient() as aclient:
+            obj = etcdgo.get_config(aclient, "json", asyncio=True)
+            assert isinstance(obj, etcdgo.aio.AsyncJsonConfig)
+
+            obj = etcdgo.get_config(aclient, "yaml", asyncio=True)
+            assert isinstance(obj, etcdgo.aio.AsyncYamlConfig)
+
+            obj = etcdgo.get_config(aclient, "ini", asyncio=True)
+            assert isinstance(obj, etcdgo.aio.AsyncIniConfig)
+
+            with pytest.raises(NotImplementedError):
+                etcdgo.get_config(aclient, "txt", asyncio=True)
+
+            # blocking features
+            with pytest.raises(NotImplementedError):
+                obj.lazy("myconfig")
+
+            with pytest.raises(NotImplementedError):
+                obj.watch("myconfig", print)
+
+            with pytest.raises(NotImplementedError):
+                obj.rollback("myconfig")
+
+    run(_test())
+
+
+def test_push_pull(tmpdir, client):
+    """
+    Test AsyncConfig::push/pull/dump method implementation.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    async def _test():
+        async with etcdgo.aio.AsyncClient() as aclient:
+            obj = etcdgo.get_config(
+                aclient,
+                "ini",
+                asyncio=True,
+                basefolder="/aio_test")
+
+            stats = await obj.push("myconfig", str(testfile))
+            assert stats.keys == 1
+            assert stats.rpcs == 1
+
+            data = await obj.pull("myconfig")
+            assert data == {"gigi": {"surname": "burigi"}}
+
+            obj = etcdgo.get_config(
+                aclient,
+                "json",
+                asyncio=True,
+                basefolder="/aio_test")
+
+            data_str = await obj.dump("myconfig")
+            assert json.loads(data_str) == {"gigi": {"surname": "burigi"}}
+
+    run(_test())
+
+    if MOCKED:
+        assert len(client["txns"]) == 1
+        assert client["txns"][0][0].key == b"/aio_test/myconfig/gigi/surname"
+        assert client["txns"][0][0].value == b"burigi"
+
+
+def test_concurrent_pulls(tmpdir, client):
+    """
+    Test if concurrent pulls are not serialized.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    async def _test():
+        async with etcdgo.aio.AsyncClient() as aclient:
+            obj = etcdgo.get_config(
+                aclient,
+                "ini",
+                asyncio=True,
+                basefolder="/aio_test")
+
+            await obj.push("myconfig", str(testfile))
+
+            results = await asyncio.gather(
+                *[obj.pull("myconfig") for _ in range(10)])
+
+            for data in results:
+                assert data == {"gigi": {"surname": "burigi"}}
+
+    run(_test())
+
+    if MOCKED:
+        assert client["max_running"] == 10
+
+
+def test_push_pull_many(tmpdir, client):
+    """
+    Test AsyncConfig::push_many/pull_many method implementation.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    async def _test():
+        async with etcdgo.aio.AsyncClient() as aclient:
+            obj = etcdgo.get_config(
+                aclient,
+                "ini",
+                asyncio=True,
+                basefolder="/aio_test")
+
+            result = await obj.push_many({
+                "myconfig": str(testfile),
+                "missing": str(tmpdir / "missing.ini"),
+            })
+            assert result.results["myconfig"].keys == 1
+            assert result.results["missing"].keys == 0
+
+            result = await obj.pull_many(
+                ["myconfig"] * 4 + [None],
+                concurrency=2)
+            assert result.results["myconfig"] == {
+                "gigi": {"surname": "burigi"}
+            }
+            assert isinstance(result.errors[None], ValueError)
+
+    run(_test())
+
+    if MOCKED:
+        assert client["max_running"] == 2
@@ -0,0 +1,203 @@
+"""
+Unittests for cache module.
+"""
+import os
+import time
+import pytest
+import etcd3
+import etcdgo
+import etcdgo.cache
+from etcdgo.etcd import Etcd3Backend
+from conftest import range_response, txn_response
+
+MOCKED = os.environ.get("PYTEST_MOCKED", None)
+
+
+class WatchResponse:
+    """
+    Mocked etcd watch response.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, events):
+        self.events = events
+
+
+@pytest.fixture
+def watches(mocker):
+    """
+    Registered watch callbacks, by watch id.
+    """
+    callbacks = dict()
+    counter = [0]
+
+    if MOCKED:
+        def _add_watch(key, callback, **kwargs):
+            counter[0] += 1
+            callbacks[counter[0]] = callback
+            return counter[0]
+
+        def _cancel_watch(watch_id):
+            callbacks.pop(watch_id, None)
+
+        mocker.patch(
+            'etcd3.Etcd3Client.add_watch_prefix_callback',
+            side_effect=_add_watch)
+        mocker.patch(
+            'etcd3.Etcd3Client.cancel_watch',
+            side_effect=_cancel_watch)
+
+    return callbacks
+
+
+@pytest.fixture
+def cache(mocker, watches):
+    """
+    Cache to test.
+    """
+    if MOCKED:
+        mocker.patch('etcd3.Etcd3Client.__init__', return_value=None)
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.get_range_response',
+            return_value=range_response([
+                (b"/cache_test/myconfig/gigi/surname", b"burigi"),
+            ]))
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.transaction_response',
+            return_value=txn_response())
+        mocker.patch(
+            'etcd3.Etcd3Client.transactions',
+            etcd3.Transactions(),
+            create=True)
+
+    def _callback(**kwargs):
+        config = etcdgo.get_config(
+            etcd3.Etcd3Client(),
+            "ini",
+            basefolder="/cache_test")
+
+        return etcdgo.cache.CachedConfig(config, **kwargs)
+
+    yield _callback
+
+
+def wait_for(condition, timeout=5):
+    """
+    Wait until condition is True.
+    """
+    start = time.time()
+    while not condition():
+        assert time.time() - start < timeout
+        time.sleep(0.01)
+
+
+def test_cache_error(cache):
+    """
+    Test errors when creating a cache and pulling configurations.
+    """
+    with pytest.raises(ValueError):
+        cache(maxsize=0)
+
+    obj = cache()
+
+    with pytest.raises(ValueError):
+        obj.pull(None)
+
+
+def test_cache_hits(tmpdir, cache):
+    """
+    Test if configurations are fetched only once.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    obj = cache()
+    obj.push("myconfig", str(testfile))
+
+    for _ in range(3):
+        data = obj.pull("myconfig")
+        assert data == {"gigi": {"surname": "burigi"}}
+
+    assert obj.hits == 2
+    assert obj.misses == 1
+    assert "myconfig" in obj
+    assert len(obj) == 1
+
+    if MOCKED:
+        assert Etcd3Backend.get_range_response.call_count == 1
+        etcd3.Etcd3Client.add_watch_prefix_callback.assert_called_once()
+
+    obj.close()
+    assert not obj
+
+
+def test_cache_invalidate_on_change(tmpdir, watches, cache):
+    """
+    Test if cached configurations are invalidated when they change.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    obj = cache()
+    obj.push("myconfig", str(testfile))
+    obj.pull("myconfig")
+    assert "myconfig" in obj
+
+    testfile.write("[gigi]\nsurname=carrube")
+    obj._config.push("myconfig", str(testfile))
+
+    if MOCKED:
+        watches[1](WatchResponse(["event"]))
+        assert not watches
+
+    wait_for(lambda: "myconfig" not in obj)
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/cache_test/myconfig/gigi/surname", b"carrube"),
+        ])
+
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "carrube"}}
+    assert obj.misses == 2
+
+    obj.close()
+
+
+def test_cache_invalidate_on_error(watches, cache):
+    """
+    Test if cached configurations are invalidated when watch fails.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    obj = cache()
+    obj.pull("myconfig")
+
+    watches[1](Exception("connection lost"))
+    assert "myconfig" not in obj
+    assert not watches
+
+
+def test_cache_eviction(watches, cache):
+    """
+    Test if least recently used configurations are evicted.
+    """
+    obj = cache(maxsize=2)
+    obj.pull("config0")
+    obj.pull("config1")
+    obj.pull("config0")
+    obj.pull("config2")
+
+    assert "config0" in obj
+    assert "config1" not in obj
+    assert "config2" in obj
+    assert len(obj) == 2
+
+    if MOCKED:
+        assert sorted(watches.keys()) == [1, 3]
+
+    obj.close()
+
+    if MOCKED:
+        assert not watches
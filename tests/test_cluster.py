@@ -0,0 +1,91 @@
+"""
+Unittests for cluster module.
+"""
+import pytest
+import etcd3
+import etcd3.exceptions
+import etcdgo
+import etcdgo.cluster
+
+
+@pytest.fixture
+def cluster(mocker):
+    """
+    Cluster client with three mocked members, which record the reads they
+    serve.
+    """
+    served = []
+
+    def _init(self, host, port, **kwargs):
+        self.host = host
+        self.transactions = etcd3.Transactions()
+
+    def _range(self, start, end, **kwargs):
+        if self.client.host == "down":
+            raise etcd3.exceptions.ConnectionFailedError()
+
+        served.append((self.client.host, kwargs.get("serializable", False)))
+        return self.client.host
+
+    mocker.patch('etcd3.Etcd3Client.__init__', _init)
+    mocker.patch('etcdgo.etcd.Etcd3Backend.get_range_response', _range)
+
+    def _callback(hosts):
+        client = etcdgo.cluster.ClusterClient(
+            [(host, 2379) for host in hosts])
+        return client, served
+
+    return _callback
+
+
+def test_cluster_error():
+    """
+    Test errors when creating a cluster client.
+    """
+    with pytest.raises(ValueError):
+        etcdgo.cluster.ClusterClient(None)
+
+    with pytest.raises(ValueError):
+        etcdgo.cluster.ClusterClient([])
+
+
+def test_serializable_reads(cluster):
+    """
+    Test if serializable reads are spread across members, while the other
+    requests are sent to the first one.
+    """
+    client, served = cluster(["host0", "host1", "host2"])
+
+    for _ in range(6):
+        client.get_range_response(b"a", b"b", serializable=True)
+
+    assert served == [
+        ("host0", True),
+        ("host1", True),
+        ("host2", True),
+    ] * 2
+
+    del served[:]
+    client.get_range_response(b"a", b"b")
+    assert served == [("host0", False)]
+
+    assert client.transactions is client.clients[0].transactions
+
+    config = etcdgo.get_config(client, "json", consistency="serializable")
+    assert config is not None
+
+
+def test_serializable_reads_failover(cluster):
+    """
+    Test if members which can't be reached are skipped.
+    """
+    client, served = cluster(["host0", "down", "host2"])
+
+    for _ in range(3):
+        client.get_range_response(b"a", b"b", serializable=True)
+
+    assert served == [
+        ("host0", True),
+        ("host2", True),
+        ("host2", True),
+    ]
@@ -0,0 +1,92 @@
+"""
+Unittests for codec module.
+"""
+import sys
+import pytest
+import etcdgo.codec
+
+
+@pytest.mark.parametrize("key", [
+    "name", "a/b", "100%", "%2F", "%25/", "/", "", 10,
+])
+def test_escape(key):
+    """
+    Test if escaped keys don't hold slashes and they are restored.
+    """
+    segment = etcdgo.codec.escape(key)
+    assert "/" not in segment
+    assert etcdgo.codec.unescape(segment) == str(key)
+
+
+def test_flatten():
+    """
+    Test if leaves are produced in dictionary order, with escaped keys.
+    """
+    data = {
+        "server": {"host": "localhost", "port": 80},
+        "empty": {},
+        "a/b": {"c%": "d"},
+        "list": [1, 2],
+    }
+
+    assert list(etcdgo.codec.flatten(data)) == [
+        ("server/host", "localhost"),
+        ("server/port", 80),
+        ("a%2Fb/c%25", "d"),
+        ("list", [1, 2]),
+    ]
+
+    assert list(etcdgo.codec.flatten({"a": 1}, "root")) == [("root/a", 1)]
+    assert etcdgo.codec.split("a%2Fb/c%25") == ["a/b", "c%"]
+
+
+def test_unflatten():
+    """
+    Test if leaves are converted back into a nested dictionary.
+    """
+    data = {
+        "server": {"host": "localhost", "port": "80"},
+        "a/b": {"c%": "d"},
+        "name": "etcdgo",
+    }
+
+    items = [
+        (path.encode('utf-8'), value)
+        for path, value in etcdgo.codec.flatten(data)
+    ]
+
+    assert etcdgo.codec.unflatten(items) == data
+    assert etcdgo.codec.unflatten(sorted(items)) == data
+    assert etcdgo.codec.unflatten(reversed(items)) == data
+    assert etcdgo.codec.unflatten([]) == {}
+
+    # last leaf wins
+    assert etcdgo.codec.unflatten([(b"a", "1"), (b"a/b", "2")]) == \
+        {"a": {"b": "2"}}
+    assert etcdgo.codec.unflatten([(b"a/b", "2"), (b"a", "1")]) == \
+        {"a": "1"}
+
+
+def test_deep_nesting():
+    """
+    Test if nesting deeper than the recursion limit is supported.
+    """
+    depth = sys.getrecursionlimit() + 100
+
+    data = {"leaf": "value"}
+    for _ in range(depth):
+        data = {"level": data}
+
+    items = [
+        (path.encode('utf-8'), value)
+        for path, value in etcdgo.codec.flatten(data)
+    ]
+
+    assert len(items) == 1
+    assert items[0][0].count(b"/") == depth
+
+    node = etcdgo.codec.unflatten(items)
+    for _ in range(depth):
+        node = node["level"]
+
+    assert node == {"leaf": "value"}
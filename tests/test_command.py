@@ -2,10 +2,13 @@
 Unittests for command module.
 """
 import os
+import sys
+import subprocess
 import pytest
 from click.testing import CliRunner
 import etcd3
 import etcdgo.command
+import etcdgo.memory
 
 
 @pytest.fixture
@@ -45,6 +48,27 @@ def test_cli_help(runner):
     assert not ret.exception
     assert ret.exit_code == 0
 
+    # client is created only by commands using it
+    etcd3.Etcd3Client.__init__.assert_not_called()
+
+
+def test_cli_lazy_imports():
+    """
+    Test if command line doesn't load etcd3 and format parsers until a
+    command needs them.
+    """
+    code = "\n".join([
+        "import sys",
+        "import etcdgo.command",
+        "heavy = ['etcd3', 'grpc', 'yaml', 'etcdgo.config']",
+        "print(','.join(name for name in heavy if name in sys.modules))",
+    ])
+
+    output = subprocess.check_output(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert output.decode('utf-8').strip() == ""
+
 
 def test_push_config_type_error(request, runner):
     """
@@ -221,3 +245,69 @@ def test_pull_yaml(request, mocker, runner):
     assert not ret.exception
     assert ret.exit_code == 0
     assert ret.output == "people:\n  gianni: patoc\n  gigi: bufera\n\n"
+
+
+def test_ls(mocker, runner):
+    """
+    List configurations.
+    """
+    info = etcdgo.config.ConfigInfo("myconfig")
+    info.keys = 10
+    info.mod_revision = 42
+
+    mocker.patch("etcdgo.config.Config.list", return_value=[info])
+
+    ret = runner(['ls'])
+    assert not ret.exception
+    assert ret.exit_code == 0
+    assert ret.output == "myconfig\t10\t42\n"
+
+
+def test_rm(request, mocker, runner):
+    """
+    Delete a configuration.
+    """
+    key = request.node.name
+
+    ret = runner(['rm', ''])
+    assert str(ret.exception) == "label can't be empty."
+    assert ret.exit_code == 1
+
+    mocker.patch("etcdgo.config.Config.delete", return_value=0)
+
+    ret = runner(['rm', key])
+    assert str(ret.exception) == "configuration doesn't exist."
+    assert ret.exit_code == 1
+
+    etcdgo.config.Config.delete.return_value = 3
+
+    ret = runner(['rm', key])
+    assert not ret.exception
+    assert ret.exit_code == 0
+
+    etcdgo.config.Config.delete.assert_called_with(key)
+
+
+def test_sync(mocker, tmpdir):
+    """
+    Synchronize a directory of configurations.
+    """
+    backend = etcdgo.memory.MemoryBackend()
+    mocker.patch(
+        'etcdgo.command.Arguments.client',
+        new_callable=mocker.PropertyMock,
+        return_value=backend)
+
+    (tmpdir / "myconfig.json").write('{"a": "1"}')
+
+    runner = CliRunner()
+    for output in ["pushed 1, unchanged 0, deleted 0, failed 0\n",
+                   "pushed 0, unchanged 1, deleted 0, failed 0\n"]:
+        ret = runner.invoke(etcdgo.command.cli, [
+            "-f", "/cmdline_test", "sync", str(tmpdir)])
+        assert not ret.exception
+        assert ret.exit_code == 0
+        assert ret.output == output
+
+    config = etcdgo.get_config(backend, "json", basefolder="/cmdline_test")
+    assert config.pull("myconfig") == {"a": "1"}
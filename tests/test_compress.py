@@ -0,0 +1,46 @@
+"""
+Unittests for compress module.
+"""
+import pytest
+import etcdgo.compress
+
+
+@pytest.mark.parametrize("algorithm", etcdgo.compress.available())
+def test_compress(algorithm):
+    """
+    Test if compressed values are restored by decompress.
+    """
+    value = b"certificate " * 100
+
+    data = etcdgo.compress.compress(value, algorithm)
+    assert len(data) < len(value)
+    assert data.startswith(etcdgo.compress.MARKER)
+    assert etcdgo.compress.decompress(data) == value
+
+    # values which don't shrink are stored as they are
+    assert etcdgo.compress.compress(b"abc", algorithm) == b"abc"
+
+
+def test_escape():
+    """
+    Test if values starting with the marker are escaped.
+    """
+    assert etcdgo.compress.escape(b"value") == b"value"
+    assert etcdgo.compress.decompress(b"value") == b"value"
+
+    value = etcdgo.compress.MARKER + b"zlib:value"
+    data = etcdgo.compress.escape(value)
+    assert data != value
+    assert etcdgo.compress.decompress(data) == value
+
+
+def test_check():
+    """
+    Test errors on unsupported algorithms.
+    """
+    with pytest.raises(ValueError):
+        etcdgo.compress.check("lzma")
+
+    if "zstd" not in etcdgo.compress.available():
+        with pytest.raises(ValueError):
+            etcdgo.compress.check("zstd")
@@ -2,12 +2,17 @@
 Unittests for config module.
 """
 import os
+import time
+import threading
 import pytest
 import etcd3
+import etcd3.etcdrpc as etcdrpc
 import etcdgo
 import configparser
 import yaml
 import json
+from etcdgo.etcd import Etcd3Backend
+from conftest import range_response, txn_response
 
 MOCKED = os.environ.get("PYTEST_MOCKED", None)
 
@@ -21,12 +26,21 @@ def config(mocker):
         mocker.patch('etcd3.Etcd3Client.__init__', return_value=None)
         mocker.patch('etcd3.Etcd3Client.get_all')
         mocker.patch('etcd3.Etcd3Client.put')
+        mocker.patch('etcdgo.etcd.Etcd3Backend.get_range_response')
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.transaction_response',
+            return_value=txn_response())
+        mocker.patch(
+            'etcd3.Etcd3Client.transactions',
+            etcd3.Transactions(),
+            create=True)
 
-    def _callback(type):
+    def _callback(type, **kwargs):
         obj = etcdgo.get_config(
             etcd3.Etcd3Client(),
             type,
-            basefolder="/config_test")
+            basefolder="/config_test",
+            **kwargs)
 
         return obj
 
@@ -65,6 +79,927 @@ def test_config_pull_error(config):
         obj.pull(list())
 
 
+def assert_pushed(key, value):
+    """
+    Check if a key has been written by mocked transactions.
+    """
+    keys = dict()
+    for call in Etcd3Backend.transaction_response.call_args_list:
+        for op in call[1]["success"]:
+            if isinstance(op, etcd3.transactions.Put):
+                keys[op.key] = op.value
+
+    assert keys[key.encode('utf-8')] == value.encode('utf-8')
+
+
+def stored_kvs(prefix):
+    """
+    Replay the operations sent by mocked transactions and return the
+    key/value pairs stored under prefix, sorted by key.
+    """
+    store = dict()
+    for call in Etcd3Backend.transaction_response.call_args_list:
+        for op in call[1]["success"]:
+            if isinstance(op, etcd3.transactions.Put):
+                store[op.key] = op.value
+            elif op.range_end is None:
+                store.pop(op.key, None)
+            else:
+                for key in list(store):
+                    if op.key <= key < op.range_end:
+                        del store[key]
+
+    return sorted(
+        (key, value) for key, value in store.items()
+        if key.startswith(prefix.encode('utf-8')))
+
+
+def use_stored_kvs():
+    """
+    Make mocked range requests read the key/value pairs written by mocked
+    transactions.
+    """
+    def _range(start, end, limit=None, revision=None, **kwargs):
+        kvs = [(key, value) for key, value in stored_kvs("")
+               if start <= key < end]
+        return range_response(kvs)
+
+    Etcd3Backend.get_range_response.side_effect = _range
+
+
+def test_config_page_size_error(config):
+    """
+    Test errors when using a wrong page size.
+    """
+    with pytest.raises(ValueError):
+        config("yaml", page_size=0)
+
+    with pytest.raises(ValueError):
+        config("yaml", page_size=-1)
+
+
+def test_config_batch_error(config):
+    """
+    Test errors when using wrong batch limits.
+    """
+    with pytest.raises(ValueError):
+        config("yaml", batch_size=0)
+
+    with pytest.raises(ValueError):
+        config("yaml", batch_bytes=0)
+
+
+def test_push_batches(tmpdir, config):
+    """
+    Test if push groups keys inside transactions.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("""
+        [gigi]
+        surname=burigi
+        birth=4/7/1916
+
+        [osvaldo]
+        surname=carrube
+        birth=5/8/1980
+    """)
+
+    obj = config("ini")
+    stats = obj.push("config_batches", str(testfile))
+    assert stats.keys == 4
+    assert stats.rpcs == 1
+
+    obj = config("ini", batch_size=3)
+    stats = obj.push("config_batches", str(testfile))
+    assert stats.keys == 4
+    assert stats.rpcs == 2
+
+    # the deletion of a previously pushed blob is sent alone
+    obj = config("ini", batch_bytes=1)
+    stats = obj.push("config_batches", str(testfile))
+    assert stats.keys == 4
+    assert stats.rpcs == 5
+
+    if MOCKED:
+        assert Etcd3Backend.transaction_response.call_count == 8
+        assert not etcd3.Etcd3Client.put.called
+    else:
+        data = obj.pull("config_batches")
+        assert data == {
+            "gigi": {
+                "surname": "burigi",
+                "birth": "4/7/1916"
+            },
+            "osvaldo": {
+                "surname": "carrube",
+                "birth": "5/8/1980"
+            }
+        }
+
+
+def test_push_incremental(tmpdir, config):
+    """
+    Test if incremental push writes only changed keys and deletes the
+    stale ones.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi\nbirth=4/7/1916\nage=104")
+
+    obj = config("ini")
+    obj.push("config_incremental", str(testfile))
+
+    testfile.write("[gigi]\nsurname=burigi\nbirth=5/7/1916\nalive=no")
+
+    if MOCKED:
+        Etcd3Backend.transaction_response.reset_mock()
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_incremental/gigi/age", b"104"),
+            (b"/config_test/config_incremental/gigi/birth", b"4/7/1916"),
+            (b"/config_test/config_incremental/gigi/surname", b"burigi"),
+        ], revision=10)
+
+    stats = obj.push("config_incremental", str(testfile), incremental=True)
+    assert stats.keys == 3
+    assert stats.puts == 2
+    assert stats.deletes == 1
+    assert stats.rpcs == 2
+
+    if MOCKED:
+        Etcd3Backend.transaction_response.assert_called_once()
+        kwargs = Etcd3Backend.transaction_response.call_args[1]
+
+        compare = kwargs["compare"][0]
+        assert isinstance(compare, etcd3.transactions.Mod)
+        assert compare.key == b"/config_test/config_incremental/"
+        assert compare.range_end == b"/config_test/config_incremental0"
+        assert compare.value == 11
+
+        ops = {op.key: op for op in kwargs["success"]}
+        assert len(ops) == 3
+        assert ops[b"/config_test/config_incremental/gigi/birth"].value == \
+            b"5/7/1916"
+        assert ops[b"/config_test/config_incremental/gigi/alive"].value == \
+            b"no"
+        assert isinstance(
+            ops[b"/config_test/config_incremental/gigi/age"],
+            etcd3.transactions.Delete)
+    else:
+        data = obj.pull("config_incremental")
+        assert data == {
+            "gigi": {
+                "surname": "burigi",
+                "birth": "5/7/1916",
+                "alive": "no"
+            }
+        }
+
+    # nothing changed
+    if MOCKED:
+        Etcd3Backend.transaction_response.reset_mock()
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_incremental/gigi/alive", b"no"),
+            (b"/config_test/config_incremental/gigi/birth", b"5/7/1916"),
+            (b"/config_test/config_incremental/gigi/surname", b"burigi"),
+        ], revision=11)
+
+    stats = obj.push("config_incremental", str(testfile), incremental=True)
+    assert stats.puts == 0
+    assert stats.deletes == 0
+    assert stats.rpcs == 1
+
+    if MOCKED:
+        assert not Etcd3Backend.transaction_response.called
+
+
+def test_push_incremental_conflict(tmpdir, config):
+    """
+    Test if incremental push fails when configuration has been modified
+    during push.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    obj = config("ini")
+
+    Etcd3Backend.get_range_response.return_value = range_response([])
+    Etcd3Backend.transaction_response.return_value = txn_response(False)
+
+    with pytest.raises(etcdgo.config.ConcurrentUpdateError):
+        obj.push("config_conflict", str(testfile), incremental=True)
+
+
+def test_push_stream(tmpdir, config):
+    """
+    Test if streamed push writes the same keys of a normal push.
+    """
+    data = {
+        "people": {
+            "gigi": {
+                "surname": "burigi",
+                "birth": "4/7/1916"
+            },
+            "osvaldo": {
+                "surname": "carrube",
+                "birth": "5/8/1980"
+            }
+        }
+    }
+
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps(data))
+
+    testfile_yaml = tmpdir / "config.yaml"
+    testfile_yaml.write(yaml.dump(data))
+
+    obj = config("json", batch_size=3)
+
+    with pytest.raises(ValueError):
+        obj.push("config_stream", str(testfile), incremental=True, stream=True)
+
+    stats = obj.push("config_stream", str(testfile), stream=True)
+    assert stats.keys == 4
+    assert stats.puts == 4
+    assert stats.rpcs == 2
+
+    obj = config("yaml", batch_size=3)
+    stats = obj.push("config_stream_yaml", str(testfile_yaml), stream=True)
+    assert stats.keys == 4
+    assert stats.rpcs == 2
+
+    if MOCKED:
+        assert_pushed(
+            "/config_test/config_stream/people/gigi/surname", "burigi")
+        assert_pushed(
+            "/config_test/config_stream/people/osvaldo/birth", "5/8/1980")
+        assert_pushed(
+            "/config_test/config_stream_yaml/people/gigi/birth", "4/7/1916")
+        assert_pushed(
+            "/config_test/config_stream_yaml/people/osvaldo/surname",
+            "carrube")
+    else:
+        assert obj.pull("config_stream") == data
+        assert obj.pull("config_stream_yaml") == data
+
+
+def test_push_stream_duplicates(tmpdir, config):
+    """
+    Test if streamed push never sends the same key twice inside a
+    transaction.
+    """
+    testfile = tmpdir / "config.json"
+    testfile.write('{"gigi": {"surname": "burigi", "surname": "carrube"}}')
+
+    obj = config("json")
+    stats = obj.push("config_stream_dup", str(testfile), stream=True)
+    assert stats.keys == 2
+    assert stats.rpcs == 2
+
+    if MOCKED:
+        assert_pushed(
+            "/config_test/config_stream_dup/gigi/surname", "carrube")
+    else:
+        data = obj.pull("config_stream_dup")
+        assert data == {"gigi": {"surname": "carrube"}}
+
+
+def test_push_many_error(config):
+    """
+    Test errors when using push_many/pull_many.
+    """
+    obj = config("ini")
+
+    with pytest.raises(ValueError):
+        obj.push_many(["config.ini"])
+
+    with pytest.raises(ValueError):
+        obj.push_many({"config": "config.ini"}, concurrency=0)
+
+    with pytest.raises(ValueError):
+        obj.pull_many("config")
+
+    with pytest.raises(ValueError):
+        obj.pull_many(["config"], concurrency=0)
+
+
+def test_push_pull_many(tmpdir, config):
+    """
+    Test if push_many/pull_many run concurrently and collect errors.
+    """
+    state = dict(running=0, max_running=0)
+    lock = threading.Lock()
+
+    def _transaction(*args, **kwargs):
+        with lock:
+            state["running"] += 1
+            state["max_running"] = max(state["max_running"], state["running"])
+
+        time.sleep(0.05)
+
+        with lock:
+            state["running"] -= 1
+
+        return txn_response()
+
+    if MOCKED:
+        Etcd3Backend.transaction_response.side_effect = _transaction
+
+    configs = dict()
+    for i in range(8):
+        testfile = tmpdir / ("config%d.ini" % i)
+        testfile.write("[gigi]\nsurname=burigi%d" % i)
+        configs["config_many%d" % i] = str(testfile)
+
+    obj = config("ini")
+    result = obj.push_many(configs, concurrency=4)
+    assert result.ok
+    assert sorted(result.results.keys()) == sorted(configs.keys())
+    assert all(stats.keys == 1 for stats in result.results.values())
+
+    if MOCKED:
+        assert state["max_running"] == 4
+
+    obj = config("json")
+    result = obj.push_many({"config_missing": str(tmpdir / "missing.json")})
+    assert not result.ok
+    assert isinstance(result.errors["config_missing"], FileNotFoundError)
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_many0/gigi/surname", b"burigi0"),
+        ])
+
+    result = obj.pull_many(["config_many0", None])
+    assert result.results["config_many0"] == {"gigi": {"surname": "burigi0"}}
+    assert isinstance(result.errors[None], ValueError)
+
+
+def test_pull_prefix(tmpdir, config):
+    """
+    Test if pull reads only the keys of the requested configuration and
+    not the ones of configurations sharing the same name prefix.
+    """
+    testfile = tmpdir / "app.ini"
+    testfile.write("[server]\nport = 80")
+
+    testfile2 = tmpdir / "app2.ini"
+    testfile2.write("[server]\nport = 8080")
+
+    obj = config("ini")
+    obj.push("app", str(testfile))
+    obj.push("app2", str(testfile2))
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/app/server/port", b"80"),
+        ])
+
+    data = obj.pull("app")
+    assert data == {"server": {"port": "80"}}
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_once_with(
+            b"/config_test/app/",
+            b"/config_test/app0",
+            limit=None,
+            revision=None)
+
+
+def test_pull_paging(tmpdir, config):
+    """
+    Test if pull fetches configurations in pages.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi\nbirth=4/7/1916")
+
+    obj = config("ini", page_size=1)
+    obj.push("config_paging", str(testfile))
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.side_effect = [
+            range_response([
+                (b"/config_test/config_paging/gigi/birth", b"4/7/1916"),
+            ], revision=10, more=True),
+            range_response([
+                (b"/config_test/config_paging/gigi/surname", b"burigi"),
+            ], revision=11),
+        ]
+
+    data = obj.pull("config_paging")
+    assert data == {"gigi": {"surname": "burigi", "birth": "4/7/1916"}}
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_with(
+            b"/config_test/config_paging/gigi/birth\0",
+            b"/config_test/config_paging0",
+            limit=1,
+            revision=10)
+
+
+def test_pull_revision(tmpdir, config):
+    """
+    Test if configurations can be pulled at a specific revision.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    obj = config("ini")
+    obj.push("config_revision", str(testfile))
+
+    with pytest.raises(ValueError):
+        obj.pull("config_revision", revision=0)
+
+    with pytest.raises(ValueError):
+        obj.pull("config_revision", revision="1")
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_revision/gigi/surname", b"burigi"),
+        ], revision=10)
+
+    data = obj.pull("config_revision")
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision > 0
+
+    testfile.write("[gigi]\nsurname=carrube")
+    obj.push("config_revision", str(testfile))
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_revision/gigi/surname", b"carrube"),
+        ], revision=11)
+
+    new_data = obj.pull("config_revision")
+    assert new_data == {"gigi": {"surname": "carrube"}}
+    assert new_data.revision > data.revision
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_revision/gigi/surname", b"burigi"),
+        ], revision=11)
+
+    old_data = obj.pull("config_revision", revision=data.revision)
+    assert old_data == data
+    assert old_data.revision == data.revision
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_with(
+            b"/config_test/config_revision/",
+            b"/config_test/config_revision0",
+            limit=None,
+            revision=10)
+
+
+def test_push_pull_blob(tmpdir, config):
+    """
+    Test if configurations can be stored as a blob and switched back to
+    the flattened layout.
+    """
+    data = {
+        "gigi": {
+            "surname": "burigi",
+            "birth": "4/7/1916",
+            "age": 104,
+            "friends": ["osvaldo", "carlo"],
+        }
+    }
+
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps(data))
+
+    with pytest.raises(ValueError):
+        config("json", blob_chunk_size=0)
+
+    obj = config("json", blob=True, blob_chunk_size=16, batch_size=4)
+
+    with pytest.raises(ValueError):
+        obj.push("config_blob", str(testfile), incremental=True)
+
+    stats = obj.push("config_blob", str(testfile))
+    chunks = (len(json.dumps(data)) + 15) // 16
+    assert stats.keys == chunks + 1
+    assert stats.puts == chunks + 1
+    assert stats.deletes == 3
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response(
+            stored_kvs("/config_test/config_blob/"))
+
+    # values keep their types and any config object can read blobs
+    assert obj.pull("config_blob") == data
+    assert config("yaml").pull("config_blob") == data
+
+    with pytest.raises(NotImplementedError):
+        obj.watch("config_blob", lambda event: None)
+
+    # push the flattened layout over the blob
+    obj = config("json")
+    obj.push("config_blob", str(testfile))
+
+    if MOCKED:
+        kvs = stored_kvs("/config_test/config_blob/")
+        assert not [key for key, _ in kvs if b"@blob" in key]
+
+        Etcd3Backend.get_range_response.return_value = range_response(
+            kvs)
+
+    data["gigi"]["age"] = "104"
+    data["gigi"]["friends"] = "['osvaldo', 'carlo']"
+    assert obj.pull("config_blob") == data
+
+
+def test_push_pull_compression(tmpdir, config):
+    """
+    Test if big values are compressed during push and decompressed during
+    pull.
+    """
+    data = {
+        "server": {
+            "port": "80",
+            "certificate": "-----BEGIN CERTIFICATE-----" * 100,
+        }
+    }
+
+    testfile = tmpdir / "config.yaml"
+    testfile.write(yaml.dump(data))
+
+    with pytest.raises(ValueError):
+        config("yaml", compression="lzma")
+
+    with pytest.raises(ValueError):
+        config("yaml", compression="zlib", compression_threshold=-1)
+
+    obj = config("yaml", compression="zlib", compression_threshold=100)
+    stats = obj.push("config_compression", str(testfile))
+    assert stats.keys == 2
+    assert stats.compressed == 1
+    assert stats.bytes_saved > 0
+    assert stats.compression_ratio > 1.0
+
+    if MOCKED:
+        kvs = stored_kvs("/config_test/config_compression/")
+        assert dict(kvs)[
+            b"/config_test/config_compression/server/port"] == b"80"
+
+        Etcd3Backend.get_range_response.return_value = range_response(
+            kvs)
+
+    # pull doesn't depend on the compression settings
+    assert config("yaml").pull("config_compression") == data
+
+
+def test_push_pull_chunks(tmpdir, config):
+    """
+    Test if values bigger than max_value_size are split into chunks, which
+    are written before the key pointing to them.
+    """
+    data = {"templates": {"index": "x" * 1000, "name": "index"}}
+
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps(data))
+
+    with pytest.raises(ValueError):
+        config("json", max_value_size=0)
+
+    obj = config("json", max_value_size=300, batch_size=2)
+    stats = obj.push("config_chunks", str(testfile))
+    assert stats.keys == 6
+
+    if MOCKED:
+        keys = []
+        for call in Etcd3Backend.transaction_response.call_args_list:
+            keys.extend(op.key for op in call[1]["success"]
+                        if isinstance(op, etcd3.transactions.Put))
+
+        pointer = keys.index(b"/config_test/config_chunks/templates/index")
+        assert len([key for key in keys[:pointer] if b"@chunks" in key]) == 4
+
+        Etcd3Backend.get_range_response.return_value = range_response(
+            stored_kvs("/config_test/config_chunks/"))
+
+    assert obj.pull("config_chunks") == data
+
+    # old chunks are deleted, both by normal and incremental push
+    for incremental in [False, True]:
+        data["templates"]["index"] = str(incremental) * 500
+        testfile.write(json.dumps(data))
+        obj.push("config_chunks", str(testfile), incremental=incremental)
+
+        if MOCKED:
+            kvs = stored_kvs("/config_test/config_chunks/")
+            assert len([key for key, _ in kvs if b"@chunks" in key]) == \
+                (len(data["templates"]["index"]) + 299) // 300
+
+            Etcd3Backend.get_range_response.return_value = \
+                range_response(kvs)
+
+        assert obj.pull("config_chunks") == data
+
+
+def test_publish_rollback(tmpdir, config):
+    """
+    Test if configurations are published as generations, which can be
+    rolled back and are deleted according with retention.
+    """
+    testfile = tmpdir / "config.ini"
+
+    with pytest.raises(ValueError):
+        config("ini", publish=True, retention=0)
+
+    obj = config("ini", publish=True, retention=2)
+    if MOCKED:
+        use_stored_kvs()
+
+    with pytest.raises(ValueError):
+        obj.rollback("config_publish")
+
+    with pytest.raises(ValueError):
+        obj.push("config_publish", str(testfile), incremental=True)
+
+    for generation in range(1, 4):
+        testfile.write("[server]\nport = %d" % generation)
+        stats = obj.push("config_publish", str(testfile))
+        assert stats.generation == generation
+
+        assert obj.pull("config_publish") == \
+            {"server": {"port": str(generation)}}
+
+    # configuration objects which don't publish follow the pointer too
+    assert config("ini").pull("config_publish") == {"server": {"port": "3"}}
+
+    assert obj.rollback("config_publish") == 2
+    assert obj.pull("config_publish") == {"server": {"port": "2"}}
+
+    with pytest.raises(ValueError):
+        obj.rollback("config_publish")
+
+    with pytest.raises(ValueError):
+        obj.rollback("config_publish", generation=1)
+
+    assert obj.rollback("config_publish", generation=3) == 3
+    assert obj.pull("config_publish") == {"server": {"port": "3"}}
+
+    if MOCKED:
+        keys = [key for key, _ in stored_kvs("/config_test/config_publish/")]
+        assert keys == [
+            b"/config_test/config_publish/@current",
+            b"/config_test/config_publish/@gen/0000000002/server/port",
+            b"/config_test/config_publish/@gen/0000000003/server/port",
+        ]
+
+
+def test_list_delete(tmpdir, config):
+    """
+    Test if configurations can be listed and deleted.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi\nbirth=4/7/1916")
+
+    obj = config("ini")
+    obj.push("config_list", str(testfile))
+    obj.push("config_list2", str(testfile))
+
+    with pytest.raises(ValueError):
+        obj.delete("")
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_list/gigi/birth", b""),
+            (b"/config_test/config_list/gigi/surname", b""),
+            (b"/config_test/config_list2/gigi/birth", b""),
+            (b"/config_test/config_list2/gigi/surname", b""),
+            (b"/config_test/orphan", b""),
+        ])
+
+    infos = {info.name: info for info in obj.list()}
+    assert infos["config_list"].keys == 2
+    assert infos["config_list2"].keys == 2
+    assert "orphan" not in infos
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_with(
+            b"/config_test/",
+            b"/config_test0",
+            limit=None,
+            revision=None,
+            keys_only=True)
+
+        Etcd3Backend.transaction_response.reset_mock()
+        Etcd3Backend.transaction_response.return_value = \
+            etcdrpc.TxnResponse(succeeded=True, responses=[
+                etcdrpc.ResponseOp(
+                    response_delete_range=etcdrpc.DeleteRangeResponse(
+                        deleted=2))
+            ])
+
+    assert obj.delete("config_list") == 2
+
+    if MOCKED:
+        ops = Etcd3Backend.transaction_response.call_args[1]["success"]
+        assert len(ops) == 1
+        assert ops[0].key == b"/config_test/config_list/"
+        assert ops[0].range_end == b"/config_test/config_list0"
+    else:
+        names = [info.name for info in obj.list()]
+        assert "config_list" not in names
+        assert "config_list2" in names
+
+
+def test_pull_consistency(tmpdir, config):
+    """
+    Test if configurations can be pulled with serializable reads.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi")
+
+    with pytest.raises(ValueError):
+        config("ini", consistency="eventual")
+
+    obj = config("ini")
+    obj.push("config_consistency", str(testfile))
+
+    with pytest.raises(ValueError):
+        obj.pull("config_consistency", consistency="eventual")
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.return_value = range_response([
+            (b"/config_test/config_consistency/gigi/surname", b"burigi"),
+        ])
+
+    data = obj.pull("config_consistency", consistency="serializable")
+    assert data == {"gigi": {"surname": "burigi"}}
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_with(
+            b"/config_test/config_consistency/",
+            b"/config_test/config_consistency0",
+            limit=None,
+            revision=None,
+            serializable=True)
+
+    obj = config("ini", consistency="serializable")
+    data = obj.pull("config_consistency", consistency="linearizable")
+    assert data == {"gigi": {"surname": "burigi"}}
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_called_with(
+            b"/config_test/config_consistency/",
+            b"/config_test/config_consistency0",
+            limit=None,
+            revision=None)
+
+
+def test_pull_coalesce(config):
+    """
+    Test if concurrent pulls of the same configuration share a single read.
+    """
+    obj = config("ini", coalesce=True)
+
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def _range(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return range_response([
+            (b"/config_test/config_coalesce/gigi/surname", b"burigi"),
+        ])
+
+    Etcd3Backend.get_range_response.side_effect = _range
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(obj.pull("config_coalesce")))
+        for _ in range(8)
+    ]
+
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+
+    # wait for all the pulls to join the first one
+    while obj.coalesced < len(threads) - 1:
+        time.sleep(0.01)
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert Etcd3Backend.get_range_response.call_count == 1
+    assert len(results) == len(threads)
+    assert all(result is results[0] for result in results)
+    assert results[0] == {"gigi": {"surname": "burigi"}}
+
+    # different revisions are read separately
+    Etcd3Backend.get_range_response.side_effect = Exception("failed")
+    with pytest.raises(Exception):
+        obj.pull("config_coalesce", revision=1)
+
+    assert Etcd3Backend.get_range_response.call_count == 2
+    assert obj.coalesced == len(threads) - 1
+
+
+def test_pull_path(tmpdir, config):
+    """
+    Test if sections can be pulled without reading the whole configuration,
+    whatever is the layout it has been pushed with.
+    """
+    data = {
+        "db": {
+            "name": "x" * 1000,
+            "pool": {"size": "10", "timeout": "5"},
+            "pool2": {"size": "1"},
+        },
+        "server": {"port": "80"},
+    }
+
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps(data))
+
+    obj = config("json", max_value_size=300)
+    obj.push("config_path", str(testfile))
+
+    if MOCKED:
+        use_stored_kvs()
+
+    for path in ["", "/", 1, "db//pool", "@chunks"]:
+        with pytest.raises(ValueError):
+            obj.pull("config_path", path=path)
+
+    assert obj.pull("config_path", path="db/pool") == data["db"]["pool"]
+    assert obj.pull("config_path", path="/db/") == data["db"]
+    assert obj.pull("config_path", path="missing") == {}
+
+    with pytest.raises(ValueError):
+        obj.pull("config_path", path="db/name")
+
+    if MOCKED:
+        Etcd3Backend.get_range_response.assert_any_call(
+            b"/config_test/config_path/db/pool",
+            b"/config_test/config_path/db/pool0",
+            limit=None,
+            revision=None)
+
+    lazy = obj.lazy("config_path")
+    assert lazy["server"] == data["server"]
+    assert lazy["db"]["name"] == data["db"]["name"]
+    assert lazy.revision is not None
+
+    with pytest.raises(KeyError):
+        lazy["missing"]
+
+    with pytest.raises(KeyError):
+        lazy["db/pool"]
+
+    assert list(lazy) == ["db", "server"]
+    assert len(lazy) == 2
+    assert dict(lazy) == data
+
+    for kwargs in [{"blob": True}, {"publish": True}]:
+        other = config("json", **kwargs)
+        other.push("config_path", str(testfile))
+
+        for reader in [obj, other]:
+            assert reader.pull("config_path", path="db/pool") == \
+                data["db"]["pool"]
+            assert reader.pull("config_path", path="db/missing") == {}
+            assert dict(reader.lazy("config_path")) == data
+
+
+def test_push_pull_escape(tmpdir, config):
+    """
+    Test if keys holding slashes are pushed and pulled back.
+    """
+    data = {"routes": {"/api/v1": {"timeout": "5"}, "50%": "half"}}
+
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps(data))
+
+    obj = config("json")
+    obj.push("config_escape", str(testfile))
+
+    if MOCKED:
+        keys = [key for key, _ in stored_kvs("/config_test/config_escape/")]
+        assert keys == [
+            b"/config_test/config_escape/routes/%2Fapi%2Fv1/timeout",
+            b"/config_test/config_escape/routes/50%25",
+        ]
+
+        use_stored_kvs()
+
+    assert obj.pull("config_escape") == data
+    assert obj.pull("config_escape", path="routes/%2Fapi%2Fv1") == \
+        data["routes"]["/api/v1"]
+    assert obj.lazy("config_escape")["routes"] == data["routes"]
+
+
 def test_yaml_push_pull(tmpdir, config):
     """
     Test YamlConfig::push/pull method implementation.
@@ -83,13 +1018,13 @@ def test_yaml_push_pull(tmpdir, config):
     obj.push("config_yaml", str(testfile))
 
     if MOCKED:
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_yaml/people/gigi/surname", "burigi")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_yaml/people/gigi/birth", "4/7/1916")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_yaml/people/osvaldo/surname", "carrube")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_yaml/people/osvaldo/birth", "5/8/1980")
     else:
         expected_data = {
@@ -135,13 +1070,13 @@ def test_json_push_pull(tmpdir, config):
     obj.push("config_json", str(testfile))
 
     if MOCKED:
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_json/people/gigi/surname", "burigi")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_json/people/gigi/birth", "4/7/1916")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_json/people/osvaldo/surname", "carrube")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_json/people/osvaldo/birth", "5/8/1980")
     else:
         expected_data = {
@@ -182,13 +1117,13 @@ def test_ini_push_pull(tmpdir, config):
     obj.push("config_ini", str(testfile))
 
     if MOCKED:
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_ini/gigi/surname", "burigi")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_ini/gigi/birth", "4/7/1916")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_ini/osvaldo/surname", "carrube")
-        etcd3.Etcd3Client.put.assert_any_call(
+        assert_pushed(
             "/config_test/config_ini/osvaldo/birth", "5/8/1980")
     else:
         expected_data = {
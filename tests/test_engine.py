@@ -0,0 +1,88 @@
+"""
+Unittests for engine module.
+"""
+import json
+import yaml
+import pytest
+import etcdgo
+import etcdgo.engine
+import etcdgo.memory
+
+DATA = {
+    "server": {"host": "localhost", "port": 8080, "debug": False},
+    "users": [{"name": "gigi", "surname": "bùrigi \U0001F600"}, None],
+    "control": "\x01\x7f\t\n\"\\/",
+    "ratio": 0.25,
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("pure", [True, False])
+def test_json(pure):
+    """
+    Test if JSON engines dump the same document of the json module.
+    """
+    text = etcdgo.engine.json_dumps(DATA, pure)
+    assert text == json.dumps(DATA, sort_keys=True, indent=4)
+    assert etcdgo.engine.json_loads(text, pure) == DATA
+
+    # values which are not supported by every engine
+    big = {"big": 2 ** 70}
+    assert etcdgo.engine.json_dumps(big, pure) == \
+        json.dumps(big, sort_keys=True, indent=4)
+    assert etcdgo.engine.json_loads('{"big": %d}' % 2 ** 70, pure) == big
+    assert etcdgo.engine.json_loads('{"a": NaN}', pure)["a"] != 0
+
+    with pytest.raises(ValueError):
+        etcdgo.engine.json_loads("{", pure)
+
+
+@pytest.mark.parametrize("pure", [True, False])
+def test_yaml(pure):
+    """
+    Test if Yaml engines dump the same document of the yaml module.
+    """
+    text = etcdgo.engine.yaml_dump(DATA, pure)
+    assert text == yaml.dump(DATA)
+    assert etcdgo.engine.yaml_load(text, pure) == DATA
+
+    with pytest.raises(yaml.YAMLError):
+        etcdgo.engine.yaml_load("a: [", pure)
+
+    # safe loader never constructs python objects
+    with pytest.raises(yaml.YAMLError):
+        etcdgo.engine.yaml_load("!!python/object:object {}", pure)
+
+    # and safe dumper never represents them
+    with pytest.raises(yaml.representer.RepresenterError):
+        etcdgo.engine.yaml_dump({"a": object()}, pure)
+
+
+@pytest.mark.parametrize("pure", [True, False])
+def test_yaml_config(pure, tmpdir):
+    """
+    Test if Yaml configurations are dumped by the safe dumpers.
+    """
+    data = {"server": {"host": "localhost"}, "name": "bùrigi \U0001F600"}
+    filepath = tmpdir / "myconfig.yaml"
+    filepath.write(yaml.dump(data))
+
+    backend = etcdgo.memory.MemoryBackend()
+    config = etcdgo.get_config(backend, "yaml", pure_python=pure)
+    config.push("myconfig", str(filepath))
+
+    text = config.dump("myconfig")
+    assert text == yaml.dump(data)
+    assert yaml.safe_load(text) == data
+
+    backend.close()
+
+
+def test_names(monkeypatch):
+    """
+    Test if pure Python engines can be forced.
+    """
+    assert etcdgo.engine.names(pure=True) == {"json": "json", "yaml": "pyyaml"}
+
+    monkeypatch.setattr(etcdgo.engine, "PURE_PYTHON", True)
+    assert etcdgo.engine.names() == {"json": "json", "yaml": "pyyaml"}
@@ -0,0 +1,316 @@
+"""
+Unittests for etcd module.
+"""
+import json
+import grpc
+import pytest
+import etcd3
+import etcd3.exceptions
+import etcd3.etcdrpc as etcdrpc
+import etcd3.etcdrpc.kv_pb2 as kv_pb2
+import etcdgo
+import etcdgo.etcd
+import etcdgo.memory
+
+
+class KVStub:
+    """
+    etcd KV service storing keys inside a MemoryBackend, which applies the
+    limit and the revision of range requests like etcd does.
+    """
+    # pylint: disable=invalid-name
+
+    def __init__(self):
+        self.backend = etcdgo.memory.MemoryBackend()
+        self.requests = []
+
+    def Range(self, request, timeout=None, **kwargs):
+        """
+        Serve a range request.
+        """
+        self.requests.append(request)
+
+        response = self.backend.get_range_response(
+            request.key,
+            request.range_end or None,
+            limit=request.limit,
+            revision=request.revision,
+            keys_only=request.keys_only)
+
+        return etcdrpc.RangeResponse(
+            header=etcdrpc.ResponseHeader(revision=response.header.revision),
+            kvs=[
+                kv_pb2.KeyValue(
+                    key=kv.key,
+                    value=kv.value,
+                    create_revision=kv.create_revision,
+                    mod_revision=kv.mod_revision,
+                    version=kv.version)
+                for kv in response.kvs
+            ],
+            more=response.more,
+            count=response.count)
+
+    def _compare(self, message):
+        """
+        Convert a comparison message into a backend comparison.
+        """
+        txn = self.backend.transactions
+        factory, field = {
+            etcdrpc.Compare.VERSION: (txn.version, "version"),
+            etcdrpc.Compare.CREATE: (txn.create, "create_revision"),
+            etcdrpc.Compare.MOD: (txn.mod, "mod_revision"),
+            etcdrpc.Compare.VALUE: (txn.value, "value"),
+        }[message.target]
+
+        item = factory(message.key, range_end=message.range_end or None)
+        value = getattr(message, field)
+
+        if message.result == etcdrpc.Compare.EQUAL:
+            return item == value
+        if message.result == etcdrpc.Compare.GREATER:
+            return item > value
+        if message.result == etcdrpc.Compare.LESS:
+            return item < value
+
+        return item != value
+
+    def _ops(self, requests):
+        """
+        Convert request operations into backend operations.
+        """
+        txn = self.backend.transactions
+        ops = []
+        for request in requests:
+            if request.HasField("request_put"):
+                ops.append(txn.put(
+                    request.request_put.key,
+                    request.request_put.value))
+            else:
+                ops.append(txn.delete(
+                    request.request_delete_range.key,
+                    range_end=request.request_delete_range.range_end or None))
+
+        return ops
+
+    def Txn(self, request, timeout=None, **kwargs):
+        """
+        Serve a transaction request.
+        """
+        self.requests.append(request)
+
+        response = self.backend.transaction_response(
+            [self._compare(message) for message in request.compare],
+            self._ops(request.success),
+            self._ops(request.failure))
+
+        responses = []
+        for item in response.responses:
+            if item.response_put:
+                responses.append(etcdrpc.ResponseOp(
+                    response_put=etcdrpc.PutResponse()))
+            else:
+                responses.append(etcdrpc.ResponseOp(
+                    response_delete_range=etcdrpc.DeleteRangeResponse(
+                        deleted=item.response_delete_range.deleted)))
+
+        return etcdrpc.TxnResponse(
+            header=etcdrpc.ResponseHeader(revision=response.header.revision),
+            succeeded=response.succeeded,
+            responses=responses)
+
+
+class UnavailableError(grpc.RpcError):
+    """
+    gRPC error raised when etcd can't be reached.
+    """
+
+    def code(self):
+        """
+        gRPC status code.
+        """
+        # pylint: disable=no-self-use
+        return grpc.StatusCode.UNAVAILABLE
+
+
+@pytest.fixture
+def stub():
+    """
+    etcd client sending requests to a KVStub.
+    """
+    client = etcd3.Etcd3Client()
+    client.kvstub = KVStub()
+
+    yield client
+
+    client.close()
+
+
+def test_range_request():
+    """
+    Test if range requests hold all the given arguments.
+    """
+    request = etcdgo.etcd.range_request(
+        "/a/",
+        b"/a0",
+        limit=10,
+        revision=5,
+        keys_only=True,
+        serializable=True)
+
+    assert request.key == b"/a/"
+    assert request.range_end == b"/a0"
+    assert request.limit == 10
+    assert request.revision == 5
+    assert request.keys_only
+    assert request.serializable
+
+    request = etcdgo.etcd.range_request(b"/a", None)
+    assert request.range_end == b""
+    assert request.limit == 0
+    assert request.revision == 0
+
+
+def test_push_pull(tmpdir, stub):
+    """
+    Test if configurations created with an etcd3 client use Etcd3Backend.
+    """
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps({"gigi": {"surname": "burigi"}}))
+
+    obj = etcdgo.get_config(stub, "json", basefolder="/etcd_test")
+    assert isinstance(obj._client, etcdgo.etcd.Etcd3Backend)
+    assert obj._client.transactions is stub.transactions
+
+    obj.push("myconfig", str(testfile))
+
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision == stub.kvstub.backend.revision
+
+    backend = etcdgo.etcd.Etcd3Backend(stub)
+    response = backend.transaction_response(
+        [backend.transactions.version(b"/etcd_test/other") == 0],
+        [backend.transactions.put(b"/etcd_test/other", b"1")])
+    assert response.succeeded
+    assert response.header.revision == stub.kvstub.backend.revision
+
+    assert backend.transaction(
+        [backend.transactions.version(b"/etcd_test/other") == 0],
+        [backend.transactions.put(b"/etcd_test/other", b"2")]) == (False, [])
+
+    assert obj.delete("myconfig") == 1
+
+
+def test_errors(stub, mocker):
+    """
+    Test if gRPC errors are translated into etcd3 exceptions.
+    """
+    mocker.patch.object(stub.kvstub, "Range", side_effect=UnavailableError())
+
+    backend = etcdgo.etcd.Etcd3Backend(stub)
+    with pytest.raises(etcd3.exceptions.ConnectionFailedError):
+        backend.get_range_response(b"/a/", b"/a0")
+
+    with pytest.raises(ValueError):
+        etcdgo.get_config(object(), "json")
+
+
+def test_pull_revision(tmpdir, stub):
+    """
+    Test if an overwritten configuration can be pulled at an older revision.
+    """
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps({"gigi": {"surname": "burigi"}}))
+
+    obj = etcdgo.get_config(stub, "json", basefolder="/etcd_test")
+    obj.push("myconfig", str(testfile))
+    revision = obj.pull("myconfig").revision
+
+    testfile.write(json.dumps({"gigi": {"surname": "bubu"}}))
+    obj.push("myconfig", str(testfile))
+    assert obj.pull("myconfig") == {"gigi": {"surname": "bubu"}}
+
+    del stub.kvstub.requests[:]
+
+    data = obj.pull("myconfig", revision=revision)
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision == revision
+    assert stub.kvstub.requests
+    assert all(req.revision == revision for req in stub.kvstub.requests)
+
+    # etcd3.Etcd3Client doesn't send the revision, reading the latest data
+    response = stub.get_range_response(
+        b"/etcd_test/myconfig/", b"/etcd_test/myconfig0",
+        revision=revision)
+    assert response.kvs[0].mod_revision > revision
+
+
+def test_pull_paging(tmpdir, stub):
+    """
+    Test if pulled keys are fetched in pages over etcd3.
+    """
+    testfile = tmpdir / "config.json"
+    testfile.write(json.dumps({"key%d" % i: str(i) for i in range(5)}))
+
+    obj = etcdgo.get_config(
+        stub,
+        "json",
+        basefolder="/etcd_test",
+        page_size=2)
+    obj.push("myconfig", str(testfile))
+    revision = stub.kvstub.backend.revision
+
+    del stub.kvstub.requests[:]
+
+    data = obj.pull("myconfig")
+    assert data == {"key%d" % i: str(i) for i in range(5)}
+
+    pages = stub.kvstub.requests
+    assert len(pages) == 3
+    assert all(req.limit == 2 for req in pages)
+    assert all(req.revision == revision for req in pages[1:])
+
+
+def test_pull_generation(tmpdir, stub):
+    """
+    Test if pull returns the current generation of a published
+    configuration, reading only its keys when configuration object
+    publishes.
+    """
+    testfile = tmpdir / "config.json"
+
+    publisher = etcdgo.get_config(
+        stub,
+        "json",
+        basefolder="/etcd_test",
+        publish=True)
+
+    for surname in ("burigi", "bubu", "carrube"):
+        testfile.write(json.dumps({"gigi": {"surname": surname}}))
+        stats = publisher.push("myconfig", str(testfile))
+        assert stats.revision == stub.kvstub.backend.revision
+
+    obj = etcdgo.get_config(stub, "json", basefolder="/etcd_test")
+
+    del stub.kvstub.requests[:]
+
+    # pointer is resolved from the single prefix read
+    assert obj.pull("myconfig") == {"gigi": {"surname": "carrube"}}
+    assert len(stub.kvstub.requests) == 1
+
+    del stub.kvstub.requests[:]
+
+    data = publisher.pull("myconfig")
+    assert data == {"gigi": {"surname": "carrube"}}
+
+    pointer, generation = stub.kvstub.requests
+    assert pointer.key == b"/etcd_test/myconfig/@current"
+    assert pointer.range_end == b"/etcd_test/myconfig/@current\0"
+    assert generation.key.startswith(b"/etcd_test/myconfig/@gen/")
+    assert generation.revision == data.revision
+
+    # reserved keys are counted too
+    response = stub.kvstub.backend.get_range_response(
+        b"/etcd_test/myconfig/", b"/etcd_test/myconfig0")
+    assert obj.list()[0].keys == len(response.kvs)
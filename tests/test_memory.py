@@ -0,0 +1,224 @@
+"""
+Unittests for memory module.
+"""
+import json
+import yaml
+import pytest
+import etcdgo
+import etcdgo.cache
+import etcdgo.memory
+import etcdgo.snapshot
+
+
+@pytest.fixture
+def backend():
+    """
+    In-process backend to test.
+    """
+    obj = etcdgo.memory.MemoryBackend()
+    yield obj
+    obj.close()
+
+
+def test_range_revision(backend):
+    """
+    Test range requests at current and past revisions.
+    """
+    put = backend.transactions.put
+    delete = backend.transactions.delete
+
+    backend.transaction([], [put(b"/a/1", b"x"), put(b"/a/2", b"y")])
+    backend.transaction([], [put(b"/a/1", b"z"), put(b"/b", b"w")])
+    backend.transaction([], [delete(b"/a/2")])
+    assert backend.revision == 4
+
+    response = backend.get_range_response(b"/a/", b"/a0")
+    assert response.header.revision == 4
+    assert [(kv.key, kv.value) for kv in response.kvs] == [(b"/a/1", b"z")]
+    assert response.kvs[0].create_revision == 2
+    assert response.kvs[0].mod_revision == 3
+    assert response.kvs[0].version == 2
+
+    response = backend.get_range_response(b"/a/", b"/a0", revision=2)
+    assert [(kv.key, kv.value) for kv in response.kvs] == \
+        [(b"/a/1", b"x"), (b"/a/2", b"y")]
+
+    response = backend.get_range_response(b"/", b"\0", limit=1)
+    assert response.more
+    assert response.count == 2
+    assert [kv.key for kv in response.kvs] == [b"/a/1"]
+
+    response = backend.get_range_response(b"/b", None, keys_only=True)
+    assert [(kv.key, kv.value) for kv in response.kvs] == [(b"/b", b"")]
+
+    with pytest.raises(ValueError):
+        backend.get_range_response(b"/a/", b"/a0", revision=5)
+
+    backend.compact(3)
+
+    with pytest.raises(ValueError):
+        backend.get_range_response(b"/a/", b"/a0", revision=2)
+
+    response = backend.get_range_response(b"/a/", b"/a0", revision=3)
+    assert [(kv.key, kv.value) for kv in response.kvs] == \
+        [(b"/a/1", b"z"), (b"/a/2", b"y")]
+
+
+def test_transaction(backend):
+    """
+    Test transaction comparisons and operations.
+    """
+    txn = backend.transactions
+
+    succeeded, _ = backend.transaction(
+        [txn.version(b"/k") == 0], [txn.put(b"/k", b"1")])
+    assert succeeded
+
+    succeeded, _ = backend.transaction(
+        [txn.version(b"/k") == 0], [txn.put(b"/k", b"2")])
+    assert not succeeded
+
+    # missing keys never match a value comparison
+    succeeded, _ = backend.transaction(
+        [txn.value(b"/missing") != b"1"], [txn.put(b"/k", b"2")])
+    assert not succeeded
+
+    succeeded, _ = backend.transaction(
+        [txn.mod(b"/", range_end=b"0") < 3, txn.value(b"/k") == b"1"],
+        [txn.put(b"/k", b"2"), txn.put(b"/j", b"3")])
+    assert succeeded
+    assert backend.revision == 3
+
+    # failed comparisons don't change revision
+    succeeded, responses = backend.transaction(
+        [txn.mod(b"/", range_end=b"0") < 3], [txn.put(b"/k", b"4")])
+    assert not succeeded
+    assert not responses
+    assert backend.revision == 3
+
+    with pytest.raises(ValueError):
+        backend.transaction(
+            [], [txn.delete(b"/", range_end=b"0"), txn.put(b"/k", b"5")])
+
+    _, responses = backend.transaction(
+        [], [txn.delete(b"/", range_end=b"0")])
+    assert responses[0].response_delete_range.deleted == 2
+    assert not backend.get_range_response(b"/", b"\0").kvs
+
+
+def test_watch(backend):
+    """
+    Test watch notifications and history replay.
+    """
+    put = backend.transactions.put
+    delete = backend.transactions.delete
+
+    backend.transaction([], [put(b"/w/a", b"1"), put(b"/other", b"1")])
+    backend.transaction([], [put(b"/w/b", b"2")])
+
+    responses = []
+    watch_id = backend.add_watch_prefix_callback(
+        b"/w/", responses.append, start_revision=2)
+
+    backend.transaction([], [delete(b"/w/a")])
+    backend.transaction([], [put(b"/other", b"2")])
+    backend.cancel_watch(watch_id)
+    backend.transaction([], [put(b"/w/c", b"3")])
+
+    assert [response.header.revision for response in responses] == [2, 3, 4]
+    assert [event.key for event in responses[0].events] == [b"/w/a"]
+    assert isinstance(responses[2].events[0], etcdgo.backend.DeleteEvent)
+
+
+def test_config(backend, tmpdir):
+    """
+    Test configurations on top of the in-process backend.
+    """
+    data = {"a": {"b": "1", "c": "2"}, "d": "3"}
+    filepath = tmpdir / "myconfig.json"
+    filepath.write(json.dumps(data))
+
+    config = etcdgo.get_config(backend, "json", basefolder="/memory_test")
+    revision = config.push("myconfig", str(filepath)).revision
+    assert revision == backend.revision
+
+    events = []
+    watch = config.watch("myconfig", events.append)
+
+    filepath.write(json.dumps({"a": {"b": "4"}, "d": "3"}))
+    config.push("myconfig", str(filepath), incremental=True)
+    watch.cancel()
+
+    assert config.pull("myconfig") == {"a": {"b": "4"}, "d": "3"}
+    assert config.pull("myconfig", revision=revision) == data
+    assert watch.config == {"a": {"b": "4"}, "d": "3"}
+    assert len(events) == 1
+
+    assert config.delete("myconfig") == 2
+    assert not config.list()
+
+
+def test_yaml_dump(backend, tmpdir):
+    """
+    Test if dumped Yaml configurations can be read by the safe loader.
+    """
+    data = {"a": {"b": "1", "c": "2"}, "d": "3"}
+    filepath = tmpdir / "myconfig.yaml"
+    filepath.write(yaml.dump(data))
+
+    config = etcdgo.get_config(backend, "yaml", basefolder="/memory_test")
+    config.push("myconfig", str(filepath))
+
+    cache = etcdgo.cache.CachedConfig(config)
+    snapshot = etcdgo.snapshot.SnapshotConfig(config, str(tmpdir / "snap"))
+
+    for obj in (config, cache, snapshot):
+        text = obj.dump("myconfig")
+        assert "!!python" not in text
+        assert yaml.safe_load(text) == data
+
+    cache.close()
+
+
+def test_incremental_guard(backend, tmpdir, mocker):
+    """
+    Test if every transaction of an incremental push is guarded.
+    """
+    filepath = tmpdir / "myconfig.json"
+    filepath.write(json.dumps({"a": "1", "b": "2"}))
+
+    config = etcdgo.get_config(
+        backend,
+        "json",
+        basefolder="/memory_test",
+        batch_size=1)
+    config.push("myconfig", str(filepath))
+
+    transaction_response = backend.transaction_response
+    compares = []
+
+    def _concurrent(compare, success=None, failure=None):
+        compares.append(compare)
+        response = transaction_response(compare, success, failure)
+
+        # someone else writes the configuration after our transaction
+        transaction_response([], [backend.transactions.put(
+            b"/memory_test/myconfig/c", b"5")])
+
+        return response
+
+    mocker.patch.object(
+        backend,
+        "transaction_response",
+        side_effect=_concurrent)
+
+    filepath.write(json.dumps({"a": "3", "b": "4"}))
+    with pytest.raises(etcdgo.config.ConcurrentUpdateError):
+        config.push("myconfig", str(filepath), incremental=True)
+
+    assert len(compares) == 2
+    assert all(compares)
+
+    # first batch has been committed, second one has been rejected
+    mocker.stopall()
+    assert config.pull("myconfig") == {"a": "3", "b": "2", "c": "5"}
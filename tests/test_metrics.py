@@ -0,0 +1,140 @@
+"""
+Unittests for metrics module.
+"""
+import json
+import socket
+import pytest
+import etcdgo
+import etcdgo.memory
+import etcdgo.metrics
+
+
+class Recorder(etcdgo.metrics.Observer):
+    """
+    Observer keeping all the operations.
+    """
+
+    def __init__(self):
+        self.operations = []
+
+    def on_operation(self, operation):
+        self.operations.append(operation)
+
+
+@pytest.fixture
+def config(tmpdir):
+    """
+    Configuration object with a pushed configuration.
+    """
+    filepath = tmpdir / "myconfig.json"
+    filepath.write(json.dumps({"a": {"b": "1", "c": "2"}, "d": "3"}))
+
+    obj = etcdgo.get_config(
+        etcdgo.memory.MemoryBackend(),
+        "json",
+        basefolder="/metrics_test")
+    obj.push("myconfig", str(filepath))
+
+    yield obj, str(filepath)
+
+
+def test_observer(config):
+    """
+    Test if operations are measured and given to observers.
+    """
+    obj, filepath = config
+
+    recorder = Recorder()
+    obj.add_observer(recorder)
+
+    obj.push("myconfig", filepath)
+    obj.pull("myconfig")
+    obj.dump("myconfig")
+
+    with pytest.raises(ValueError):
+        obj.pull("myconfig", path="d")
+
+    obj.remove_observer(recorder)
+    obj.pull("myconfig")
+
+    push, pull, dump, error = recorder.operations
+
+    assert push.kind == "push"
+    assert push.name == "myconfig"
+    assert push.keys == 3
+    assert push.rpcs == 1
+    assert push.bytes_sent > 0
+    assert push.phases["parse"] > 0
+    assert push.phases["flatten"] > 0
+    assert push.phases["rpc"] > 0
+
+    assert pull.kind == "pull"
+    assert pull.keys == 3
+    assert pull.rpcs == 1
+    assert pull.bytes_received > 0
+    assert pull.phases["unflatten"] > 0
+    assert pull.error is None
+
+    # pull inside dump is part of the dump
+    assert dump.kind == "dump"
+    assert dump.rpcs == 1
+    assert dump.phases["serialize"] > 0
+    assert dump.duration >= sum(dump.phases.values())
+
+    assert isinstance(error.error, ValueError)
+
+    with pytest.raises(ValueError):
+        obj.add_observer(object())
+
+
+def test_prometheus(config):
+    """
+    Test Prometheus exposition of aggregated measures.
+    """
+    obj, _ = config
+
+    metrics = etcdgo.metrics.Metrics()
+    obj.add_observer(metrics)
+
+    obj.pull("myconfig")
+    obj.pull("myconfig")
+
+    totals = metrics.totals("pull")
+    assert totals.count == 2
+    assert totals.keys == 6
+    assert totals.rpcs == 2
+    assert metrics.totals("push").count == 0
+
+    text = metrics.prometheus()
+    assert "# TYPE etcdgo_operation_duration_seconds summary\n" in text
+    assert 'etcdgo_operation_duration_seconds_count{operation="pull"} 2\n' \
+        in text
+    assert 'etcdgo_rpcs_total{operation="pull"} 2\n' in text
+    assert 'etcdgo_phase_seconds_total{operation="pull",phase="rpc"}' in text
+
+
+def test_statsd(config):
+    """
+    Test StatsD datagrams.
+    """
+    obj, _ = config
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+
+    observer = etcdgo.metrics.StatsdObserver(
+        "127.0.0.1", server.getsockname()[1], prefix="app")
+    obj.add_observer(observer)
+
+    try:
+        obj.pull("myconfig")
+        lines = server.recv(65536).decode('utf-8').split("\n")
+    finally:
+        observer.close()
+        server.close()
+
+    assert lines[0].startswith("app.pull.duration:")
+    assert lines[0].endswith("|ms")
+    assert "app.pull.keys:3|c" in lines
+    assert "app.pull.rpcs:1|c" in lines
@@ -0,0 +1,168 @@
+"""
+Unittests for snapshot module.
+"""
+import os
+import time
+import datetime
+import pytest
+import etcd3
+import etcd3.exceptions
+import etcdgo
+import etcdgo.snapshot
+from etcdgo.etcd import Etcd3Backend
+from conftest import range_response, txn_response
+
+MOCKED = os.environ.get("PYTEST_MOCKED", None)
+
+
+@pytest.fixture
+def snapshot(mocker, tmpdir):
+    """
+    Snapshot configuration to test.
+    """
+    if MOCKED:
+        mocker.patch('etcd3.Etcd3Client.__init__', return_value=None)
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.get_range_response',
+            return_value=range_response([
+                (b"/snapshot_test/myconfig/gigi/surname", b"burigi"),
+            ], revision=5))
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.transaction_response',
+            return_value=txn_response())
+        mocker.patch(
+            'etcd3.Etcd3Client.transactions',
+            etcd3.Transactions(),
+            create=True)
+
+    def _callback(**kwargs):
+        config = etcdgo.get_config(
+            etcd3.Etcd3Client(),
+            "ini",
+            basefolder="/snapshot_test")
+
+        return etcdgo.snapshot.SnapshotConfig(
+            config, str(tmpdir / "snapshots"), **kwargs)
+
+    yield _callback
+
+
+def test_save_load(tmpdir):
+    """
+    Test writing and reading a snapshot file.
+    """
+    filepath = etcdgo.snapshot.path(str(tmpdir), "/config", "my/config")
+    assert os.path.dirname(filepath) == str(tmpdir)
+
+    assert etcdgo.snapshot.load(filepath) is None
+
+    data = {"gigi": {"surname": "burigi"}}
+    etcdgo.snapshot.save(filepath, data, 12, 1000.0)
+
+    snap = etcdgo.snapshot.load(filepath, max_age=10, now=1010.0)
+    assert snap.data == data
+    assert snap.revision == 12
+    assert snap.timestamp == 1000.0
+
+    assert etcdgo.snapshot.load(filepath, max_age=10, now=1011.0) is None
+    assert os.listdir(str(tmpdir)) == [os.path.basename(filepath)]
+
+    # truncated snapshots are ignored
+    with open(filepath, "rb") as fdata:
+        content = fdata.read()
+
+    with open(filepath, "wb") as fdata:
+        fdata.write(content[:-1])
+
+    assert etcdgo.snapshot.load(filepath) is None
+
+    with open(filepath, "wb") as fdata:
+        fdata.write(content + b" ")
+
+    assert etcdgo.snapshot.load(filepath) is None
+
+    # values which are not supported by JSON are never converted
+    with pytest.raises(TypeError):
+        etcdgo.snapshot.save(filepath, {"date": datetime.date.today()}, 13,
+                             1000.0)
+
+    with open(filepath, "rb") as fdata:
+        assert fdata.read() == content + b" "
+
+
+def test_snapshot_error(snapshot):
+    """
+    Test errors when creating a snapshot configuration.
+    """
+    with pytest.raises(ValueError):
+        snapshot(max_age=-1)
+
+    obj = snapshot()
+
+    with pytest.raises(ValueError):
+        obj.pull(None)
+
+
+def test_snapshot_revalidate(snapshot):
+    """
+    Test if the first pull is served by the snapshot and revalidated.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    obj = snapshot()
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision == 5
+    assert obj.hits == 0
+
+    Etcd3Backend.get_range_response.return_value = range_response([
+        (b"/snapshot_test/myconfig/gigi/surname", b"carrube"),
+    ], revision=6)
+
+    # process restarts
+    obj = snapshot()
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision == 5
+    assert obj.hits == 1
+
+    obj.wait()
+
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "carrube"}}
+    assert data.revision == 6
+
+    obj = snapshot(revalidate=False)
+    assert obj.pull("myconfig").revision == 6
+    assert obj.hits == 0
+
+
+def test_snapshot_fallback(snapshot):
+    """
+    Test if snapshots are served when the database can't be reached.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    obj = snapshot(max_age=60)
+    obj.pull("myconfig")
+
+    Etcd3Backend.get_range_response.side_effect = \
+        etcd3.exceptions.ConnectionFailedError()
+
+    data = obj.pull("myconfig")
+    assert data == {"gigi": {"surname": "burigi"}}
+    assert data.revision == 5
+    assert obj.fallbacks == 1
+
+    # snapshot is too old
+    obj = snapshot(max_age=60)
+    obj._max_age = 0
+    time.sleep(0.01)
+
+    with pytest.raises(etcd3.exceptions.ConnectionFailedError):
+        obj.pull("myconfig")
+
+    with pytest.raises(etcd3.exceptions.ConnectionFailedError):
+        obj.pull("otherconfig")
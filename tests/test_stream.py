@@ -0,0 +1,136 @@
+"""
+Unittests for stream module.
+"""
+import io
+import json
+import pytest
+import yaml
+import flatten_dict
+import etcdgo.stream
+
+DATA = {
+    "people": {
+        "gigi": {
+            "surname": "burigi",
+            "birth": "4/7/1916",
+            "quote": "say \"hello\" è\n",
+            "age": 104,
+            "height": 1.75,
+            "alive": False,
+            "nickname": None,
+            "friends": ["osvaldo", {"name": "carlo"}],
+        },
+        "osvaldo": {
+            "surname": "carrube",
+            "scientific": -1.5e-3,
+            "big": 12345678901234567890,
+            "empty": {},
+            "none": [],
+        },
+    },
+    "blob": "x" * 10000,
+    "empty": {},
+}
+
+
+def flatten(data):
+    """
+    Flatten a dictionary like Config does.
+    """
+    def slash_reducer(k1, k2):
+        if k1 is None:
+            return k2
+
+        return "{0}/{1}".format(k1, k2)
+
+    return list(flatten_dict.flatten(data, reducer=slash_reducer).items())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+def test_json_leaves(chunk_size):
+    """
+    Test if JSON leaves are the same produced by json and flatten_dict,
+    whatever is the size of the read chunks.
+    """
+    text = json.dumps(DATA, indent=4)
+    reader = etcdgo.stream._JsonReader(io.StringIO(text), chunk_size)
+
+    leaves = list(etcdgo.stream._json_object_leaves(reader, None))
+    assert leaves == flatten(json.loads(text))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+@pytest.mark.parametrize("number", ["123456789012", "-1.5e-3", "7", "0.25"])
+def test_json_leaves_number(chunk_size, number):
+    """
+    Test if numbers are parsed at the end of file and across chunks.
+    """
+    for text in (
+            '{"a": "x", "big": %s}' % number,
+            '{"a": "x", "big": %s }\n' % number,
+            '{"big": %s, "a": "xyz"}' % number):
+        for start in range(len(text)):
+            # file starts in the middle of the first chunk
+            fdata = io.StringIO(" " * start + text)
+            reader = etcdgo.stream._JsonReader(fdata, chunk_size)
+
+            leaves = list(etcdgo.stream._json_object_leaves(reader, None))
+            assert leaves == flatten(json.loads(text))
+
+    leaves = list(etcdgo.stream.json_leaves(
+        io.StringIO('{"a": "x", "big": %s}' % number)))
+    assert leaves == flatten(json.loads('{"a": "x", "big": %s}' % number))
+
+
+def test_json_leaves_error():
+    """
+    Test JSON parsing errors.
+    """
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.json_leaves(io.StringIO("[1, 2]")))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.json_leaves(io.StringIO('{"a": 1')))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.json_leaves(io.StringIO('{"a": 1 "b": 2}')))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.json_leaves(io.StringIO('{"a": tru}')))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.json_leaves(io.StringIO('{"a": 1} {}')))
+
+
+def test_yaml_leaves():
+    """
+    Test if Yaml leaves are the same produced by yaml and flatten_dict.
+    """
+    text = yaml.dump(DATA) + """
+anchored: &anchor
+    key: value
+    list: [1, 2]
+alias: *anchor
+scalar: &scalar hello
+scalar_alias: *scalar
+date: 2020-01-01
+"""
+    leaves = list(etcdgo.stream.yaml_leaves(io.StringIO(text)))
+    assert leaves == flatten(yaml.safe_load(text))
+
+    assert not list(etcdgo.stream.yaml_leaves(io.StringIO("")))
+
+
+def test_yaml_leaves_error():
+    """
+    Test Yaml parsing errors.
+    """
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.yaml_leaves(io.StringIO("- 1\n- 2\n")))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.yaml_leaves(io.StringIO("a: 1\n---\nb: 2\n")))
+
+    with pytest.raises(ValueError):
+        list(etcdgo.stream.yaml_leaves(io.StringIO(
+            "base: &base {a: 1}\nderived:\n    <<: *base\n")))
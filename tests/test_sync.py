@@ -0,0 +1,125 @@
+"""
+Unittests for sync module.
+"""
+import os
+import json
+import pytest
+import etcdgo
+import etcdgo.memory
+import etcdgo.sync
+
+
+@pytest.fixture
+def tree(tmpdir):
+    """
+    Directory of configuration files.
+    """
+    (tmpdir / "services").mkdir()
+    (tmpdir / ".git").mkdir()
+
+    (tmpdir / "app.json").write(json.dumps({"a": {"b": "1"}}))
+    (tmpdir / "services" / "db.yaml").write("pool:\n  size: '4'\n")
+    (tmpdir / "services" / "web.ini").write("[server]\nport = 80\n")
+    (tmpdir / "README.md").write("not a configuration")
+    (tmpdir / ".git" / "config.json").write("{}")
+
+    yield tmpdir
+
+
+def test_scan(tree):
+    """
+    Test if files are labeled by their relative path.
+    """
+    assert etcdgo.sync.scan(str(tree)) == {
+        "app": ("app.json", "json"),
+        "services%2Fdb": ("services/db.yaml", "yaml"),
+        "services%2Fweb": ("services/web.ini", "ini"),
+    }
+
+    (tree / "app.yml").write("a: 1\n")
+    with pytest.raises(ValueError):
+        etcdgo.sync.scan(str(tree))
+
+    with pytest.raises(ValueError):
+        etcdgo.sync.scan(str(tree / "app.json"))
+
+
+def test_sync(tree):
+    """
+    Test if only changed files are pushed, and removed ones deleted.
+    """
+    backend = etcdgo.memory.MemoryBackend()
+    config = etcdgo.get_config(backend, "json", basefolder="/sync_test")
+
+    def sync(**kwargs):
+        return etcdgo.sync.sync(
+            backend,
+            str(tree),
+            basefolder="/sync_test",
+            target="memory",
+            **kwargs)
+
+    result = sync()
+    assert result.ok
+    assert result.pushed == ["app", "services%2Fdb", "services%2Fweb"]
+    assert config.pull("services%2Fdb") == {"pool": {"size": "4"}}
+    assert os.path.isfile(str(tree / etcdgo.sync.MANIFEST))
+
+    # manifest holds the revisions returned by the pushes
+    entries = etcdgo.sync.load_manifest(
+        str(tree / etcdgo.sync.MANIFEST),
+        "memory/sync_test")
+    assert max(entry["revision"] for entry in entries.values()) == \
+        backend.revision
+    for info in config.list():
+        assert info.mod_revision <= entries[info.name]["revision"]
+
+    result = sync()
+    assert not result.pushed
+    assert len(result.unchanged) == 3
+
+    # a new hash which doesn't change any key is pushed only once
+    (tree / "app.json").write(json.dumps({"a": {"b": "1"}}, indent=4))
+    revision = backend.revision
+    assert sync().pushed == ["app"]
+    assert backend.revision == revision
+    assert not sync().pushed
+
+    (tree / "app.json").write(json.dumps({"a": {"b": "2"}}))
+    revisions = {info.name: info.mod_revision for info in config.list()}
+
+    result = sync()
+    assert result.pushed == ["app"]
+    assert config.pull("app") == {"a": {"b": "2"}}
+
+    for info in config.list():
+        if info.name != "app":
+            assert info.mod_revision == revisions[info.name]
+
+    # configurations modified by someone else are pushed again
+    config.delete("services%2Fdb")
+    result = sync()
+    assert result.pushed == ["services%2Fdb"]
+
+    other = tree / ".git" / "config.json"
+    other.write(json.dumps({"a": {"b": "3"}}))
+    config.push("app", str(other), incremental=True)
+    assert sync().pushed == ["app"]
+    assert config.pull("app") == {"a": {"b": "2"}}
+
+    os.remove(str(tree / "services" / "web.ini"))
+    result = sync()
+    assert not result.deleted
+    assert config.pull("services%2Fweb")
+
+    result = sync(delete=True)
+    assert result.deleted == ["services%2Fweb"]
+    assert not config.pull("services%2Fweb")
+
+    # manifests of other targets are ignored
+    result = etcdgo.sync.sync(
+        backend,
+        str(tree),
+        basefolder="/sync_test",
+        target="other")
+    assert result.pushed == ["app", "services%2Fdb"]
@@ -0,0 +1,199 @@
+"""
+Unittests for watch module.
+"""
+import os
+import queue
+import pytest
+import etcd3
+import etcd3.events
+import etcd3.etcdrpc as etcdrpc
+import etcd3.etcdrpc.kv_pb2 as kv_pb2
+import etcdgo
+from conftest import txn_response
+
+MOCKED = os.environ.get("PYTEST_MOCKED", None)
+
+
+class WatchResponse:
+    """
+    Mocked etcd watch response.
+    """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, events):
+        self.events = events
+
+
+def event(key, value=None, revision=1):
+    """
+    Build a mocked etcd event. If value is None, a delete event is built.
+    """
+    event_type = kv_pb2.Event.PUT
+    if value is None:
+        event_type = kv_pb2.Event.DELETE
+
+    return etcd3.events.new_event(kv_pb2.Event(
+        type=event_type,
+        kv=kv_pb2.KeyValue(
+            key=key,
+            value=value or b'',
+            mod_revision=revision)))
+
+
+@pytest.fixture
+def config(mocker):
+    """
+    Config to test.
+    """
+    callbacks = []
+
+    if MOCKED:
+        def _add_watch(key, callback, **kwargs):
+            callbacks.append(callback)
+            return len(callbacks)
+
+        mocker.patch('etcd3.Etcd3Client.__init__', return_value=None)
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.get_range_response',
+            return_value=etcdrpc.RangeResponse(
+                header=etcdrpc.ResponseHeader(revision=10),
+                kvs=[
+                    kv_pb2.KeyValue(
+                        key=b"/watch_test/myconfig/gigi/birth",
+                        value=b"4/7/1916"),
+                    kv_pb2.KeyValue(
+                        key=b"/watch_test/myconfig/gigi/surname",
+                        value=b"burigi"),
+                ]))
+        mocker.patch(
+            'etcd3.Etcd3Client.add_watch_prefix_callback',
+            side_effect=_add_watch)
+        mocker.patch('etcd3.Etcd3Client.cancel_watch')
+        mocker.patch(
+            'etcdgo.etcd.Etcd3Backend.transaction_response',
+            return_value=txn_response())
+        mocker.patch(
+            'etcd3.Etcd3Client.transactions',
+            etcd3.Transactions(),
+            create=True)
+
+    obj = etcdgo.get_config(
+        etcd3.Etcd3Client(),
+        "ini",
+        basefolder="/watch_test")
+
+    obj.callbacks = callbacks
+
+    return obj
+
+
+def test_watch_error(config):
+    """
+    Test errors when using watch.
+    """
+    with pytest.raises(ValueError):
+        config.watch(None, print)
+
+    with pytest.raises(ValueError):
+        config.watch("myconfig", None)
+
+
+def test_watch(tmpdir, config):
+    """
+    Test if watched configurations are patched on changes.
+    """
+    testfile = tmpdir / "config.ini"
+    testfile.write("[gigi]\nsurname=burigi\nbirth=4/7/1916")
+    config.push("myconfig", str(testfile))
+
+    events = queue.Queue()
+    watch = config.watch("myconfig", events.put)
+    revision = watch.revision
+    assert watch.config == {
+        "gigi": {
+            "surname": "burigi",
+            "birth": "4/7/1916"
+        }
+    }
+
+    testfile.write("[gigi]\nsurname=carrube\nalive=no")
+    config.push("myconfig", str(testfile), incremental=True)
+
+    if MOCKED:
+        etcd3.Etcd3Client.add_watch_prefix_callback.assert_called_once_with(
+            "/watch_test/myconfig/",
+            config.callbacks[0],
+            start_revision=11)
+
+        config.callbacks[0](WatchResponse([
+            event(b"/watch_test/myconfig/gigi/surname", b"carrube", 11),
+            event(b"/watch_test/myconfig/gigi/alive", b"no", 11),
+            event(b"/watch_test/myconfig/gigi/birth", None, 11),
+        ]))
+
+    change = events.get(timeout=5)
+    assert change.name == "myconfig"
+    assert change.revision > revision
+    assert change.changed == {"gigi/surname": "carrube"}
+    assert change.added == {"gigi/alive": "no"}
+    assert change.removed == ["gigi/birth"]
+    assert watch.revision == change.revision
+    assert watch.config == {
+        "gigi": {
+            "surname": "carrube",
+            "alive": "no"
+        }
+    }
+
+    watch.cancel()
+
+    if MOCKED:
+        etcd3.Etcd3Client.cancel_watch.assert_called_once_with(1)
+
+
+def test_watch_coalesce(config):
+    """
+    Test if events are notified once per revision and nested levels are
+    removed when they become empty.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    events = []
+    watch = config.watch("myconfig", events.append)
+
+    config.callbacks[0](WatchResponse([
+        # already part of the pulled configuration
+        event(b"/watch_test/myconfig/gigi/surname", b"burigi", 10),
+        event(b"/watch_test/myconfig/gigi/surname", b"carrube", 11),
+        event(b"/watch_test/myconfig/gigi/birth", b"5/8/1980", 11),
+        # same value doesn't produce any event
+        event(b"/watch_test/myconfig/gigi/birth", b"5/8/1980", 12),
+        event(b"/watch_test/myconfig/gigi/surname", None, 13),
+        event(b"/watch_test/myconfig/gigi/birth", None, 13),
+    ]))
+
+    assert [change.revision for change in events] == [11, 13]
+    assert events[0].changed == {
+        "gigi/surname": "carrube",
+        "gigi/birth": "5/8/1980"
+    }
+    assert sorted(events[1].removed) == ["gigi/birth", "gigi/surname"]
+    assert watch.config == {}
+    assert watch.revision == 13
+
+
+def test_watch_failure(config):
+    """
+    Test if watch failures are notified.
+    """
+    if not MOCKED:
+        pytest.skip("requires a mocked client")
+
+    events = []
+    config.watch("myconfig", events.append)
+
+    error = Exception("connection lost")
+    config.callbacks[0](error)
+
+    assert events == [error]